@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Benchmark WolframAlpha Scraper
+Benchmark offline memakai halaman fixture dan stub HTTP server lokal.
+Offline benchmarks using fixture pages and a local stub HTTP server.
+
+Mengukur / Measures:
+  - throughput parse (halaman/detik) per fixture dan per backend parser
+  - memori puncak per halaman (tracemalloc)
+  - memori untuk menahan banyak hasil: dict vs models.SearchResult
+  - waktu batch end-to-end search_multiple terhadap stub server
+
+Contoh / Examples:
+  python benchmark.py
+  python benchmark.py -o bench.json
+  python benchmark.py --compare baseline.json --tolerance 0.2
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+from models import SearchResult
+from rate_limiter import RateLimiter
+from wolframalpha_scraper import PARSERS, WolframAlphaScraper
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixtures(pattern: str = '*.html') -> List[Tuple[str, bytes]]:
+    """Baca halaman fixture sebagai (nama, bytes)."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, pattern))):
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+class StubServer:
+    """
+    Stub HTTP server lokal yang menyajikan halaman fixture.
+    Local stub HTTP server that serves fixture pages.
+
+    Query dipetakan ke fixture secara deterministik (query ke-n -> fixture n mod N).
+    Queries map to fixtures deterministically (query n -> fixture n mod N).
+    """
+
+    def __init__(self, pages: List[Tuple[str, bytes]], latency: float = 0.0):
+        """
+        Args:
+            pages: Halaman fixture (nama, bytes)
+            latency (float): Jeda buatan per response dalam detik
+        """
+        self.pages = pages
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                params = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+                query = params.get('i', [''])[0]
+                number = int(query.rsplit(' ', 1)[-1]) if query[-1:].isdigit() else 0
+                body = server.pages[number % len(server.pages)][1]
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/input"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def bench_parse(pages: List[Tuple[str, bytes]], min_time: float = 0.5) -> List[Dict]:
+    """
+    Ukur throughput parse dan memori puncak per halaman untuk setiap backend.
+    Measure parse throughput and peak memory per page for every backend.
+    """
+    results = []
+    for parser in PARSERS:
+        scraper = WolframAlphaScraper(parser=parser, memory_cache_size=0)
+        for name, content in pages:
+            # Pemanasan agar import dan cache XPath tidak ikut terukur
+            pods = len(scraper._parse(content))
+
+            runs = 0
+            start = time.perf_counter()
+            while True:
+                scraper._parse(content)
+                runs += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_time and runs >= 3:
+                    break
+
+            tracemalloc.start()
+            scraper._parse(content)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results.append({
+                'name': f"parse/{parser}/{name}",
+                'parser': parser,
+                'fixture': name,
+                'bytes': len(content),
+                'pods': pods,
+                'runs': runs,
+                'seconds_per_page': elapsed / runs,
+                'pages_per_second': runs / elapsed,
+                'peak_memory_bytes': peak
+            })
+    return results
+
+
+def bench_batch(pages: List[Tuple[str, bytes]], queries: int, workers_list: List[int],
+                latency: float) -> List[Dict]:
+    """
+    Ukur waktu batch end-to-end search_multiple terhadap stub server.
+    Measure end-to-end search_multiple batch time against the stub server.
+    """
+    results = []
+    batch = [f"benchmark query {i}" for i in range(queries)]
+
+    with StubServer(pages, latency=latency) as server:
+        for parser in PARSERS:
+            for workers in workers_list:
+                scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None),
+                                              memory_cache_size=0, parser=parser)
+                scraper.base_url = server.url
+
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    output = scraper.search_multiple(batch, delay=0, workers=workers)
+                elapsed = time.perf_counter() - start
+
+                statuses: Dict[str, int] = {}
+                for result in output:
+                    statuses[result['status']] = statuses.get(result['status'], 0) + 1
+
+                results.append({
+                    'name': f"batch/{parser}/workers={workers}",
+                    'parser': parser,
+                    'workers': workers,
+                    'queries': queries,
+                    'latency': latency,
+                    'seconds': elapsed,
+                    'queries_per_second': queries / elapsed,
+                    'statuses': statuses
+                })
+    return results
+
+
+def bench_models(pages: List[Tuple[str, bytes]], count: int) -> List[Dict]:
+    """
+    Ukur memori untuk menahan banyak hasil sebagai dict dan sebagai models.
+    Measure the memory needed to hold many results as dicts and as models.
+
+    Setiap hasil di-decode ulang dari JSON agar string tidak berbagi objek,
+    sama seperti hasil yang datang dari network atau file.
+    Each result is re-decoded from JSON so no strings share objects, just like
+    results coming from the network or a file.
+    """
+    scraper = WolframAlphaScraper(memory_cache_size=0)
+    encoded = []
+    for i, (name, content) in enumerate(pages):
+        pods = scraper._parse(content)
+        encoded.append(json.dumps({'query': f"benchmark query {i}", 'url': '', 'results': pods,
+                                   'status': 'success' if pods else 'no_results', 'error': None}))
+
+    def measure(build) -> int:
+        tracemalloc.start()
+        held = [build(json.loads(encoded[i % len(encoded)])) for i in range(count)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del held
+        return current
+
+    dict_bytes = measure(lambda result: result)
+    model_bytes = measure(SearchResult.from_dict)
+    results = []
+    for kind, held_bytes in (('dict', dict_bytes), ('model', model_bytes)):
+        results.append({
+            'name': f"models/{kind}/results={count}",
+            'kind': kind,
+            'results': count,
+            'held_memory_bytes': held_bytes,
+            'bytes_per_result': held_bytes / count,
+            'reduction': 1 - held_bytes / dict_bytes
+        })
+    return results
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Bandingkan dengan hasil sebelumnya dan kembalikan daftar regresi.
+    Compare against a previous run and return a list of regressions.
+    """
+    previous = {b['name']: b for b in baseline.get('benchmarks', [])}
+    regressions = []
+    for bench in current['benchmarks']:
+        old = previous.get(bench['name'])
+        if old is None:
+            continue
+        for key in ('pages_per_second', 'queries_per_second'):
+            if key in bench and key in old and bench[key] < old[key] * (1 - tolerance):
+                regressions.append(f"{bench['name']}: {key} {old[key]:.1f} -> {bench[key]:.1f}")
+        if 'peak_memory_bytes' in bench and 'peak_memory_bytes' in old:
+            if bench['peak_memory_bytes'] > old['peak_memory_bytes'] * (1 + tolerance):
+                regressions.append(f"{bench['name']}: peak_memory_bytes "
+                                   f"{old['peak_memory_bytes']} -> {bench['peak_memory_bytes']}")
+        if 'held_memory_bytes' in bench and 'held_memory_bytes' in old:
+            if bench['held_memory_bytes'] > old['held_memory_bytes'] * (1 + tolerance):
+                regressions.append(f"{bench['name']}: held_memory_bytes "
+                                   f"{old['held_memory_bytes']} -> {bench['held_memory_bytes']}")
+    return regressions
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(
+        description='Offline benchmark WolframAlpha Scraper',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('Contoh / Examples:')[-1]
+    )
+    parser.add_argument('-o', '--output', help='Simpan hasil benchmark ke file JSON')
+    parser.add_argument('--compare', help='File JSON benchmark sebelumnya untuk dibandingkan')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Toleransi regresi relatif (default: 0.2 = 20%%)')
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help='Waktu minimum per benchmark parse dalam detik (default: 0.5)')
+    parser.add_argument('--queries', type=int, default=60,
+                        help='Jumlah query untuk benchmark batch (default: 60)')
+    parser.add_argument('--workers', default='1,4',
+                        help='Daftar jumlah worker batch, dipisah koma (default: 1,4)')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Latency buatan stub server dalam detik (default: 0.02)')
+    parser.add_argument('--model-results', type=int, default=20000,
+                        help='Jumlah hasil untuk benchmark memori models (default: 20000, 0 = lewati)')
+    parser.add_argument('--skip-batch', action='store_true', help='Lewati benchmark batch')
+    args = parser.parse_args()
+
+    pages = load_fixtures()
+    if not pages:
+        print(f"Error: tidak ada fixture di {FIXTURES_DIR}")
+        return 1
+
+    benchmarks = bench_parse(pages, min_time=args.min_time)
+    if args.model_results > 0:
+        benchmarks += bench_models(pages, args.model_results)
+    if not args.skip_batch:
+        workers_list = [int(w) for w in args.workers.split(',') if w.strip()]
+        benchmarks += bench_batch(pages, args.queries, workers_list, args.latency)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': benchmarks
+    }
+
+    for bench in benchmarks:
+        if 'pages_per_second' in bench:
+            print(f"{bench['name']:<60} {bench['pages_per_second']:>9.1f} pages/s "
+                  f"{bench['peak_memory_bytes'] / 1024:>9.0f} KiB peak")
+        elif 'held_memory_bytes' in bench:
+            print(f"{bench['name']:<60} {bench['bytes_per_result']:>9.0f} B/result "
+                  f"{bench['reduction']:>7.1%} less")
+        else:
+            print(f"{bench['name']:<60} {bench['queries_per_second']:>9.1f} queries/s "
+                  f"{bench['seconds']:>8.2f} s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nHasil benchmark disimpan ke: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regresi terdeteksi:")
+            for line in regressions:
+                print(f"  • {line}")
+            return 1
+        print("\n✓ Tidak ada regresi")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
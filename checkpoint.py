@@ -0,0 +1,171 @@
+"""
+Checkpoint Journal untuk WolframAlpha Scraper
+Jurnal append-only untuk batch yang bisa dilanjutkan setelah terputus.
+Append-only journal for batch runs that can be resumed after an interruption.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class CheckpointJournal:
+    """
+    Mencatat setiap query yang selesai beserta status dan hasilnya (JSON Lines).
+    Records every completed query with its status and result (JSON Lines).
+
+    Hanya offset baris yang disimpan di memori; hasil dibaca ulang dari disk
+    saat dibutuhkan sehingga memori tetap kecil untuk batch besar.
+    Only line offsets are kept in memory; results are read back from disk on
+    demand so memory stays small for large batches.
+    """
+
+    def __init__(self, filename: str, resume: bool = False, overwrite: bool = False):
+        """
+        Args:
+            filename (str): File jurnal
+            resume (bool): Lanjutkan jurnal yang ada
+            overwrite (bool): Mulai dari awal walaupun jurnal sudah berisi progres
+
+        Raises:
+            FileExistsError: Jurnal sudah berisi progres, tetapi resume maupun
+                overwrite tidak dipilih
+        """
+        self.filename = filename
+        # index -> (query, status, offset baris di file)
+        self._entries: Dict[int, Tuple[str, str, int]] = {}
+        self._reader = None
+
+        if not (resume or overwrite) and os.path.exists(filename) and os.path.getsize(filename):
+            # Menjalankan ulang tanpa --resume tidak boleh menghapus progres batch
+            raise FileExistsError(
+                f"Jurnal checkpoint '{filename}' sudah berisi progres: gunakan --resume "
+                f"untuk melanjutkan atau --overwrite untuk mulai dari awal")
+
+        if resume and os.path.exists(filename):
+            self._load()
+            self._file = open(filename, 'ab')
+        else:
+            self._file = open(filename, 'wb')
+
+    def _load(self):
+        """Baca jurnal yang ada; record terakhir untuk setiap index yang berlaku."""
+        with open(self.filename, 'rb') as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._entries[record['index']] = (record['query'], record['status'], offset)
+                except (ValueError, KeyError, TypeError):
+                    # Baris terakhir bisa terpotong jika proses berhenti mendadak
+                    pass
+                offset += len(line)
+
+        # Pastikan record baru dimulai di baris baru
+        if offset:
+            with open(self.filename, 'rb+') as f:
+                f.seek(offset - 1)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+
+    def record(self, index: int, result: Dict):
+        """
+        Catat hasil query dan flush ke disk.
+        Record a query result and flush it to disk.
+
+        Args:
+            index (int): Posisi query di input
+            result (Dict): Hasil scraping
+        """
+        record = {
+            'index': index,
+            'query': result['query'],
+            'status': result['status'],
+            'result': result
+        }
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        offset = self._file.tell()
+        self._file.write(line)
+        self._file.flush()
+        self._entries[index] = (result['query'], result['status'], offset)
+
+    def is_complete(self, index: int, query: str) -> bool:
+        """True jika query di index ini sudah berhasil (status success)."""
+        entry = self._entries.get(index)
+        return entry is not None and entry[0] == query and entry[1] == 'success'
+
+    def load_result(self, index: int) -> Dict:
+        """Baca hasil yang tercatat untuk index dari disk."""
+        offset = self._entries[index][2]
+        if self._reader is None:
+            self._reader = open(self.filename, 'rb')
+        self._reader.seek(offset)
+        return json.loads(self._reader.readline())['result']
+
+    def status_counts(self) -> Dict[str, int]:
+        """Jumlah query per status di jurnal."""
+        counts: Dict[str, int] = {}
+        for _, status, _ in self._entries.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def close(self):
+        """Tutup file jurnal."""
+        self._file.close()
+        if self._reader is not None:
+            self._reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_checkpointed(scraper, queries: List[str], journal: CheckpointJournal,
+                      delay: float = 2.0, workers: int = 1,
+                      fields: Optional[Iterable[str]] = None,
+                      canonicalize: Optional[Callable[[str], str]] = None) -> Iterator[Dict]:
+    """
+    Jalankan batch dengan jurnal: query yang sudah sukses diambil dari jurnal,
+    sisanya (baru, error, no_results) di-request ulang.
+    Run a batch against a journal: queries that already succeeded are read back
+    from the journal, the rest (new, error, no_results) are fetched again.
+
+    Args:
+        scraper (WolframAlphaScraper): Scraper yang dipakai
+        queries (List[str]): Semua query di input
+        journal (CheckpointJournal): Jurnal checkpoint
+        delay (float): Waktu delay antara request
+        workers (int): Jumlah worker paralel
+        fields (Iterable[str]): Field pod yang diekstrak (default: semua)
+        canonicalize (Callable[[str], str]): Deduplikasi query yang belum selesai
+            (lihat query_dedup.QueryCanonicalizer)
+
+    Yields:
+        Dict: Hasil untuk setiap query, urutan sama dengan input
+    """
+    skip = {i for i, query in enumerate(queries) if journal.is_complete(i, query)}
+    todo = [i for i in range(len(queries)) if i not in skip]
+    if skip:
+        print(f"Melanjutkan: {len(skip)} query sudah selesai, {len(todo)} diproses")
+
+    fetched = scraper.iter_search_completed([queries[i] for i in todo], delay=delay,
+                                            workers=workers, fields=fields,
+                                            canonicalize=canonicalize)
+    pending: Dict[int, Dict] = {}
+
+    for i in range(len(queries)):
+        if i in skip:
+            yield journal.load_result(i)
+            continue
+
+        # Hasil dicatat ke jurnal begitu selesai, sebelum diurutkan
+        while i not in pending:
+            position, result = next(fetched)
+            journal.record(todo[position], result)
+            pending[todo[position]] = result
+        yield pending.pop(i)
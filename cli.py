@@ -4,13 +4,59 @@ WolframAlpha Scraper CLI
 Command-line interface untuk WolframAlpha Formula Scraper
 """
 
+import os
 import sys
+import json
+import time
+import signal
 import argparse
-from wolframalpha_scraper import WolframAlphaScraper
+import threading
+from wolframalpha_scraper import FIELDS, PARSERS, WolframAlphaScraper, normalize_fields
+from response_cache import ResponseCache
+from result_writers import SqliteWriter, is_sqlite, open_writer
+from checkpoint import CheckpointJournal, iter_checkpointed
+from response_archive import ResponseArchive, reparse_archive
+from metrics import Metrics
+from query_dedup import RULES, QueryCanonicalizer
+from daemon_client import DEFAULT_ADDRESS, DaemonClient
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'wolframalpha_scraper')
+DEFAULT_INDEX = os.path.join(DEFAULT_CACHE_DIR, 'formula_index.sqlite3')
+
+
+def split_command(argv):
+    """
+    Pisahkan subcommand dari argumen CLI.
+    Split a subcommand off the CLI arguments.
+
+    Argumen pertama yang sama dengan nama subcommand menjalankan subcommand
+    tersebut. Query yang kebetulan sama dengan nama subcommand diawali "--"
+    (cli.py -- index), dan opsi boleh ditulis sebelum atau sesudah query.
+
+    Args:
+        argv (List[str]): Argumen tanpa nama program
+
+    Returns:
+        Tuple[Optional[str], List[str]]: Nama subcommand (None untuk mode query)
+            dan argumen untuk parser-nya
+    """
+    if argv and argv[0] in COMMANDS:
+        return argv[0], argv[1:]
+    if len(argv) > 1 and argv[0] == '--':
+        # Pindahkan query ke belakang "--" agar opsi sesudahnya tetap dikenali
+        return None, argv[2:] + ['--', argv[1]]
+    return None, argv
 
 
 def main():
     """Main CLI function"""
+    # Subcommand (misal: cli.py reparse ARCHIVE_DIR)
+    command, argv = split_command(sys.argv[1:])
+    if command is not None:
+        COMMANDS[command](argv)
+        return
+    
     parser = argparse.ArgumentParser(
         description='WolframAlpha Formula Scraper - Educational Tool',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -21,18 +67,44 @@ Contoh penggunaan / Examples:
   %(prog)s "area of circle" -d 3.0
   %(prog)s --interactive
   %(prog)s --file queries.txt
+  %(prog)s --file queries.txt --workers 4
+  %(prog)s --file queries.txt --workers 8 --parse-processes 4
+  %(prog)s --file queries.txt -o results.jsonl.gz
+  %(prog)s --file queries.txt --workers 8 -o results.db
+  %(prog)s --file queries.txt --resume
+  %(prog)s --file queries.txt --fields formulas,title
+  %(prog)s --file queries.txt --dedup
+  %(prog)s --file queries.txt --dedup-rules case,whitespace
+  %(prog)s "quadratic formula" --no-cache
+  %(prog)s --file queries.txt --metrics metrics.prom
+  %(prog)s --file queries.txt --archive-dir archive/
+  %(prog)s reparse archive/ -o reparsed.jsonl
+  %(prog)s index results.json results.jsonl
+  %(prog)s search-index "a^2 + b^2 = c^2"
+  %(prog)s serve --listen unix:/tmp/wa.sock
+  %(prog)s "quadratic formula" --daemon unix:/tmp/wa.sock
+  %(prog)s queue add batch.queue queries.txt
+  %(prog)s queue work batch.queue --workers 4
+  %(prog)s queue export batch.queue -o results.jsonl
+  %(prog)s -- index -o output.json
+
+Subcommand / Subcommands: reparse, index, search-index, queue, serve
+  Query yang sama dengan nama subcommand diawali "--" (misal: %(prog)s -- index).
+  Prefix a query spelled like a subcommand with "--" (e.g. %(prog)s -- index).
         '''
     )
     
     parser.add_argument(
         'query',
         nargs='?',
-        help='Query untuk dicari di WolframAlpha'
+        help='Query untuk dicari di WolframAlpha (awali dengan -- jika sama '
+             'dengan nama subcommand)'
     )
     
     parser.add_argument(
         '-o', '--output',
-        help='Nama file output JSON (default: results.json)',
+        help='Nama file output JSON, .jsonl / .jsonl.gz untuk JSON Lines, '
+             'atau .db / .sqlite untuk SQLite (default: results.json)',
         default='results.json'
     )
     
@@ -54,49 +126,241 @@ Contoh penggunaan / Examples:
         help='File berisi list queries (satu query per baris)'
     )
     
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        help='Jumlah request paralel untuk mode file dan interaktif (default: 1)',
+        default=1
+    )
+    
+    parser.add_argument(
+        '--parser',
+        choices=PARSERS,
+        help='Backend parser HTML (default: lxml)',
+        default='lxml'
+    )
+    
+    parser.add_argument(
+        '--parse-processes',
+        type=int,
+        help='Jalankan ekstraksi di N process terpisah saat --workers > 1 (default: 0 = nonaktif)',
+        default=0
+    )
+    
+    parser.add_argument(
+        '--fields',
+        help=f'Field pod yang diekstrak, dipisah koma ({",".join(FIELDS)}; default: semua)'
+    )
+    
+    parser.add_argument(
+        '--dedup',
+        action='store_true',
+        help='Mode file: request query yang sama (beda huruf/spasi/tanda baca akhir) sekali saja'
+    )
+    
+    parser.add_argument(
+        '--dedup-rules',
+        help=f'Aturan kanonikalisasi untuk --dedup, dipisah koma ({",".join(RULES)}; default: semua)'
+    )
+    
+    parser.add_argument(
+        '--checkpoint',
+        help='File jurnal checkpoint untuk mode file (default: <output>.checkpoint.jsonl)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Lanjutkan batch yang terputus, lewati query yang sudah sukses'
+    )
+    
+    parser.add_argument(
+        '--overwrite',
+        action='store_true',
+        help='Mulai dari awal: timpa jurnal checkpoint mode file yang berisi progres '
+             'dan kosongkan tabel output SQLite (.db); tanpa ini hasil SQLite ditambahkan'
+    )
+    
+    parser.add_argument(
+        '--archive-dir',
+        help='Arsipkan body response mentah ke direktori ini (untuk reparse offline)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        help=f'Direktori cache hasil (default: {DEFAULT_CACHE_DIR})',
+        default=DEFAULT_CACHE_DIR
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        help='Umur cache dalam detik sebelum direvalidasi (default: 86400)',
+        default=86400.0
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Nonaktifkan cache hasil'
+    )
+    
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        help='Timeout koneksi dalam detik (default: 5)',
+        default=5.0
+    )
+    
+    parser.add_argument(
+        '--read-timeout',
+        type=float,
+        help='Timeout baca response dalam detik (default: 30)',
+        default=30.0
+    )
+    
+    parser.add_argument(
+        '--http-retries',
+        type=int,
+        help='Retry otomatis untuk error koneksi dan 500/502/504 (default: 3)',
+        default=3
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Download dan parse response per chunk; pod diekstrak begitu selesai (parser lxml)'
+    )
+    
+    parser.add_argument(
+        '--max-body-size',
+        type=int,
+        metavar='BYTES',
+        help='Batas ukuran body response dalam byte; response lebih besar menjadi error'
+    )
+    
+    parser.add_argument(
+        '--max-pods',
+        type=int,
+        metavar='N',
+        help='Simpan hanya N pod pertama; dengan --stream download berhenti lebih awal'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        help='Simpan metrics per fase di akhir run (.prom/.txt = Prometheus text, selain itu JSON)'
+    )
+    
+    parser.add_argument(
+        '--daemon',
+        metavar='ADDRESS',
+        help=f'Kirim query ke daemon yang berjalan (cli.py serve), misal {DEFAULT_ADDRESS} atau unix:PATH'
+    )
+    
     parser.add_argument(
         '-q', '--quiet',
         action='store_true',
         help='Mode quiet (tidak print ke console)'
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.resume and args.overwrite:
+        parser.error('--resume dan --overwrite tidak bisa dipakai bersamaan')
+    
+    try:
+        args.fields = normalize_fields(args.fields)
+        # --dedup-rules sekaligus mengaktifkan --dedup
+        args.canonicalize = None
+        if args.dedup or args.dedup_rules:
+            args.canonicalize = QueryCanonicalizer(args.dedup_rules or RULES)
+    except ValueError as e:
+        parser.error(str(e))
     
     # Inisialisasi scraper
-    scraper = WolframAlphaScraper()
+    metrics = None
+    if args.daemon:
+        # Scraper, cache, dan koneksi ada di daemon; opsi scraper lokal diabaikan
+        try:
+            scraper = DaemonClient(args.daemon)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        cache = None
+        if not args.no_cache:
+            cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl)
+        archive = ResponseArchive(args.archive_dir) if args.archive_dir else None
+        metrics = Metrics() if args.metrics else None
+        try:
+            scraper = WolframAlphaScraper(cache=cache, parser=args.parser, archive=archive,
+                                          parse_processes=args.parse_processes, metrics=metrics,
+                                          timeout=(args.connect_timeout, args.read_timeout),
+                                          http_retries=args.http_retries, stream=args.stream,
+                                          max_body_size=args.max_body_size, max_pods=args.max_pods)
+        except ValueError as e:
+            parser.error(str(e))
     
-    # Mode interactive
     if args.interactive:
-        run_interactive_mode(scraper, args)
+        # Mode interactive
+        run_mode = run_interactive_mode
+    elif args.file:
+        # Mode file
+        run_mode = run_file_mode
+    elif args.query:
+        # Mode single query
+        run_mode = run_single_query
+    else:
+        # Jika tidak ada argument, show help
+        parser.print_help()
         return
     
-    # Mode file
-    if args.file:
-        run_file_mode(scraper, args)
-        return
-    
-    # Mode single query
-    if args.query:
-        run_single_query(scraper, args)
-        return
+    try:
+        run_mode(scraper, args)
+    except ConnectionError as e:
+        # Daemon tidak berjalan (--daemon)
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        # Metrics tetap disimpan walaupun run dihentikan di tengah jalan
+        if metrics is not None:
+            save_metrics(metrics, args)
+
+
+def save_metrics(metrics, args):
+    """Simpan metrics ke file dan tampilkan ringkasan per fase"""
+    metrics.dump(args.metrics)
     
-    # Jika tidak ada argument, show help
-    parser.print_help()
+    if not args.quiet:
+        print("\nMetrics per fase / Per-phase metrics:")
+        for line in metrics.summary_lines():
+            print(f"  {line}")
+    print(f"✓ Metrics disimpan ke: {args.metrics}")
 
 
 def run_single_query(scraper, args):
     """Run single query mode"""
-    result = scraper.search_formula(args.query, delay=args.delay)
+    result = scraper.search_formula(args.query, delay=args.delay, fields=args.fields)
     
     if not args.quiet:
         scraper.print_results(result)
     
-    scraper.save_results(result, args.output)
+    save_output(scraper, result, args.output, args.overwrite)
     
     if not args.quiet:
         print(f"\n✓ Hasil disimpan ke: {args.output}")
 
 
+def save_output(scraper, results, filename, overwrite=False):
+    """Simpan hasil mode single/interaktif; output .db / .sqlite ditulis lewat SqliteWriter"""
+    if not is_sqlite(filename):
+        scraper.save_results(results, filename)
+        return
+    
+    with SqliteWriter(filename, append=not overwrite) as writer:
+        for result in results if isinstance(results, list) else [results]:
+            writer.write(result)
+    print(f"\nHasil disimpan ke: {filename}")
+
+
 def run_file_mode(scraper, args):
     """Run file mode - read queries from file"""
     try:
@@ -109,31 +373,70 @@ def run_file_mode(scraper, args):
         
         print(f"Membaca {len(queries)} queries dari {args.file}")
         
-        results = scraper.search_multiple(queries, delay=args.delay)
-        
-        if not args.quiet:
-            for result in results:
-                scraper.print_results(result)
+        checkpoint = args.checkpoint or args.output + '.checkpoint.jsonl'
         
-        scraper.save_results(results, args.output)
+        # Setiap hasil langsung ditulis ke file begitu selesai dan dicatat
+        # di jurnal checkpoint agar bisa dilanjutkan dengan --resume
+        with CheckpointJournal(checkpoint, resume=args.resume, overwrite=args.overwrite) as journal, \
+                open_writer(args.output, overwrite=args.overwrite) as writer:
+            # File JSON ditulis ulang penuh, sedangkan database SQLite yang tidak
+            # dikosongkan sudah berisi hasil dari jurnal sejak run sebelumnya
+            replayed = set()
+            if is_sqlite(args.output) and not args.overwrite:
+                replayed = {i for i, query in enumerate(queries) if journal.is_complete(i, query)}
+            for index, result in enumerate(iter_checkpointed(
+                    scraper, queries, journal, delay=args.delay, workers=args.workers,
+                    fields=args.fields, canonicalize=args.canonicalize)):
+                if index not in replayed:
+                    writer.write(result)
+                
+                if not args.quiet:
+                    scraper.print_results(result)
         
-        print(f"\n✓ Semua hasil ({len(results)}) disimpan ke: {args.output}")
+        print(f"\n✓ Semua hasil ({writer.count}) disimpan ke: {args.output}")
+        if replayed:
+            print(f"  {len(replayed)} hasil dari jurnal sudah ada di database")
+        print(f"  Checkpoint: {checkpoint} {journal.status_counts()}")
         
     except FileNotFoundError:
         print(f"Error: File '{args.file}' tidak ditemukan")
+    except FileExistsError as e:
+        # Jurnal berisi progres dan tidak ada --resume / --overwrite
+        print(f"Error: {e}")
+        sys.exit(1)
+    except ConnectionError:
+        # Daemon tidak berjalan (--daemon); main() keluar dengan status 1
+        raise
     except Exception as e:
         print(f"Error: {e}")
 
 
 def run_interactive_mode(scraper, args):
-    """Run interactive mode"""
+    """Run interactive mode - queries run in the background, the prompt never waits"""
+    from interactive_session import InteractiveSession
+    
     print("="*80)
     print("WolframAlpha Scraper - Mode Interaktif")
     print("="*80)
     print("\nKetik query Anda (atau 'exit' untuk keluar)")
-    print("Contoh: quadratic formula, pythagorean theorem, etc.\n")
+    print("Contoh: quadratic formula, pythagorean theorem, etc.")
+    print("Query dikerjakan di background; hasil tampil begitu selesai.")
+    print("Prefetch beberapa query sekaligus: :prefetch area of circle, pi, e\n")
     
-    results = []
+    print_lock = threading.Lock()
+    
+    def show(result, background):
+        with print_lock:
+            if args.quiet:
+                print(f"\n✓ {result['query']}: {result['status']}")
+            else:
+                scraper.print_results(result)
+            if background:
+                # Hasil datang saat prompt menunggu input; tampilkan ulang prompt
+                print("\nQuery: ", end='', flush=True)
+    
+    session = InteractiveSession(scraper, delay=args.delay, fields=args.fields,
+                                 workers=args.workers, on_result=show)
     
     while True:
         try:
@@ -145,24 +448,277 @@ def run_interactive_mode(scraper, args):
             if not query:
                 continue
             
-            result = scraper.search_formula(query, delay=args.delay)
-            results.append(result)
+            if query.startswith(':prefetch'):
+                queries = query[len(':prefetch'):].split(',')
+                started = session.prefetch(queries)
+                print(f"Prefetch {started} query di background")
+                continue
             
-            if not args.quiet:
-                scraper.print_results(result)
+            if session.submit(query) == 'running':
+                with print_lock:
+                    print("Query yang sama sedang diproses, hasil tampil begitu selesai")
             
         except KeyboardInterrupt:
             print("\n\nInterrupted by user")
             break
+        except EOFError:
+            break
         except Exception as e:
             print(f"Error: {e}")
     
+    pending = session.pending()
+    try:
+        if pending:
+            print(f"\nMenunggu {pending} query yang masih berjalan (Ctrl+C untuk membatalkan)...")
+        session.close(wait=True)
+    except KeyboardInterrupt:
+        session.close(wait=False)
+    
+    results = session.results()
     if results:
-        scraper.save_results(results, args.output)
+        save_output(scraper, results, args.output, args.overwrite)
         print(f"\n✓ Total {len(results)} hasil disimpan ke: {args.output}")
     
     print("\nTerima kasih telah menggunakan WolframAlpha Scraper!")
 
 
+def run_reparse(argv):
+    """Run reparse mode - re-extract archived responses offline"""
+    parser = argparse.ArgumentParser(
+        prog='cli.py reparse',
+        description='Ekstrak ulang response yang diarsip tanpa network'
+    )
+    parser.add_argument('archive_dir', help='Direktori arsip dari --archive-dir')
+    parser.add_argument(
+        '-o', '--output',
+        help='Nama file output (default: reparsed.jsonl)',
+        default='reparsed.jsonl'
+    )
+    parser.add_argument('--parser', choices=PARSERS, default='lxml', help='Backend parser HTML')
+    parser.add_argument('-p', '--processes', type=int, help='Jumlah process (default: jumlah CPU)')
+    parser.add_argument('--all', action='store_true',
+                        help='Ekstrak semua response, bukan hanya yang terbaru per query')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Kosongkan tabel output SQLite (.db) yang sudah ada')
+    args = parser.parse_args(argv)
+    
+    if not os.path.isdir(args.archive_dir):
+        print(f"Error: Arsip '{args.archive_dir}' tidak ditemukan")
+        return
+    
+    counts = {}
+    with open_writer(args.output, overwrite=args.overwrite) as writer:
+        for result in reparse_archive(args.archive_dir, parser=args.parser,
+                                      processes=args.processes, latest=not args.all):
+            writer.write(result)
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+    
+    print(f"✓ {writer.count} response diekstrak ulang ke: {args.output} {counts}")
+
+
+def run_index(argv):
+    """Run index mode - add result files to the local formula index"""
+    from formula_index import FormulaIndex
+    
+    parser = argparse.ArgumentParser(
+        prog='cli.py index',
+        description='Indeks file hasil (.json / .jsonl / .jsonl.gz) untuk search-index'
+    )
+    parser.add_argument('files', nargs='+', help='File hasil dari save_results atau --output')
+    parser.add_argument('--index', help=f'File index (default: {DEFAULT_INDEX})', default=DEFAULT_INDEX)
+    args = parser.parse_args(argv)
+    
+    with FormulaIndex(args.index) as index:
+        for filename in args.files:
+            try:
+                count = index.ingest_file(filename)
+            except (OSError, ValueError) as e:
+                print(f"Error: {filename}: {e}")
+                continue
+            print(f"{filename}: {count} hasil diindeks")
+        stats = index.stats()
+    
+    print(f"✓ Index {args.index}: {stats['documents']} query, {stats['postings']} posting")
+
+
+def run_search_index(argv):
+    """Run search-index mode - look up titles, content and formulas offline"""
+    from formula_index import INDEX_FIELDS, FormulaIndex, tokenize
+    
+    parser = argparse.ArgumentParser(
+        prog='cli.py search-index',
+        description='Cari query yang menghasilkan judul, teks, atau rumus tertentu di index lokal'
+    )
+    parser.add_argument('text', help='Teks pencarian, misal "x^2" atau "input interpretation"')
+    parser.add_argument('--index', help=f'File index (default: {DEFAULT_INDEX})', default=DEFAULT_INDEX)
+    parser.add_argument('--field', action='append', choices=INDEX_FIELDS,
+                        help='Batasi ke field tertentu (bisa diulang, default: semua)')
+    parser.add_argument('-n', '--limit', type=int, default=20, help='Jumlah query maksimum (default: 20)')
+    parser.add_argument('--json', action='store_true', help='Tampilkan hasil sebagai JSON')
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.index):
+        print(f"Error: Index '{args.index}' tidak ditemukan, jalankan 'cli.py index' dulu")
+        return
+    
+    with FormulaIndex(args.index) as index:
+        started = time.perf_counter()
+        hits = index.search(args.text, fields=args.field or INDEX_FIELDS, limit=args.limit)
+        elapsed = time.perf_counter() - started
+    
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return
+    
+    # Tampilkan hanya rumus yang memuat semua token pencarian
+    terms = set(tokenize(args.text, symbols=True))
+    for hit in hits:
+        print(f"\n{hit['query']}  ({hit['source']})")
+        for pod in hit['pods']:
+            print(f"  - {pod.get('title') or '(tanpa judul)'}")
+            for formula in dict.fromkeys(pod.get('formulas', [])):
+                if terms.issubset(tokenize(formula, symbols=True)):
+                    print(f"      • {formula}")
+    print(f"\n✓ {len(hits)} query cocok ({elapsed * 1000:.1f} ms)")
+
+
+def run_queue(argv):
+    """Run queue mode - share one batch between worker processes/hosts"""
+    from work_queue import DONE, open_queue, run_worker
+    
+    parser = argparse.ArgumentParser(
+        prog='cli.py queue',
+        description='Antrian kerja bersama: tambah query, jalankan worker, ekspor hasil'
+    )
+    actions = parser.add_subparsers(dest='action', required=True)
+    
+    add = actions.add_parser('add', help='Tambahkan query dari file ke antrian')
+    add.add_argument('queue', help='File antrian (atau sqlite:PATH)')
+    add.add_argument('file', help='File berisi list queries (satu query per baris)')
+    
+    work = actions.add_parser('work', help='Kerjakan query dari antrian sampai habis')
+    work.add_argument('queue', help='File antrian (atau sqlite:PATH)')
+    work.add_argument('-d', '--delay', type=float, default=2.0,
+                      help='Delay antara request dalam detik (default: 2.0)')
+    work.add_argument('-w', '--workers', type=int, default=1,
+                      help='Jumlah request paralel di node ini (default: 1)')
+    work.add_argument('--lease', type=float, default=60.0,
+                      help='Visibility timeout dalam detik; task dikirim ulang jika worker mati (default: 60)')
+    work.add_argument('--parser', choices=PARSERS, default='lxml', help='Backend parser HTML')
+    work.add_argument('--fields', help=f'Field pod yang diekstrak, dipisah koma ({",".join(FIELDS)})')
+    work.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                      help=f'Direktori cache hasil (default: {DEFAULT_CACHE_DIR})')
+    work.add_argument('--no-cache', action='store_true', help='Nonaktifkan cache hasil')
+    
+    status = actions.add_parser('status', help='Tampilkan jumlah task per status')
+    status.add_argument('queue', help='File antrian (atau sqlite:PATH)')
+    
+    requeue = actions.add_parser('requeue', help='Kembalikan hasil error dan task gagal ke antrian')
+    requeue.add_argument('queue', help='File antrian (atau sqlite:PATH)')
+    
+    export = actions.add_parser('export', help='Simpan hasil yang sudah selesai')
+    export.add_argument('queue', help='File antrian (atau sqlite:PATH)')
+    export.add_argument('-o', '--output', default='results.jsonl',
+                        help='File output (.json / .jsonl / .jsonl.gz / .db, default: results.jsonl)')
+    export.add_argument('--overwrite', action='store_true',
+                        help='Kosongkan tabel output SQLite (.db) yang sudah ada')
+    args = parser.parse_args(argv)
+    
+    if args.action == 'work':
+        try:
+            args.fields = normalize_fields(args.fields)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    with open_queue(args.queue) as queue:
+        if args.action == 'add':
+            if not os.path.exists(args.file):
+                print(f"Error: File '{args.file}' tidak ditemukan")
+                return
+            with open(args.file, 'r', encoding='utf-8') as f:
+                count = queue.enqueue(line.strip() for line in f if line.strip())
+            print(f"✓ {count} query ditambahkan ke: {args.queue}")
+        
+        elif args.action == 'work':
+            cache = None if args.no_cache else ResponseCache(args.cache_dir)
+            scraper = WolframAlphaScraper(cache=cache, parser=args.parser)
+            stats = run_worker(scraper, queue, delay=args.delay, workers=args.workers,
+                               fields=args.fields, lease_seconds=args.lease)
+            print(f"\n✓ {stats['recorded']} hasil dicatat, "
+                  f"{stats['discarded']} dibuang (lease sudah diambil worker lain)")
+        
+        elif args.action == 'requeue':
+            print(f"✓ {queue.requeue()} task dikembalikan ke antrian")
+        
+        elif args.action == 'export':
+            with open_writer(args.output, overwrite=args.overwrite) as writer:
+                for result in queue.iter_results():
+                    writer.write(result)
+            print(f"✓ {writer.count} hasil disimpan ke: {args.output}")
+        
+        if args.action in ('status', 'work'):
+            counts = queue.counts()
+            print(', '.join(f"{state}: {count}" for state, count in counts.items()))
+            if counts[DONE] and args.action == 'status':
+                print(f"Ekspor hasil: cli.py queue export {args.queue} -o results.jsonl")
+
+
+def run_serve(argv):
+    """Run serve mode - keep a warm scraper behind a local HTTP API"""
+    from scraper_daemon import create_server
+    
+    parser = argparse.ArgumentParser(
+        prog='cli.py serve',
+        description='Daemon lokal: scraper, session pool, dan cache tetap hangat di antara query'
+    )
+    parser.add_argument('--listen', default=DEFAULT_ADDRESS,
+                        help=f'Alamat HOST:PORT atau unix:PATH (default: {DEFAULT_ADDRESS})')
+    parser.add_argument('-d', '--delay', type=float, default=2.0,
+                        help='Delay default antara request dalam detik (default: 2.0)')
+    parser.add_argument('-w', '--max-workers', type=int, default=8,
+                        help='Batas request paralel per batch (default: 8)')
+    parser.add_argument('--parser', choices=PARSERS, default='lxml', help='Backend parser HTML')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Direktori cache hasil (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-ttl', type=float, default=86400.0,
+                        help='Umur cache dalam detik sebelum direvalidasi (default: 86400)')
+    parser.add_argument('--no-cache', action='store_true', help='Nonaktifkan cache hasil')
+    parser.add_argument('--metrics', action='store_true', help='Sediakan metrics di GET /metrics')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Jangan log setiap request')
+    args = parser.parse_args(argv)
+    
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, ttl=args.cache_ttl)
+    scraper = WolframAlphaScraper(cache=cache, parser=args.parser,
+                                  metrics=Metrics() if args.metrics else None)
+    
+    try:
+        server = create_server(scraper, args.listen, delay=args.delay,
+                               max_workers=args.max_workers, quiet=args.quiet)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    # SIGTERM (systemd, kill) juga menutup server dan menghapus Unix socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"✓ Daemon berjalan di {args.listen} (Ctrl+C untuk berhenti)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nDaemon dihentikan")
+    finally:
+        server.server_close()
+
+
+# Subcommand yang tersedia: nama -> fungsi(argv). Modul khusus subcommand
+# diimpor di dalam fungsinya agar startup mode lain tetap cepat.
+COMMANDS = {
+    'reparse': run_reparse,
+    'index': run_index,
+    'search-index': run_search_index,
+    'queue': run_queue,
+    'serve': run_serve,
+}
+
+
 if __name__ == '__main__':
     main()
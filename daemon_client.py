@@ -0,0 +1,156 @@
+"""
+Daemon Client untuk WolframAlpha Scraper
+Client tipis untuk scraper_daemon yang hanya memakai library standar, sehingga
+cli.py --daemon tidak perlu memuat requests, bs4, atau lxml. http.client baru
+dimuat saat request pertama.
+Thin client for scraper_daemon using only the standard library, so cli.py
+--daemon never loads requests, bs4 or lxml. http.client is loaded on the first
+request.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import json
+import socket
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_ADDRESS = '127.0.0.1:8765'
+
+
+def parse_address(address: str) -> Tuple[str, object]:
+    """
+    Uraikan alamat daemon menjadi ('unix', path) atau ('tcp', (host, port)).
+    Parse a daemon address into ('unix', path) or ('tcp', (host, port)).
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    host, sep, port = address.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"Alamat daemon tidak valid: {address!r} (gunakan HOST:PORT atau unix:PATH)")
+    return 'tcp', (host or '127.0.0.1', int(port))
+
+
+class DaemonClient:
+    """
+    Client tipis untuk daemon dengan API yang sama seperti WolframAlphaScraper
+    (search_formula, search_multiple, iter_search_completed, print_results, save_results).
+    Thin daemon client exposing the same API as WolframAlphaScraper.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: Optional[float] = None):
+        """
+        Args:
+            address (str): "HOST:PORT" atau "unix:PATH"
+            timeout (float): Timeout socket dalam detik (default: tanpa batas,
+                karena query bisa menunggu rate limiter)
+        """
+        self.address = address
+        self.timeout = timeout
+        self._kind, self._target = parse_address(address)
+
+    def _connection(self):
+        import http.client
+        if self._kind == 'tcp':
+            host, port = self._target
+            return http.client.HTTPConnection(host, port, timeout=self.timeout)
+        # HTTPConnection memakai socket yang sudah terhubung apa adanya
+        conn = http.client.HTTPConnection('localhost', timeout=self.timeout)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self._target)
+        except OSError:
+            sock.close()
+            raise
+        conn.sock = sock
+        return conn
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None):
+        conn = None
+        try:
+            conn = self._connection()
+            payload = json.dumps(body).encode('utf-8') if body is not None else None
+            headers = {'Content-Type': 'application/json'} if payload is not None else {}
+            conn.request(method, path, body=payload, headers=headers)
+        except OSError as e:
+            if conn is not None:
+                conn.close()
+            raise ConnectionError(f"Daemon tidak bisa dihubungi di {self.address}: {e}") from e
+        response = conn.getresponse()
+        if response.status != 200:
+            try:
+                message = json.loads(response.read()).get('error')
+            finally:
+                conn.close()
+            raise ValueError(message or f"Daemon mengembalikan HTTP {response.status}")
+        return conn, response
+
+    def _request_json(self, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+        conn, response = self._request(method, path, body)
+        try:
+            return json.loads(response.read())
+        finally:
+            conn.close()
+
+    def health(self) -> Dict:
+        """Status daemon (pid, uptime, jumlah request)."""
+        return self._request_json('GET', '/health')
+
+    def search_formula(self, query: str, delay: Optional[float] = None,
+                       fields: Optional[Iterable[str]] = None) -> Dict:
+        """Satu query lewat daemon; hasil sama seperti WolframAlphaScraper.search_formula."""
+        return self._request_json('POST', '/search', {
+            'query': query, 'delay': delay, 'fields': _fields_list(fields)})
+
+    def iter_search_completed(self, queries: Iterable[str], delay: Optional[float] = None,
+                              workers: int = 1, fields: Optional[Iterable[str]] = None,
+                              canonicalize=None) -> Iterator[Tuple[int, Dict]]:
+        """
+        Batch lewat daemon; (index, hasil) dihasilkan begitu daemon mengirimnya.
+        Batch through the daemon, yielding (index, result) as results stream in.
+
+        canonicalize hanya mendukung query_dedup.QueryCanonicalizer (aturannya
+        dikirim ke daemon).
+        """
+        dedup = None
+        if canonicalize is not None:
+            dedup = getattr(canonicalize, 'rules', None)
+            if dedup is None:
+                raise ValueError("Daemon hanya mendukung canonicalize berupa QueryCanonicalizer")
+        conn, response = self._request('POST', '/batch', {
+            'queries': list(queries), 'delay': delay, 'workers': workers,
+            'fields': _fields_list(fields), 'dedup': list(dedup) if dedup else None})
+        try:
+            for line in response:
+                if line.strip():
+                    item = json.loads(line)
+                    yield item['index'], item['result']
+        finally:
+            conn.close()
+
+    def search_multiple(self, queries: List[str], delay: Optional[float] = None,
+                        workers: int = 1, fields: Optional[Iterable[str]] = None,
+                        canonicalize=None) -> List[Dict]:
+        """Batch lewat daemon; hasil sesuai urutan input."""
+        queries = list(queries)
+        results: List[Optional[Dict]] = [None] * len(queries)
+        for index, result in self.iter_search_completed(queries, delay, workers, fields, canonicalize):
+            results[index] = result
+        return results
+
+    def print_results(self, result: Dict):
+        from wolframalpha_scraper import WolframAlphaScraper
+        WolframAlphaScraper.print_results(self, result)
+
+    def save_results(self, results, filename: str = 'results.json'):
+        from wolframalpha_scraper import WolframAlphaScraper
+        WolframAlphaScraper.save_results(self, results, filename)
+
+
+def _fields_list(fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """Field untuk body JSON (string dipisah koma dibiarkan apa adanya)."""
+    if fields is None or isinstance(fields, str):
+        return fields
+    return sorted(fields)
@@ -0,0 +1,229 @@
+"""
+Extraction Strategies untuk WolframAlpha Scraper
+Registry strategi pencarian pod (section pod, div data-testid, script JSON) dengan
+matcher atribut yang sudah dikompilasi. Semua strategi yang dibutuhkan dicocokkan
+dalam satu pass pohon, dan strategi yang menang pada dokumen terakhir menentukan
+seberapa jauh pass pertama dokumen berikutnya.
+Registry of pod-finding strategies (pod sections, data-testid divs, JSON
+scripts) with precompiled attribute matchers. Every strategy a document needs
+is matched in a single tree pass, and the strategy that won on recent documents
+decides how far the first pass over the next document reaches.
+
+Urutan prioritas strategi tidak pernah berubah, sehingga hasilnya selalu sama
+dengan mencoba setiap selector satu per satu.
+Strategy precedence never changes, so the output is always the same as trying
+each selector one after another.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+
+# Jenis strategi: 'pods' = selector pod alternatif (yang pertama cocok dipakai),
+# 'scripts' = fallback dari script JSON jika belum ada hasil
+KINDS = ('pods', 'scripts')
+
+# Nama statistik untuk dokumen yang tidak menghasilkan pod dari strategi mana pun
+NO_MATCH = 'none'
+
+
+def has_class(name: str) -> Callable[[Optional[str]], bool]:
+    """Matcher untuk atribut class yang memuat kelas name (seperti selector CSS .name)."""
+    # Pemisah sama dengan normalize-space di XPath
+    pattern = re.compile(r'(?:^|[ \t\n\r])' + re.escape(name) + r'(?:[ \t\n\r]|$)')
+    return lambda value: value is not None and pattern.search(value) is not None
+
+
+def contains_ignore_case(text: str) -> Callable[[Optional[str]], bool]:
+    """Matcher untuk atribut yang memuat text, tanpa membedakan huruf besar/kecil."""
+    text = text.lower()
+    return lambda value: bool(value) and text in value.lower()
+
+
+def equals(expected: str) -> Callable[[Optional[str]], bool]:
+    """Matcher untuk atribut yang nilainya tepat expected."""
+    return lambda value: value == expected
+
+
+class Strategy:
+    """
+    Satu cara menemukan pod: elemen tag yang atributnya cocok dengan matcher.
+    One way of finding pods: tag elements whose attribute passes the matcher.
+    """
+
+    __slots__ = ('name', 'tag', 'attribute', 'matches', 'kind')
+
+    def __init__(self, name: str, tag: str, attribute: str,
+                 matches: Callable[[Optional[str]], bool], kind: str = 'pods'):
+        """
+        Args:
+            name (str): Nama strategi untuk statistik dan metrics
+            tag (str): Nama tag HTML (huruf kecil)
+            attribute (str): Atribut yang diperiksa
+            matches (Callable[[Optional[str]], bool]): Matcher nilai atribut (None jika
+                atribut tidak ada), misal has_class('_2vZr')
+            kind (str): 'pods' atau 'scripts' (lihat KINDS)
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Jenis strategi tidak dikenal: {kind} (pilihan: {', '.join(KINDS)})")
+        self.name = name
+        self.tag = tag
+        self.attribute = attribute
+        self.matches = matches
+        self.kind = kind
+
+    def __repr__(self):
+        return f"Strategy({self.name!r}, {self.tag!r}, {self.attribute!r}, kind={self.kind!r})"
+
+
+# Strategi bawaan dalam urutan prioritas
+STRATEGIES = (
+    Strategy('sections', 'section', 'class', has_class('_2vZr')),
+    Strategy('testid', 'div', 'data-testid', contains_ignore_case('pod')),
+    Strategy('scripts', 'script', 'type', equals('application/json'), kind='scripts'),
+)
+
+
+class StrategyMatch(NamedTuple):
+    """Hasil pemilihan strategi untuk satu dokumen."""
+    results: List[Dict]
+    strategy: str
+    seconds: float
+
+
+def _by_tag(strategies: Sequence[Strategy]):
+    """(tag -> [(strategi, list hasil)], list hasil per strategi) untuk satu pass."""
+    matched: List[List] = [[] for _ in strategies]
+    by_tag: Dict[str, List] = {}
+    for strategy, slot in zip(strategies, matched):
+        by_tag.setdefault(strategy.tag, []).append((strategy, slot))
+    return by_tag, matched
+
+
+def match_lxml(root, strategies: Sequence[Strategy]) -> List[List]:
+    """Cocokkan semua strategi dalam satu pass pohon lxml (urutan dokumen)."""
+    by_tag, matched = _by_tag(strategies)
+    for elem in root.iter(*by_tag):
+        for strategy, slot in by_tag[elem.tag]:
+            if strategy.matches(elem.get(strategy.attribute)):
+                slot.append(elem)
+    return matched
+
+
+def match_soup(soup, strategies: Sequence[Strategy]) -> List[List]:
+    """Cocokkan semua strategi dalam satu pass pohon BeautifulSoup (urutan dokumen)."""
+    by_tag, matched = _by_tag(strategies)
+    # Satu iterasi descendants jauh lebih murah daripada find_all per selector
+    for tag in soup.descendants:
+        entries = by_tag.get(tag.name)
+        if entries:
+            for strategy, slot in entries:
+                value = tag.get(strategy.attribute)
+                if isinstance(value, list):
+                    # Atribut multi-nilai (class) disimpan BeautifulSoup sebagai list
+                    value = ' '.join(value)
+                if strategy.matches(value):
+                    slot.append(tag)
+    return matched
+
+
+class StrategySelector:
+    """
+    Memilih strategi ekstraksi per dokumen dan mengingat strategi yang menang.
+    Picks the extraction strategy per document and remembers recent winners.
+
+    Strategi dicoba sesuai prioritas. Pass pertama mencocokkan sekaligus semua
+    strategi sampai posisi yang dibutuhkan dokumen terakhir: halaman section cukup
+    memindai section, sedangkan halaman fallback memindai section, data-testid, dan
+    script dalam satu pass alih-alih tiga. Strategi yang belum dicocokkan dipindai
+    dalam satu pass tambahan jika ternyata dibutuhkan.
+    Strategies are tried in precedence order. The first pass matches every
+    strategy up to the position the previous document needed, so section pages
+    scan for sections only while fallback pages match all three selectors in one
+    pass instead of three. Strategies not matched yet are scanned in one extra
+    pass when they turn out to be needed.
+    """
+
+    def __init__(self, strategies: Iterable[Strategy] = STRATEGIES):
+        """
+        Args:
+            strategies (Iterable[Strategy]): Strategi dalam urutan prioritas; strategi
+                'scripts' harus berada setelah semua strategi 'pods'
+        """
+        self.strategies = tuple(strategies)
+        names = [strategy.name for strategy in self.strategies]
+        if not names or len(set(names)) != len(names) or NO_MATCH in names:
+            raise ValueError(f"Nama strategi harus unik dan bukan '{NO_MATCH}': {names}")
+        kinds = [strategy.kind for strategy in self.strategies]
+        if 'scripts' in kinds and 'pods' in kinds[kinds.index('scripts'):]:
+            raise ValueError("Strategi 'scripts' harus berada setelah semua strategi 'pods'")
+        # Posisi strategi terdalam yang dibutuhkan dokumen terakhir (balapan antar
+        # thread hanya memengaruhi kecepatan, bukan hasil)
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._stats = {name: [0, 0.0] for name in names + [NO_MATCH]}
+
+    def select(self, match: Callable[[Sequence[Strategy]], List[List]],
+               extract: Callable[[Strategy, List], List[Dict]]) -> StrategyMatch:
+        """
+        Ekstrak hasil dokumen dengan strategi pertama yang berhasil.
+        Extract a document's results with the first strategy that succeeds.
+
+        Args:
+            match (Callable): match(strategies) -> elemen cocok per strategi, dalam
+                satu pass (misal lambda s: match_lxml(root, s))
+            extract (Callable): extract(strategy, elements) -> list pod
+
+        Returns:
+            StrategyMatch: Hasil, nama strategi yang menang (NO_MATCH jika tidak ada),
+                dan durasi pencocokan + ekstraksi dalam detik
+        """
+        start = time.perf_counter()
+        strategies = self.strategies
+        reach = self._depth
+        scanned: Dict[int, List] = {}
+
+        def candidates(index: int) -> List:
+            if index not in scanned:
+                batch = [i for i in range(index, max(index, reach) + 1) if i not in scanned]
+                scanned.update(zip(batch, match([strategies[i] for i in batch])))
+            return scanned[index]
+
+        results: List[Dict] = []
+        winner = NO_MATCH
+        claimed = False
+        deepest = 0
+        for index, strategy in enumerate(strategies):
+            if strategy.kind == 'pods':
+                # Hanya selector pod pertama yang menemukan elemen yang dipakai
+                if claimed:
+                    continue
+            elif results:
+                break
+            deepest = index
+            elements = candidates(index)
+            if not elements:
+                continue
+            claimed = claimed or strategy.kind == 'pods'
+            found = extract(strategy, elements)
+            if found:
+                results, winner = found, strategy.name
+
+        self._depth = deepest
+        seconds = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats[winner]
+            stats[0] += 1
+            stats[1] += seconds
+        return StrategyMatch(results, winner, seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Jumlah dokumen (hits) dan total detik per strategi yang menang."""
+        with self._lock:
+            return {name: {'hits': hits, 'seconds': seconds}
+                    for name, (hits, seconds) in self._stats.items()}
@@ -0,0 +1,297 @@
+"""
+Formula Index untuk WolframAlpha Scraper
+Inverted index persisten (SQLite) atas judul pod, token content, dan simbol rumus
+dari file hasil (save_results / JSONL), sehingga pencarian tidak perlu memuat
+dan memindai semua file.
+Persistent (SQLite) inverted index over pod titles, content tokens and formula
+symbols from result files (save_results / JSONL), so lookups do not need to load
+and scan every file.
+
+Ingest bersifat inkremental: file JSONL hanya dibaca dari offset terakhir, file
+lain dilewati jika ukuran dan mtime tidak berubah, dan query yang sama
+menggantikan dokumen lamanya.
+Ingestion is incremental: JSONL files are only read from the last offset, other
+files are skipped when their size and mtime are unchanged, and re-ingesting a
+query replaces its previous document.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from result_writers import is_jsonl, iter_results
+from wolframalpha_scraper import normalize_query
+
+
+# Field yang diindeks untuk setiap pod
+INDEX_FIELDS = ('title', 'content', 'formula')
+
+# Kata untuk judul/content; untuk rumus setiap simbol non-spasi juga menjadi token
+_WORD = re.compile(r'\w+')
+_SYMBOL = re.compile(r'\w+|[^\w\s]')
+
+
+def tokenize(text: str, symbols: bool = False) -> List[str]:
+    """
+    Pecah teks menjadi token (casefold); symbols=True juga menghasilkan operator
+    seperti '=', '^', '√' sebagai token tersendiri.
+    """
+    return (_SYMBOL if symbols else _WORD).findall(text.casefold())
+
+
+def _pod_terms(pod: Dict) -> Set[Tuple[str, str]]:
+    """Pasangan (term, field) unik untuk satu pod."""
+    terms = set()
+    for term in tokenize(pod.get('title') or ''):
+        terms.add((term, 'title'))
+    for text in pod.get('content') or ():
+        for term in tokenize(text):
+            terms.add((term, 'content'))
+    for formula in pod.get('formulas') or ():
+        for term in tokenize(formula, symbols=True):
+            terms.add((term, 'formula'))
+    return terms
+
+
+class FormulaIndex:
+    """
+    Inverted index hasil scraping yang disimpan di file SQLite.
+    Inverted index of scrape results stored in a SQLite file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): File database index (direktori induk dibuat jika belum ada)
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS documents ('
+            ' id INTEGER PRIMARY KEY,'
+            ' key TEXT UNIQUE NOT NULL,'
+            ' query TEXT NOT NULL,'
+            ' url TEXT,'
+            ' source TEXT,'
+            ' pods TEXT NOT NULL)'
+        )
+        # Posting per pod; kunci utama (term, field, doc, pod) sekaligus menjadi index lookup
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS postings ('
+            ' term TEXT NOT NULL,'
+            ' field TEXT NOT NULL,'
+            ' doc_id INTEGER NOT NULL,'
+            ' pod INTEGER NOT NULL,'
+            ' PRIMARY KEY (term, field, doc_id, pod)) WITHOUT ROWID'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sources ('
+            ' path TEXT PRIMARY KEY,'
+            ' size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL,'
+            ' offset INTEGER NOT NULL)'
+        )
+        self._conn.commit()
+
+    def add(self, results: Iterable[Dict], source: Optional[str] = None) -> int:
+        """
+        Indeks hasil dalam satu transaksi; query yang sudah ada diganti.
+        Index results in a single transaction; existing queries are replaced.
+
+        Args:
+            results (Iterable[Dict]): Hasil search_formula (atau models.SearchResult)
+            source (str): Asal hasil, disimpan untuk ditampilkan saat pencarian
+
+        Returns:
+            int: Jumlah hasil yang diindeks
+        """
+        with self._lock:
+            try:
+                count = self._add(results, source)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return count
+
+    def _add(self, results: Iterable[Dict], source: Optional[str]) -> int:
+        """Indeks hasil tanpa commit (lock harus dipegang)."""
+        count = 0
+        for result in results:
+            if hasattr(result, 'to_dict'):
+                result = result.to_dict()
+            pods = result.get('results') or []
+            if not pods:
+                # Hasil gagal tidak menggantikan hasil lama yang sukses
+                continue
+
+            key = normalize_query(result['query'])
+            row = self._conn.execute('SELECT id FROM documents WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                self._conn.execute('DELETE FROM postings WHERE doc_id = ?', (row[0],))
+                self._conn.execute('DELETE FROM documents WHERE id = ?', (row[0],))
+
+            cursor = self._conn.execute(
+                'INSERT INTO documents (key, query, url, source, pods) VALUES (?, ?, ?, ?, ?)',
+                (key, result['query'], result.get('url'), source,
+                 json.dumps(pods, ensure_ascii=False)))
+            doc_id = cursor.lastrowid
+            self._conn.executemany(
+                'INSERT INTO postings (term, field, doc_id, pod) VALUES (?, ?, ?, ?)',
+                [(term, field, doc_id, i)
+                 for i, pod in enumerate(pods) for term, field in _pod_terms(pod)])
+            count += 1
+        return count
+
+    def ingest_file(self, filename: str) -> int:
+        """
+        Indeks file hasil (.json dari save_results, atau .jsonl / .jsonl.gz) secara inkremental.
+        Incrementally index a result file (.json from save_results, or .jsonl / .jsonl.gz).
+
+        Args:
+            filename (str): File hasil
+
+        Returns:
+            int: Jumlah hasil baru yang diindeks (0 jika file tidak berubah)
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT size, mtime_ns, offset FROM sources WHERE path = ?', (path,)).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return 0
+
+        offset = stat.st_size
+        if is_jsonl(path) and not path.endswith('.gz'):
+            # JSON Lines biasa hanya bertambah: lanjutkan dari offset terakhir,
+            # kecuali file menyusut (ditulis ulang)
+            start = offset = row[2] if row is not None and row[2] <= stat.st_size else 0
+
+            def read():
+                nonlocal offset
+                for result, offset in _iter_jsonl_from(path, start):
+                    if result is not None:
+                        yield result
+            results = read()
+        else:
+            results = iter_results(path)
+
+        with self._lock:
+            try:
+                count = self._add(results, path)
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO sources (path, size, mtime_ns, offset) VALUES (?, ?, ?, ?)',
+                    (path, stat.st_size, stat.st_mtime_ns, offset))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return count
+
+    def search(self, text: str, fields: Sequence[str] = INDEX_FIELDS,
+               limit: int = 20) -> List[Dict]:
+        """
+        Cari pod yang memuat semua token dari teks pencarian.
+        Find pods containing every token of the search text.
+
+        Args:
+            text (str): Teks pencarian, misal "x^2" atau "pythagorean"
+            fields (Sequence[str]): Field yang dicari (title, content, formula)
+            limit (int): Jumlah dokumen maksimum
+
+        Returns:
+            List[Dict]: Per dokumen: query, url, source, dan pods yang cocok
+        """
+        unknown = set(fields).difference(INDEX_FIELDS)
+        if unknown:
+            raise ValueError(f"Field index tidak dikenal: {', '.join(sorted(unknown))} "
+                             f"(pilihan: {', '.join(INDEX_FIELDS)})")
+        symbols = 'formula' in fields
+        terms = sorted(set(tokenize(text, symbols=symbols)))
+        if not terms or not fields:
+            return []
+
+        term_marks = ','.join('?' * len(terms))
+        field_marks = ','.join('?' * len(fields))
+        # Semua token harus ada di pod yang sama (di field mana pun yang dipilih)
+        matched: Dict[int, List[int]] = {}
+        with self._lock:
+            cursor = self._conn.execute(
+                f'SELECT doc_id, pod FROM postings WHERE term IN ({term_marks})'
+                f' AND field IN ({field_marks})'
+                ' GROUP BY doc_id, pod HAVING COUNT(DISTINCT term) = ? ORDER BY doc_id, pod',
+                (*terms, *fields, len(terms)))
+            for doc_id, pod in cursor:
+                if doc_id not in matched and len(matched) == limit:
+                    break
+                matched.setdefault(doc_id, []).append(pod)
+            cursor.close()
+            if not matched:
+                return []
+
+            doc_marks = ','.join('?' * len(matched))
+            rows = self._conn.execute(
+                f'SELECT id, query, url, source, pods FROM documents WHERE id IN ({doc_marks})'
+                ' ORDER BY id', list(matched)).fetchall()
+
+        hits = []
+        for doc_id, query, url, source, pods in rows:
+            pods = json.loads(pods)
+            hits.append({
+                'query': query,
+                'url': url,
+                'source': source,
+                'pods': [pods[i] for i in matched[doc_id]]
+            })
+        return hits
+
+    def stats(self) -> Dict[str, int]:
+        """Jumlah dokumen, posting, dan file sumber di index."""
+        with self._lock:
+            return {
+                'documents': self._conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0],
+                'postings': self._conn.execute('SELECT COUNT(*) FROM postings').fetchone()[0],
+                'sources': self._conn.execute('SELECT COUNT(*) FROM sources').fetchone()[0]
+            }
+
+    def close(self):
+        """Tutup koneksi database."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _iter_jsonl_from(path: str, offset: int) -> Iterator[Tuple[Optional[Dict], int]]:
+    """
+    Baca file JSON Lines mulai offset byte, menghasilkan (hasil, offset setelah baris).
+    Baris kosong/rusak menghasilkan None; baris terakhir tanpa newline belum lengkap
+    dan dibaca lagi di ingest berikutnya.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            try:
+                yield (json.loads(line) if line.strip() else None), offset
+            except json.JSONDecodeError:
+                yield None, offset
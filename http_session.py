@@ -0,0 +1,166 @@
+"""
+HTTP Session Pool untuk WolframAlpha Scraper
+Session per thread yang berbagi satu connection pool (keep-alive), dengan retry
+tingkat transport untuk GET dan timeout connect/read terpisah.
+Per-thread sessions sharing one connection pool (keep-alive), with
+transport-level retries for GETs and separate connect/read timeouts.
+
+requests baru dimuat saat session atau adapter pertama dibuat (request pertama),
+bukan saat modul diimpor.
+requests is only loaded when the first session or adapter is built (the first
+request), not at import time.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+
+# (connect, read) dalam detik
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+# Status yang diulang di tingkat transport. 429/503 sengaja tidak termasuk:
+# keduanya ditangani rate limiter (backoff dan Retry-After)
+RETRY_STATUSES = (500, 502, 504)
+
+# Ukuran pool minimum (sama dengan default requests)
+DEFAULT_POOL_SIZE = 10
+
+
+def request_errors() -> type:
+    """
+    Kelas dasar exception requests, untuk klausa except:
+    ``except request_errors() as e`` hanya dievaluasi saat ada exception, jadi
+    requests tidak dimuat di jalur tanpa network (misal cache hit).
+    """
+    import requests
+    return requests.exceptions.RequestException
+
+
+def build_retry(retries: int = 3, backoff_factor: float = 0.5) -> 'Retry':
+    """
+    Kebijakan retry urllib3 untuk request idempoten (GET/HEAD).
+    urllib3 retry policy for idempotent requests (GET/HEAD).
+
+    Args:
+        retries (int): Jumlah percobaan ulang maksimum (0 = nonaktif)
+        backoff_factor (float): Faktor backoff eksponensial dalam detik
+    """
+    from urllib3.util.retry import Retry
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        other=0,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        # Response terakhir dikembalikan apa adanya, raise_for_status yang menilai
+        raise_on_status=False
+    )
+
+
+def build_adapter(pool_size: int = DEFAULT_POOL_SIZE, retries: int = 3,
+                  backoff_factor: float = 0.5) -> 'HTTPAdapter':
+    """HTTPAdapter dengan pool berukuran pool_size dan kebijakan retry."""
+    from requests.adapters import HTTPAdapter
+    return HTTPAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=pool_size,
+                       max_retries=build_retry(retries, backoff_factor))
+
+
+class SessionPool:
+    """
+    Memberikan satu requests.Session per thread; semua session memakai adapter
+    (connection pool) yang sama sehingga koneksi dan TLS handshake dipakai ulang.
+    Hands out one requests.Session per thread; all sessions mount the same adapter
+    (connection pool), so connections and TLS handshakes are reused.
+
+    Header disimpan di satu dict bersama: mengubah header lewat session mana pun
+    berlaku untuk semua thread.
+    Headers live in one shared dict: updating them through any session applies
+    to every thread.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 retries: int = 3, backoff_factor: float = 0.5):
+        """
+        Args:
+            headers (Dict[str, str]): Header default untuk semua request
+            pool_size (int): Jumlah koneksi maksimum per host
+            retries (int): Jumlah retry transport (connect/read/5xx)
+            backoff_factor (float): Faktor backoff retry dalam detik
+        """
+        self._initial_headers = dict(headers or {})
+        self._headers = None
+        self.pool_size = max(1, pool_size)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._adapter = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def headers(self):
+        """Header bersama (CaseInsensitiveDict), dibuat saat pertama dipakai."""
+        if self._headers is None:
+            from requests.structures import CaseInsensitiveDict
+            with self._lock:
+                if self._headers is None:
+                    self._headers = CaseInsensitiveDict(self._initial_headers)
+        return self._headers
+
+    @property
+    def adapter(self) -> 'HTTPAdapter':
+        """Adapter (connection pool) saat ini, dibuat saat pertama dipakai."""
+        if self._adapter is None:
+            with self._lock:
+                if self._adapter is None:
+                    self._adapter = build_adapter(self.pool_size, self.retries, self.backoff_factor)
+        return self._adapter
+
+    def get(self) -> 'requests.Session':
+        """Session untuk thread saat ini (dibuat saat pertama kali dipakai)."""
+        local = self._local
+        session = getattr(local, 'session', None)
+        adapter = self.adapter
+        if session is None:
+            import requests
+            session = requests.Session()
+            session.headers = self.headers
+            local.session = session
+        if getattr(local, 'adapter', None) is not adapter:
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            local.adapter = adapter
+        return session
+
+    def resize(self, pool_size: int):
+        """
+        Perbesar pool agar cukup untuk pool_size worker bersamaan.
+        Grow the pool so it can serve pool_size concurrent workers.
+
+        Pool tidak pernah diperkecil. Session yang sudah ada pindah ke adapter
+        baru pada request berikutnya; koneksi lama ditutup oleh garbage collector.
+        The pool never shrinks. Existing sessions switch to the new adapter on
+        their next request; old connections are closed by the garbage collector.
+        """
+        with self._lock:
+            if pool_size > self.pool_size:
+                self.pool_size = pool_size
+                # Adapter yang belum dibuat cukup memakai ukuran baru saat dibuat
+                if self._adapter is not None:
+                    self._adapter = build_adapter(pool_size, self.retries, self.backoff_factor)
+
+    def close(self):
+        """Tutup semua koneksi di pool."""
+        if self._adapter is not None:
+            self._adapter.close()
@@ -0,0 +1,161 @@
+"""
+Interactive Session untuk WolframAlpha Scraper
+Sesi mode interaktif yang tidak memblokir prompt: query dikerjakan worker di
+background, hasil dikirim ke callback begitu selesai, query yang diulang diambil
+dari cache sesi, dan daftar query bisa di-prefetch.
+Non-blocking interactive session: queries run on background workers, results go
+to a callback as they complete, repeated queries come from a per-session cache,
+and lists of queries can be prefetched. Failed queries are not cached, so asking
+again retries them.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from wolframalpha_scraper import cache_key, normalize_fields
+
+
+class _Entry:
+    """Satu query unik di sesi: future hasil dan apakah hasilnya ditunggu untuk ditampilkan."""
+
+    def __init__(self, key: str, query: str, future: Future):
+        self.key = key
+        self.query = query
+        self.future = future
+        self.wanted = False
+
+
+class InteractiveSession:
+    """
+    Menjalankan query mode interaktif di background dengan cache per sesi.
+    Runs interactive-mode queries in the background with a per-session cache.
+    """
+
+    def __init__(self, scraper, delay: float = 2.0, fields: Optional[Iterable[str]] = None,
+                 workers: int = 1, on_result: Optional[Callable[[Dict, bool], None]] = None):
+        """
+        Args:
+            scraper: WolframAlphaScraper (atau daemon_client.DaemonClient)
+            delay (float): Jarak minimum antar request, dijaga rate limiter scraper
+            fields (Iterable[str]): Field pod yang diekstrak (default: semua)
+            workers (int): Jumlah query yang dikerjakan bersamaan
+            on_result (Callable[[Dict, bool], None]): Dipanggil dengan (hasil, background)
+                untuk setiap query yang diminta; background=True jika dipanggil dari
+                thread worker (prompt perlu ditampilkan ulang)
+        """
+        self.scraper = scraper
+        self.delay = delay
+        self.fields = normalize_fields(fields)
+        self.on_result = on_result or (lambda result, background: None)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._entries: Dict[str, _Entry] = {}
+        # Error terakhir per query yang gagal, untuk results() (tidak dipakai sebagai cache)
+        self._failed: Dict[str, Dict] = {}
+        # Reentrant: callback future yang sudah selesai dijalankan langsung oleh
+        # add_done_callback, saat lock masih dipegang _entry
+        self._lock = threading.RLock()
+
+    def submit(self, query: str) -> str:
+        """
+        Minta hasil query; hasil dikirim ke on_result (langsung jika sudah ada di cache
+        sesi, selain itu saat worker selesai).
+        Request a query; its result goes to on_result immediately when cached in
+        the session, otherwise when the worker finishes.
+
+        Returns:
+            str: 'cached' (hasil dari cache sesi sudah dikirim), 'running' (query
+                yang sama sedang berjalan), atau 'started' (query baru dimulai)
+        """
+        with self._lock:
+            entry, started = self._entry(query)
+            ready = entry.future.done()
+            if not ready:
+                entry.wanted = True
+        if ready:
+            self.on_result(self._result(entry), False)
+            return 'cached'
+        return 'started' if started else 'running'
+
+    def prefetch(self, queries: Iterable[str]) -> int:
+        """
+        Mulai query di background tanpa menampilkan hasilnya; saat nanti diminta
+        dengan submit, hasil langsung tersedia.
+        Start queries in the background without showing them, so a later submit
+        is answered from the session cache.
+
+        Returns:
+            int: Jumlah query baru yang dimulai
+        """
+        started = 0
+        with self._lock:
+            for query in queries:
+                query = query.strip()
+                if query:
+                    started += self._entry(query)[1]
+        return started
+
+    def pending(self) -> int:
+        """Jumlah query yang masih dikerjakan."""
+        with self._lock:
+            return sum(not entry.future.done() for entry in self._entries.values())
+
+    def results(self) -> List[Dict]:
+        """
+        Hasil yang sudah selesai, satu per query unik, urut sesuai waktu diminta;
+        query yang gagal (dan belum dicoba lagi) menyusul dengan error terakhirnya.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            failed = [result for key, result in self._failed.items() if key not in self._entries]
+        return [self._result(entry) for entry in entries if entry.future.done()
+                and not entry.future.cancelled()] + failed
+
+    def close(self, wait: bool = True):
+        """Hentikan worker; wait=False membatalkan query yang belum mulai."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(wait=exc_type is None)
+
+    def _entry(self, query: str):
+        """Entri sesi untuk query, dibuat dan dimulai jika belum ada (lock harus dipegang)."""
+        key = cache_key(query, self.fields)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry, False
+        future = self._executor.submit(self.scraper.search_formula, query,
+                                       delay=self.delay, fields=self.fields)
+        entry = self._entries[key] = _Entry(key, query, future)
+        future.add_done_callback(lambda _: self._finished(entry))
+        return entry, True
+
+    def _finished(self, entry: _Entry):
+        result = None if entry.future.cancelled() else self._result(entry)
+        with self._lock:
+            wanted, entry.wanted = entry.wanted, False
+            if result is not None and result['status'] == 'error':
+                # Error (misal timeout atau daemon mati) tidak disimpan di cache sesi,
+                # sehingga submit berikutnya untuk query ini mencoba lagi
+                if self._entries.get(entry.key) is entry:
+                    del self._entries[entry.key]
+                self._failed[entry.key] = result
+            elif result is not None:
+                self._failed.pop(entry.key, None)
+        if wanted and result is not None:
+            self.on_result(result, True)
+
+    @staticmethod
+    def _result(entry: _Entry) -> Dict:
+        """Hasil future; exception (misal daemon mati) menjadi result berstatus error."""
+        error = entry.future.exception()
+        if error is None:
+            return entry.future.result()
+        return {'query': entry.query, 'url': '', 'results': [], 'status': 'error',
+                'error': f'Error: {error}'}
@@ -0,0 +1,456 @@
+"""
+Lxml Extractor untuk WolframAlpha Scraper
+Parser cepat berbasis lxml langsung dengan matcher yang sudah dikompilasi
+(lihat extraction_strategies).
+Fast parser working on lxml directly with precompiled matchers (see
+extraction_strategies).
+
+lxml baru dimuat saat dokumen pertama di-parse, sehingga konstanta dan keep_pod
+bisa diimpor tanpa biaya startup lxml.
+lxml is only loaded when the first document is parsed, so the constants and
+keep_pod can be imported without paying lxml's startup cost.
+
+Menghasilkan dict pod yang sama persis dengan jalur BeautifulSoup
+(_extract_results / _extract_pod_data), tanpa membangun pohon BeautifulSoup.
+Produces exactly the same pod dicts as the BeautifulSoup path
+(_extract_results / _extract_pod_data) without building a BeautifulSoup tree.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import functools
+import itertools
+import json
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from extraction_strategies import StrategyMatch, StrategySelector, match_lxml
+
+
+# Karakter yang menandakan alt text gambar berisi rumus
+FORMULA_CHARS = ('=', '+', '-', '*', '/', '^', '∫', '∑', 'x', 'y')
+
+# Kelas CSS section pod (strategi 'sections' di extraction_strategies)
+_POD_CLASS = '_2vZr'
+
+# Jumlah byte awal dokumen yang diperiksa untuk deklarasi charset
+_CHARSET_SNIFF_SIZE = 2048
+
+# Deklarasi charset di awal dokumen (meta charset / http-equiv)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset', re.IGNORECASE)
+
+# Tag yang string-nya diabaikan oleh get_text di BeautifulSoup
+_SKIPTEXT_TAGS = frozenset(['script', 'style', 'template'])
+
+# Tag yang dipakai saat ekstraksi pod
+TITLE_TAGS = frozenset(['h2', 'h3', 'h4'])
+TEXT_TAGS = frozenset(['p', 'span', 'div'])
+
+# Field pod yang bisa dipilih lewat fields= (None = semua)
+FIELDS = ('title', 'content', 'images', 'formulas')
+
+# Batas ekstraksi dari script JSON (lihat extract_json_pods)
+MAX_SCRIPT_CHARS = 8 * 1024 * 1024   # script lebih besar dilewati tanpa di-decode
+MAX_JSON_DEPTH = 32                  # kedalaman maksimum pencarian objek pod
+MAX_JSON_PODS = 200                  # pod per halaman
+MAX_JSON_SUBPODS = 50                # subpod per pod
+MAX_JSON_TEXT = 4096                 # karakter per string (sisanya dipotong)
+
+# Penanda objek pod di JSON; script tanpa penanda ini tidak di-decode
+_JSON_POD_MARKER = '"subpods"'
+
+
+def _append_stripped(parts: List[str], text: Optional[str]):
+    """Tambahkan teks yang sudah di-strip jika tidak kosong."""
+    if text:
+        text = text.strip()
+        if text:
+            parts.append(text)
+
+
+def _start_parts(elem) -> List[str]:
+    """Potongan teks awal sebuah elemen (teks sebelum anak pertamanya)."""
+    parts: List[str] = []
+    _append_stripped(parts, elem.text)
+    return parts
+
+
+def _element_text(elem) -> str:
+    """Teks elemen seperti get_text(strip=True), tanpa rekursi."""
+    parts = _start_parts(elem)
+    frames = [(elem, iter(elem))]
+    while frames:
+        node, children = frames[-1]
+        child = next(children, None)
+        if child is None:
+            frames.pop()
+            if frames:
+                _append_stripped(parts, node.tail)
+            continue
+        tag = child.tag
+        if not isinstance(tag, str) or tag in _SKIPTEXT_TAGS:
+            _append_stripped(parts, child.tail)
+            continue
+        _append_stripped(parts, child.text)
+        frames.append((child, iter(child)))
+    return ''.join(parts)
+
+
+def _add_image(pod_data: Dict, img_src: str, img_alt: str,
+               fields: Optional[FrozenSet[str]] = None):
+    """Catat gambar dan rumus dari alt text-nya (hanya field yang dipilih)."""
+    if img_src and (fields is None or 'images' in fields):
+        pod_data['images'].append({
+            'src': img_src,
+            'alt': img_alt
+        })
+    if (img_alt and (fields is None or 'formulas' in fields)
+            and any(char in img_alt for char in FORMULA_CHARS)):
+        pod_data['formulas'].append(img_alt)
+
+
+def keep_pod(pod_data: Dict, fields: Optional[FrozenSet[str]] = None) -> bool:
+    """
+    Apakah pod layak dikembalikan: ada title, content, atau formula; jika
+    field dipilih, pod yang hanya berisi gambar juga dipertahankan.
+    """
+    return bool(pod_data['title'] or pod_data['content'] or pod_data['formulas']
+                or (fields is not None and pod_data['images']))
+
+
+@functools.lru_cache(maxsize=None)
+def _json_loads():
+    """Decoder JSON tercepat yang tersedia: orjson jika terpasang, selain itu json."""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+def _json_text(value) -> str:
+    """String JSON yang sudah di-strip dan dibatasi MAX_JSON_TEXT (selain string -> '')."""
+    return value.strip()[:MAX_JSON_TEXT] if isinstance(value, str) else ''
+
+
+def _iter_json_pods(data):
+    """Objek pod (dict dengan list 'subpods') dalam urutan dokumen, sampai MAX_JSON_DEPTH."""
+    stack = [(data, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get('subpods'), list):
+                yield node
+                continue
+            children = list(node.values())
+        else:
+            children = node
+        if depth < MAX_JSON_DEPTH:
+            stack.extend((child, depth + 1) for child in reversed(children)
+                         if isinstance(child, (dict, list)))
+
+
+def _json_pod(pod: Dict, fields: Optional[FrozenSet[str]] = None) -> Optional[Dict]:
+    """Dict pod dari objek pod JSON: title, plaintext subpod, dan gambar subpod."""
+    pod_data = {
+        'title': '',
+        'content': [],
+        'images': [],
+        'formulas': []
+    }
+    if fields is None or 'title' in fields:
+        pod_data['title'] = _json_text(pod.get('title'))
+    want_content = fields is None or 'content' in fields
+    for subpod in pod['subpods'][:MAX_JSON_SUBPODS]:
+        if not isinstance(subpod, dict):
+            continue
+        if want_content:
+            text = _json_text(subpod.get('plaintext'))
+            if text:
+                pod_data['content'].append(text)
+        img = subpod.get('img')
+        if isinstance(img, dict):
+            _add_image(pod_data, _json_text(img.get('src')), _json_text(img.get('alt')), fields)
+    return pod_data if keep_pod(pod_data, fields) else None
+
+
+def extract_json_pods(texts: Iterable[Optional[str]],
+                      fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
+    """
+    Ekstrak pod dari isi script JSON (fallback method), dipakai kedua backend parser.
+    Extract pods from JSON script contents (fallback method), shared by both parsers.
+
+    Hanya objek pod (title, subpods[].plaintext, subpods[].img) yang diambil, bukan
+    seluruh objek JSON. Script tanpa objek pod, lebih besar dari MAX_SCRIPT_CHARS,
+    atau tidak valid dilewati; jumlah pod, subpod, kedalaman, dan panjang teks
+    dibatasi konstanta MAX_JSON_*.
+    Only pod objects are read, not the whole JSON document. Scripts without pod
+    objects, larger than MAX_SCRIPT_CHARS or invalid are skipped, and pods,
+    subpods, depth and text length are bounded by the MAX_JSON_* constants.
+
+    Args:
+        texts (Iterable[Optional[str]]): Isi tag script JSON
+        fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
+
+    Returns:
+        List[Dict]: List hasil yang diekstrak
+    """
+    loads = _json_loads()
+    results: List[Dict] = []
+    for text in texts:
+        if not text or len(text) > MAX_SCRIPT_CHARS or _JSON_POD_MARKER not in text:
+            continue
+        try:
+            # orjson hanya menerima str persis (BeautifulSoup memberi subclass str)
+            data = loads(str(text) if type(text) is not str else text)
+        except (ValueError, TypeError, RecursionError):
+            continue
+        for pod in _iter_json_pods(data):
+            pod_data = _json_pod(pod, fields)
+            if pod_data:
+                results.append(pod_data)
+                if len(results) >= MAX_JSON_PODS:
+                    return results
+    return results
+
+
+class LxmlExtractor:
+    """
+    Ekstraktor hasil WolframAlpha langsung dari bytes HTML memakai lxml.
+    WolframAlpha result extractor working directly on HTML bytes with lxml.
+    """
+
+    def __init__(self, encoding: str = 'utf-8', selector: Optional[StrategySelector] = None):
+        """
+        Args:
+            encoding (str): Encoding default jika halaman tidak menyebutkannya
+            selector (StrategySelector): Strategi pencarian pod (default: STRATEGIES)
+        """
+        self.encoding = encoding
+        self.selector = selector or StrategySelector()
+
+    def parse(self, content: bytes):
+        """Parse bytes HTML menjadi pohon lxml."""
+        # Hormati charset yang dideklarasikan halaman, selain itu pakai default
+        from lxml import etree
+        encoding = None if _META_CHARSET.search(content[:_CHARSET_SNIFF_SIZE]) else self.encoding
+        parser = etree.HTMLParser(encoding=encoding)
+        return etree.fromstring(content, parser)
+
+    def extract(self, content: bytes, fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """
+        Ekstrak hasil dari HTML WolframAlpha.
+        Extract results from WolframAlpha HTML.
+
+        Args:
+            content (bytes): Body response HTML
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
+
+        Returns:
+            List[Dict]: List hasil yang diekstrak
+        """
+        root = self.parse(content)
+        if root is None:
+            return []
+        return self.extract_tree(root, fields)
+
+    def extract_tree(self, root, fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """Ekstrak hasil dari pohon lxml yang sudah di-parse."""
+        return self.select(root, fields).results
+
+    def select(self, root, fields: Optional[FrozenSet[str]] = None) -> StrategyMatch:
+        """
+        Seperti extract_tree, ditambah strategi yang menang dan durasinya.
+        Like extract_tree, plus the winning strategy and its duration.
+        """
+        def extract(strategy, elements):
+            if strategy.kind == 'scripts':
+                return self.extract_scripts(elements, fields)
+            pods = (self.extract_pod(pod, fields) for pod in elements)
+            return [pod_data for pod_data in pods if pod_data]
+
+        return self.selector.select(lambda strategies: match_lxml(root, strategies), extract)
+
+    def extract_stream(self, chunks: Iterable[bytes], fields: Optional[FrozenSet[str]] = None,
+                       max_pods: Optional[int] = None) -> List[Dict]:
+        """
+        Ekstrak hasil dari body yang datang per chunk, tanpa menunggu seluruh dokumen.
+        Extract results from a body arriving in chunks, without waiting for the
+        whole document.
+
+        Pod diekstrak begitu section-nya ditutup lalu dikosongkan agar memori tidak
+        menumpuk; iterasi chunk berhenti begitu max_pods pod ditemukan. Hasilnya
+        sama dengan extract() untuk dokumen yang sama (dipotong ke max_pods).
+        Pods are extracted as their sections close and then cleared to keep memory
+        flat; chunk iteration stops once max_pods pods are found. The output equals
+        extract() on the same document (truncated to max_pods).
+
+        Args:
+            chunks (Iterable[bytes]): Potongan body response HTML
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
+            max_pods (int): Berhenti setelah pod sebanyak ini ditemukan (None = semua)
+
+        Returns:
+            List[Dict]: List hasil yang diekstrak
+        """
+        from lxml import etree
+
+        # Encoding ditentukan dari awal dokumen, sama seperti parse()
+        chunks = iter(chunks)
+        head = b''
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= _CHARSET_SNIFF_SIZE:
+                break
+        if not head:
+            return []
+        encoding = None if _META_CHARSET.search(head[:_CHARSET_SNIFF_SIZE]) else self.encoding
+        parser = etree.HTMLPullParser(events=('start', 'end'), tag='section', encoding=encoding)
+
+        found = []        # (urutan dokumen, pod) - section bersarang selesai lebih dulu
+        open_pods = []    # (urutan dokumen, elemen) section pod yang belum ditutup
+        count = 0
+        for chunk in itertools.chain([head], chunks):
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    if _POD_CLASS in (elem.get('class') or '').split():
+                        open_pods.append((count, elem))
+                        count += 1
+                    continue
+                if not open_pods or open_pods[-1][1] is not elem:
+                    continue
+
+                order, _ = open_pods.pop()
+                pod_data = self.extract_pod(elem, fields)
+                if pod_data:
+                    found.append((order, pod_data))
+                    # Section luar masih membutuhkan isi section bersarang
+                    if not open_pods:
+                        elem.clear(keep_tail=True)
+                if max_pods is not None and not open_pods and len(found) >= max_pods:
+                    found.sort(key=lambda item: item[0])
+                    return [pod for _, pod in found[:max_pods]]
+
+        root = parser.close()
+        if found:
+            found.sort(key=lambda item: item[0])
+            results = [pod for _, pod in found]
+        else:
+            # Tidak ada pod dari section (section kosong tidak dikosongkan):
+            # strategi lain dipilih seperti extract_tree
+            results = self.extract_tree(root, fields) if root is not None else []
+        return results[:max_pods] if max_pods is not None else results
+
+    def extract_pod(self, pod, fields: Optional[FrozenSet[str]] = None) -> Optional[Dict]:
+        """
+        Ekstrak data dari pod individual.
+        Extract data from an individual pod.
+
+        Args:
+            pod: Elemen lxml dari pod
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
+
+        Returns:
+            Optional[Dict]: Data pod jika berhasil diekstrak
+        """
+        pod_data = {
+            'title': '',
+            'content': [],
+            'images': [],
+            'formulas': []
+        }
+
+        if fields is not None and 'content' not in fields:
+            # Tanpa content tidak perlu menyusun teks setiap elemen: cukup
+            # cari tag judul dan gambar lewat iterasi lxml
+            self._extract_sparse(pod, pod_data, fields)
+            return pod_data if keep_pod(pod_data, fields) else None
+
+        want_title = fields is None or 'title' in fields
+        want_images = fields is None or 'images' in fields or 'formulas' in fields
+
+        # Satu kali jalan (post-order): teks elemen disusun dari teks anak-anaknya,
+        # sama dengan get_text(strip=True) tanpa membaca ulang subtree
+        title_elem = None
+        text_slots = {}
+        texts = []
+
+        frames = [(pod, iter(pod), _start_parts(pod))]
+        while frames:
+            node, children, parts = frames[-1]
+            child = next(children, None)
+
+            if child is None:
+                frames.pop()
+                text = ''.join(parts)
+                if node is title_elem and want_title:
+                    pod_data['title'] = text
+                slot = text_slots.get(node)
+                if slot is not None:
+                    texts[slot] = text
+                if frames:
+                    parent_parts = frames[-1][2]
+                    if text:
+                        parent_parts.append(text)
+                    _append_stripped(parent_parts, node.tail)
+                continue
+
+            tag = child.tag
+            # Komentar dan processing instruction punya tag non-string
+            if not isinstance(tag, str) or tag in _SKIPTEXT_TAGS:
+                _append_stripped(parts, child.tail)
+                continue
+
+            if tag in TITLE_TAGS and title_elem is None:
+                title_elem = child
+            elif tag in TEXT_TAGS:
+                # Slot disimpan dalam urutan dokumen, diisi saat elemen selesai
+                text_slots[child] = len(texts)
+                texts.append('')
+            elif tag == 'img' and want_images:
+                _add_image(pod_data, child.get('src', ''), child.get('alt', ''), fields)
+            frames.append((child, iter(child), _start_parts(child)))
+
+        # Dedup dengan set, urutan pertama kali muncul dipertahankan
+        seen = set()
+        for text in texts:
+            if len(text) > 2 and text not in seen:
+                seen.add(text)
+                pod_data['content'].append(text)
+
+        # Hanya return jika ada content
+        if keep_pod(pod_data, fields):
+            return pod_data
+
+        return None
+
+    @staticmethod
+    def _extract_sparse(pod, pod_data: Dict, fields: FrozenSet[str]):
+        """Isi title dan gambar/formula tanpa menyapu teks seluruh pod."""
+        tags = []
+        if 'title' in fields:
+            tags.extend(TITLE_TAGS)
+        if 'images' in fields or 'formulas' in fields:
+            tags.append('img')
+        if not tags:
+            return
+
+        title_elem = None
+        for elem in pod.iter(*tags):
+            if elem.tag == 'img':
+                _add_image(pod_data, elem.get('src', ''), elem.get('alt', ''), fields)
+            elif title_elem is None:
+                title_elem = elem
+                if 'img' not in tags:
+                    break
+        if title_elem is not None:
+            pod_data['title'] = _element_text(title_elem)
+
+    def extract_scripts(self, scripts, fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """
+        Ekstrak pod dari script tags JSON (fallback method, lihat extract_json_pods).
+        Extract pods from JSON script tags (fallback method, see extract_json_pods).
+        """
+        return extract_json_pods((script.text for script in scripts), fields)
@@ -0,0 +1,206 @@
+"""
+Metrics untuk WolframAlpha Scraper
+Durasi per fase (rate limit, network, parse, ekstraksi) dan counter status,
+dengan hook yang bisa diganti dan ekspor JSON / Prometheus text.
+Per-phase durations (rate limit, network, parse, extraction) and status counters,
+behind a pluggable hook with JSON / Prometheus text export.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+# Fase yang dicatat oleh scraper
+PHASES = ('rate_limit', 'network', 'parse', 'extract', 'total')
+
+# Persentil yang dilaporkan
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class MetricsHook:
+    """
+    Hook metrics tanpa operasi (default). Turunkan class ini untuk mengirim
+    metrics ke backend lain (statsd, OpenTelemetry, ...).
+    No-op metrics hook (the default). Subclass it to forward metrics to
+    another backend (statsd, OpenTelemetry, ...).
+    """
+
+    def observe(self, phase: str, seconds: float):
+        """Catat durasi satu fase dalam detik."""
+
+    def count(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None):
+        """Tambahkan nilai ke counter."""
+
+    @contextmanager
+    def timer(self, phase: str):
+        """Context manager yang mencatat durasi blok sebagai fase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+
+class _Summary:
+    """Ringkasan durasi: count/sum/min/max tepat, persentil dari reservoir sample."""
+
+    def __init__(self, reservoir_size: int, rng: random.Random):
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.samples: List[float] = []
+        self._reservoir_size = reservoir_size
+        self._rng = rng
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        # Reservoir sampling agar memori tetap konstan untuk batch besar
+        if len(self.samples) < self._reservoir_size:
+            self.samples.append(value)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < self._reservoir_size:
+                self.samples[slot] = value
+
+    def to_dict(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        data = {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else 0.0
+        }
+        for q in QUANTILES:
+            data[f"p{int(q * 100)}"] = _quantile(ordered, q)
+        return data
+
+
+class Metrics(MetricsHook):
+    """
+    Pengumpul metrics in-memory yang thread-safe.
+    Thread-safe in-memory metrics collector.
+    """
+
+    def __init__(self, reservoir_size: int = 10000, namespace: str = 'wolframalpha_scraper'):
+        """
+        Args:
+            reservoir_size (int): Jumlah sample maksimum per fase untuk persentil
+            namespace (str): Prefix nama metric di output Prometheus
+        """
+        self.reservoir_size = reservoir_size
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self._phases: Dict[str, _Summary] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._started = time.time()
+
+    def observe(self, phase: str, seconds: float):
+        with self._lock:
+            summary = self._phases.get(phase)
+            if summary is None:
+                summary = self._phases[phase] = _Summary(self.reservoir_size, self._rng)
+            summary.add(seconds)
+
+    def count(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None):
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        """Nilai counter saat ini (0 jika belum pernah dicatat)."""
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def to_dict(self) -> Dict:
+        """
+        Snapshot metrics sebagai dict (format JSON).
+        Snapshot of the metrics as a dict (JSON format).
+        """
+        with self._lock:
+            phases = {phase: summary.to_dict() for phase, summary in self._phases.items()}
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+        return {
+            'started_at': self._started,
+            'elapsed_seconds': time.time() - self._started,
+            'phases': phases,
+            'counters': counters
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Snapshot metrics dalam format Prometheus text exposition.
+        Snapshot of the metrics in the Prometheus text exposition format.
+        """
+        data = self.to_dict()
+        ns = self.namespace
+        lines = [f"# HELP {ns}_phase_seconds Durasi per fase scraping",
+                 f"# TYPE {ns}_phase_seconds summary"]
+        for phase, summary in sorted(data['phases'].items()):
+            for q in QUANTILES:
+                lines.append(f'{ns}_phase_seconds{{phase="{phase}",quantile="{q}"}} '
+                             f'{summary[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'{ns}_phase_seconds_sum{{phase="{phase}"}} {summary["sum"]:.6f}')
+            lines.append(f'{ns}_phase_seconds_count{{phase="{phase}"}} {summary["count"]}')
+
+        typed = set()
+        for counter in data['counters']:
+            metric = f"{ns}_{counter['name']}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            labels = ','.join(f'{k}="{_escape_label(v)}"' for k, v in counter['labels'].items())
+            value = counter['value']
+            value = int(value) if float(value).is_integer() else value
+            lines.append(f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, filename: str):
+        """
+        Simpan metrics ke file: Prometheus text untuk .prom/.txt, selain itu JSON.
+        Save metrics to a file: Prometheus text for .prom/.txt, JSON otherwise.
+        """
+        with open(filename, 'w', encoding='utf-8') as f:
+            if filename.endswith(('.prom', '.txt')):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary_lines(self) -> List[str]:
+        """Ringkasan singkat per fase untuk ditampilkan di console."""
+        phases = self.to_dict()['phases']
+        # Fase bawaan scraper lebih dulu, sesuai urutan di PHASES
+        order = sorted(phases, key=lambda p: (PHASES.index(p) if p in PHASES else len(PHASES), p))
+        lines = []
+        for phase in order:
+            summary = phases[phase]
+            lines.append(f"{phase:<12} n={summary['count']:<6} p50={summary['p50'] * 1000:.1f}ms "
+                         f"p95={summary['p95'] * 1000:.1f}ms p99={summary['p99'] * 1000:.1f}ms")
+        return lines
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    """Persentil nearest-rank dari list yang sudah diurutkan."""
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered), max(1, math.ceil(q * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,166 @@
+"""
+Model Hasil untuk WolframAlpha Scraper
+Model ringkas berbasis __slots__ untuk hasil, pod, dan gambar. Dipakai saat
+banyak hasil ditahan di memori; format dict/JSON tetap sama lewat to_dict().
+Compact __slots__ models for results, pods and images. Used when many results
+are kept in memory; the dict/JSON format is unchanged via to_dict().
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import sys
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern string yang sering berulang (judul pod, status, pesan error)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _share(value: str, strings: Dict[str, str]) -> str:
+    """
+    Pakai satu objek untuk string yang sama di dalam satu hasil.
+    Use one object for equal strings within a single result.
+
+    Teks sel tabel dan alt gambar (yang juga menjadi formula) berulang berkali-kali
+    di satu halaman; setelah decode JSON masing-masing menjadi objek terpisah.
+    """
+    return strings.setdefault(value, value)
+
+
+class Image:
+    """
+    Gambar di dalam pod.
+    An image inside a pod.
+    """
+
+    __slots__ = ('src', 'alt')
+
+    def __init__(self, src: str, alt: str = ''):
+        self.src = src
+        self.alt = alt
+
+    @classmethod
+    def from_dict(cls, data: Dict, strings: Optional[Dict[str, str]] = None) -> 'Image':
+        if strings is None:
+            strings = {}
+        return cls(_share(data['src'], strings), _share(data['alt'], strings))
+
+    def to_dict(self) -> Dict:
+        return {'src': self.src, 'alt': self.alt}
+
+    def __eq__(self, other):
+        if not isinstance(other, Image):
+            return NotImplemented
+        return (self.src, self.alt) == (other.src, other.alt)
+
+    def __repr__(self):
+        return f"Image(src={self.src!r}, alt={self.alt!r})"
+
+
+class Pod:
+    """
+    Satu pod (section hasil) WolframAlpha.
+    A single WolframAlpha pod (result section).
+    """
+
+    __slots__ = ('title', 'content', 'images', 'formulas')
+
+    def __init__(self, title: str = '', content: Iterable[str] = (),
+                 images: Iterable[Image] = (), formulas: Iterable[str] = ()):
+        # Judul seperti "Input interpretation" berulang di hampir setiap hasil
+        self.title = _intern(title)
+        self.content: Tuple[str, ...] = tuple(content)
+        self.images: Tuple[Image, ...] = tuple(images)
+        self.formulas: Tuple[str, ...] = tuple(formulas)
+
+    @classmethod
+    def from_dict(cls, data: Dict, strings: Optional[Dict[str, str]] = None) -> 'Pod':
+        if strings is None:
+            strings = {}
+        return cls(data['title'],
+                   [_share(text, strings) for text in data['content']],
+                   [Image.from_dict(image, strings) for image in data['images']],
+                   [_share(formula, strings) for formula in data['formulas']])
+
+    def to_dict(self) -> Dict:
+        return {
+            'title': self.title,
+            'content': list(self.content),
+            'images': [image.to_dict() for image in self.images],
+            'formulas': list(self.formulas)
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Pod):
+            return NotImplemented
+        return ((self.title, self.content, self.images, self.formulas) ==
+                (other.title, other.content, other.images, other.formulas))
+
+    def __repr__(self):
+        return (f"Pod(title={self.title!r}, content={len(self.content)}, "
+                f"images={len(self.images)}, formulas={len(self.formulas)})")
+
+
+class SearchResult:
+    """
+    Hasil pencarian satu query, padanan dict dari search_formula.
+    The result of one query, the counterpart of the search_formula dict.
+    """
+
+    __slots__ = ('query', 'url', 'results', 'status', 'error')
+
+    def __init__(self, query: str, url: str = '', results: Iterable[Pod] = (),
+                 status: str = 'pending', error: Optional[str] = None):
+        self.query = query
+        self.url = url
+        self.results: Tuple[Pod, ...] = tuple(results)
+        self.status = _intern(status)
+        self.error = _intern(error)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SearchResult':
+        """
+        Buat model dari dict hasil search_formula.
+        Build a model from a search_formula result dict.
+        """
+        strings: Dict[str, str] = {}
+        return cls(data['query'], data['url'],
+                   [Pod.from_dict(pod, strings) for pod in data['results']],
+                   data['status'], data['error'])
+
+    def to_dict(self) -> Dict:
+        """
+        Dict dengan key dan urutan yang sama dengan hasil search_formula.
+        Dict with the same keys and order as a search_formula result.
+        """
+        return {
+            'query': self.query,
+            'url': self.url,
+            'results': [pod.to_dict() for pod in self.results],
+            'status': self.status,
+            'error': self.error
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, SearchResult):
+            return NotImplemented
+        return ((self.query, self.url, self.results, self.status, self.error) ==
+                (other.query, other.url, other.results, other.status, other.error))
+
+    def __repr__(self):
+        return (f"SearchResult(query={self.query!r}, status={self.status!r}, "
+                f"results={len(self.results)})")
+
+
+def as_dict(result):
+    """Kembalikan dict untuk model, atau objek apa adanya jika sudah dict."""
+    return result.to_dict() if hasattr(result, 'to_dict') else result
+
+
+def json_default(obj):
+    """Argumen default= untuk json.dump agar model bisa diserialisasi langsung."""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,259 @@
+"""
+Fetch/Parse Pipeline untuk WolframAlpha Scraper
+Pipeline dua tahap: thread I/O mengambil body response, process pool menjalankan
+ekstraksi (CPU-bound) sehingga parsing tidak terserialisasi oleh GIL.
+Two-stage pipeline: I/O threads fetch response bodies and a process pool runs the
+CPU-bound extraction, so parsing is not serialized by the GIL.
+
+    queries -> [fetch_queue] -> fetch threads -> [parse_queue] -> process pool -> hasil
+
+Kedua antrian dibatasi ukurannya: jika process pool tertinggal, thread fetch
+berhenti sementara (backpressure) sehingga body tidak menumpuk di memori.
+Both queues are bounded: when the process pool falls behind, fetch threads block
+(backpressure) so bodies do not pile up in memory.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional, Tuple
+
+from wolframalpha_scraper import _cacheable, cache_key, extract_results_timed
+
+
+# Penanda akhir aliran di antrian
+_DONE = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put yang bisa dibatalkan saat pipeline dihentikan."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Get yang bisa dibatalkan saat pipeline dihentikan."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+class FetchParsePipeline:
+    """
+    Menjalankan batch dengan tahap fetch (thread) dan parse (process) terpisah.
+    Runs a batch with separate fetch (thread) and parse (process) stages.
+    """
+
+    def __init__(self, scraper, fetch_workers: int = 4, parse_processes: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        """
+        Args:
+            scraper (WolframAlphaScraper): Scraper untuk tahap fetch dan cache
+            fetch_workers (int): Jumlah thread I/O
+            parse_processes (int): Jumlah process parser (default: jumlah CPU)
+            queue_size (int): Kapasitas setiap antrian (default: 2 x jumlah process)
+        """
+        self.scraper = scraper
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_processes = parse_processes or os.cpu_count() or 1
+        self.queue_size = queue_size or self.parse_processes * 2
+
+    def run(self, queries: Iterable[str], delay: float = 2.0,
+            fields: Optional[FrozenSet[str]] = None) -> Iterator[Tuple[int, Dict]]:
+        """
+        Jalankan pipeline dan hasilkan (index, result) segera setelah selesai.
+        Run the pipeline, yielding (index, result) as soon as each completes.
+
+        Args:
+            queries (Iterable[str]): Query untuk dicari (boleh generator)
+            delay (float): Jarak minimum antar request ke host dalam detik
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
+
+        Yields:
+            Tuple[int, Dict]: Index query di input dan hasilnya
+        """
+        scraper = self.scraper
+        memory_cache = scraper.memory_cache
+        stop = threading.Event()
+        fetch_queue: queue.Queue = queue.Queue(self.queue_size)
+        parse_queue: queue.Queue = queue.Queue(self.queue_size)
+        output_queue: queue.Queue = queue.Queue()
+        # Membatasi jumlah body yang sedang di-parse di process pool
+        in_flight = threading.BoundedSemaphore(self.queue_size)
+        # Kunci cache in-memory yang diklaim pipeline ini dan belum diselesaikan
+        claims = set()
+        # Diisi error BrokenProcessPool jika process parser mati
+        broken = []
+
+        def feed():
+            try:
+                for item in enumerate(queries):
+                    if not _put(fetch_queue, item, stop):
+                        return
+            finally:
+                # Akhir aliran selalu dikirim, juga jika iterasi queries gagal
+                for _ in range(self.fetch_workers):
+                    _put(fetch_queue, _DONE, stop)
+
+        def complete(index: int, result: Dict, started: float, claim=None):
+            if claim is not None:
+                key, call = claim
+                memory_cache.finish(key, call, result, cacheable=_cacheable)
+                claims.discard(claim)
+                result = scraper._copy_shared(result, result['query'])
+            scraper._record_result(result, started)
+            output_queue.put((index, result))
+
+        def shared_result(call) -> Optional[Dict]:
+            # Tunggu pemimpin singleflight; None jika pipeline dihentikan atau
+            # pemimpin gagal (query lalu diambil sendiri tanpa cache)
+            while not stop.is_set():
+                try:
+                    shared = memory_cache.wait(call, 0.1)
+                except Exception:
+                    return None
+                if shared is not None:
+                    return shared
+            return None
+
+        def fail(index: int, result: Dict, started: float, claim=None):
+            complete(index, scraper._set_error(result, f'Error: {str(broken[0])}'), started, claim)
+
+        def fetch():
+            try:
+                fetch_items()
+            finally:
+                _put(parse_queue, _DONE, stop)
+
+        def fetch_items():
+            while True:
+                item = _get(fetch_queue, stop)
+                if item is _DONE:
+                    return
+                index, query = item
+                started = time.perf_counter()
+                claim = None
+                if memory_cache is not None:
+                    # Lookup dan singleflight yang sama dengan search_formula
+                    key = cache_key(query, fields, scraper.max_pods)
+                    shared, call, leader = memory_cache.begin(key)
+                    if leader:
+                        claim = (key, call)
+                        claims.add(claim)
+                    elif shared is None:
+                        shared = shared_result(call)
+                        if stop.is_set():
+                            return
+                    if shared is not None:
+                        complete(index, scraper._copy_shared(shared, query), started)
+                        continue
+                if broken:
+                    # Tanpa process parser, jangan request query yang tidak bisa di-parse
+                    fail(index, scraper._new_result(query), started, claim)
+                    continue
+                result, response, body = scraper._fetch(query, delay, fields)
+                if response is None:
+                    # Sudah final (cache hit atau error), tidak perlu di-parse
+                    complete(index, result, started, claim)
+                elif not _put(parse_queue, (index, result, response, body, started, claim), stop):
+                    return
+
+        def parsed(future, index: int, result: Dict, response, started: float, claim):
+            try:
+                if not future.cancelled():
+                    try:
+                        results, timings = future.result()
+                        for phase, seconds in timings.items():
+                            scraper.metrics.observe(phase, seconds)
+                        result = scraper._finish(result, results, response, fields)
+                    except BrokenProcessPool as e:
+                        # Query berikutnya tidak di-request lagi (lihat fetch_items)
+                        broken.append(e)
+                        result = scraper._set_error(result, f'Error: {str(e)}')
+                    except Exception as e:
+                        result = scraper._set_error(result, f'Error: {str(e)}')
+                    complete(index, result, started, claim)
+            finally:
+                in_flight.release()
+
+        def dispatch():
+            try:
+                dispatch_items()
+            finally:
+                # Pemanggil selalu dibangunkan, juga jika pool rusak atau thread gagal
+                output_queue.put(_DONE)
+
+        def dispatch_items():
+            finished = 0
+            while finished < self.fetch_workers:
+                item = _get(parse_queue, stop)
+                if item is _DONE:
+                    if stop.is_set():
+                        return
+                    finished += 1
+                    continue
+
+                index, result, response, body, started, claim = item
+                if broken:
+                    # Sisa antrian setelah process parser mati menjadi error
+                    fail(index, result, started, claim)
+                    continue
+                while not in_flight.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                try:
+                    future = pool.submit(extract_results_timed, body, scraper.parser, fields)
+                except BrokenProcessPool as e:
+                    in_flight.release()
+                    broken.append(e)
+                    fail(index, result, started, claim)
+                    continue
+                except RuntimeError:
+                    # Pool sudah ditutup karena pemanggil berhenti lebih awal
+                    in_flight.release()
+                    return
+                future.add_done_callback(
+                    lambda f, i=index, r=result, resp=response, t=started, c=claim:
+                    parsed(f, i, r, resp, t, c))
+
+            # Tunggu semua parse selesai sebelum menandai akhir aliran
+            for _ in range(self.queue_size):
+                in_flight.acquire()
+
+        pool = ProcessPoolExecutor(max_workers=self.parse_processes)
+        threads = [threading.Thread(target=feed, daemon=True),
+                   threading.Thread(target=dispatch, daemon=True)]
+        threads += [threading.Thread(target=fetch, daemon=True) for _ in range(self.fetch_workers)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = output_queue.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Hentikan semua tahap jika iterator ditutup lebih awal; parse yang
+            # sedang berjalan dibatasi oleh in_flight sehingga shutdown cepat selesai
+            stop.set()
+            pool.shutdown(wait=True)
+            for thread in threads:
+                thread.join()
+            # Klaim yang tidak sempat di-parse dilepas agar pemanggil lain tidak menunggu
+            for key, call in list(claims):
+                memory_cache.finish(key, call, error=RuntimeError('Pipeline dihentikan'))
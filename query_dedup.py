@@ -0,0 +1,95 @@
+"""
+Query Dedup untuk WolframAlpha Scraper
+Kanonikalisasi query di tingkat batch: bentuk yang berbeda dari query yang sama
+(huruf besar/kecil, spasi, tanda baca di akhir) hanya di-request sekali, lalu
+hasilnya disebar ke setiap baris input.
+Batch-level query canonicalization: different forms of the same query (case,
+whitespace, trailing punctuation) are fetched once and the result is fanned out
+to every input line.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+
+# Aturan kanonikalisasi yang tersedia, diterapkan dalam urutan ini
+RULES = ('unicode', 'case', 'punctuation', 'whitespace')
+
+# Tanda baca akhir kalimat yang dibuang; '!' tidak termasuk karena berarti faktorial
+DEFAULT_TRAILING_PUNCTUATION = '.,;:?'
+
+
+class QueryCanonicalizer:
+    """
+    Mengubah query menjadi bentuk kanonik untuk deduplikasi batch.
+    Turns a query into its canonical form for batch deduplication.
+
+    Aturan / Rules:
+        unicode      normalisasi Unicode NFKC (misal: full-width -> ASCII)
+        case         casefold (huruf besar/kecil dianggap sama)
+        punctuation  buang tanda baca di akhir query (lihat trailing_punctuation)
+        whitespace   rapikan spasi (trim dan gabungkan spasi berulang)
+    """
+
+    def __init__(self, rules: Iterable[str] = RULES,
+                 trailing_punctuation: str = DEFAULT_TRAILING_PUNCTUATION):
+        """
+        Args:
+            rules (Iterable[str]): Aturan yang aktif, atau string dipisah koma
+            trailing_punctuation (str): Karakter yang dibuang dari akhir query
+        """
+        if isinstance(rules, str):
+            rules = rules.split(',')
+        rules = {rule.strip() for rule in rules if rule.strip()}
+        unknown = rules.difference(RULES)
+        if unknown:
+            raise ValueError(f"Aturan tidak dikenal: {', '.join(sorted(unknown))} "
+                             f"(pilihan: {', '.join(RULES)})")
+        self.rules = tuple(rule for rule in RULES if rule in rules)
+        self.trailing_punctuation = trailing_punctuation
+
+    def __call__(self, query: str) -> str:
+        if 'unicode' in self.rules:
+            query = unicodedata.normalize('NFKC', query)
+        if 'case' in self.rules:
+            query = query.casefold()
+        if 'punctuation' in self.rules:
+            # Spasi di antara tanda baca juga dibuang, misal "formula ?"
+            query = query.rstrip(self.trailing_punctuation + ' \t')
+        if 'whitespace' in self.rules:
+            query = ' '.join(query.split())
+        return query
+
+    def __repr__(self):
+        return f"QueryCanonicalizer(rules={list(self.rules)!r})"
+
+
+def group_queries(queries: Iterable[str], canonicalize) -> Tuple[List[str], List[List[int]]]:
+    """
+    Kelompokkan query berdasarkan bentuk kanoniknya.
+    Group queries by their canonical form.
+
+    Args:
+        queries (Iterable[str]): Query input
+        canonicalize (Callable[[str], str]): Fungsi kanonikalisasi
+
+    Returns:
+        Tuple[List[str], List[List[int]]]: Query unik (bentuk pertama yang muncul,
+            urutan input) dan posisi input untuk setiap query unik
+    """
+    unique: List[str] = []
+    positions: List[List[int]] = []
+    seen: Dict[str, int] = {}
+    for index, query in enumerate(queries):
+        key = canonicalize(query)
+        group = seen.get(key)
+        if group is None:
+            seen[key] = len(unique)
+            unique.append(query)
+            positions.append([index])
+        else:
+            positions[group].append(index)
+    return unique, positions
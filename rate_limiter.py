@@ -0,0 +1,232 @@
+"""
+Rate Limiter untuk WolframAlpha Scraper
+Token bucket per host dengan backoff adaptif (AIMD) dan dukungan Retry-After.
+Per-host token bucket with adaptive (AIMD) backoff and Retry-After support.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+
+# Status HTTP yang menandakan server sedang membatasi request
+THROTTLE_STATUSES = (429, 503)
+
+# Penanda untuk memakai rate bawaan limiter
+_DEFAULT_RATE = object()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse header Retry-After menjadi jumlah detik.
+    Parse a Retry-After header into a number of seconds.
+
+    Args:
+        value (str): Nilai header, berupa detik atau HTTP-date
+
+    Returns:
+        Optional[float]: Detik yang harus ditunggu, None jika tidak valid
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    # email.utils cukup berat untuk dimuat di startup, dan HTTP-date jarang dipakai
+    from email.utils import parsedate_to_datetime
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    State token bucket untuk satu host.
+    Token bucket state for a single host.
+    """
+
+    def __init__(self, rate: Optional[float], burst: float):
+        # Rate nominal dari pemanggil (None = tanpa batas) dan batas atas pemulihan
+        self.nominal = rate
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float):
+        """Tambah token sesuai waktu yang berlalu."""
+        if self.rate is None:
+            self.tokens = self.capacity
+        else:
+            elapsed = now - self.updated
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    Rate limiter token bucket per host yang aman dipakai bersama antar thread.
+    Thread-safe per-host token bucket rate limiter shared by all callers.
+
+    Rate turun secara multiplikatif saat server membalas 429/503 dan naik
+    kembali secara aditif setelah request berhasil, sampai batas rate nominal.
+    The rate decreases multiplicatively when the server answers 429/503 and
+    recovers additively after successful requests, up to the nominal rate.
+    """
+
+    def __init__(self, rate: Optional[float] = 0.5, burst: float = 1.0,
+                 decrease_factor: float = 0.5, increase_step: Optional[float] = None,
+                 min_rate: float = 0.05, jitter: float = 0.1,
+                 max_retry_after: float = 300.0):
+        """
+        Args:
+            rate (float): Rate nominal default (request/detik), None = tanpa batas
+            burst (float): Jumlah request yang boleh dikirim berturut-turut
+            decrease_factor (float): Faktor pengali rate saat di-throttle
+            increase_step (float): Kenaikan rate per request sukses (default: rate / 10)
+            min_rate (float): Rate minimum saat backoff
+            jitter (float): Fraksi jitter acak yang ditambahkan ke waktu tunggu
+            max_retry_after (float): Batas atas Retry-After yang dihormati (detik)
+        """
+        self.default_rate = rate
+        self.burst = burst
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.min_rate = min_rate
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str, rate: Optional[float]) -> TokenBucket:
+        """Ambil bucket untuk host, buat baru jika belum ada (lock harus dipegang)."""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate, self.burst)
+            self._buckets[host] = bucket
+        elif rate != bucket.nominal:
+            # Rate nominal berubah (misal delay berbeda), sesuaikan batas atas;
+            # host yang sedang di-throttle tetap memakai batas atas dari on_throttle
+            bucket.nominal = rate
+            if rate is not None:
+                bucket.max_rate = rate
+                if bucket.rate is None or bucket.rate > rate:
+                    bucket.rate = rate
+        return bucket
+
+    def acquire(self, host: str, rate=_DEFAULT_RATE) -> float:
+        """
+        Tunggu sampai request ke host boleh dikirim.
+        Block until a request to the host may be sent.
+
+        Args:
+            host (str): Nama host tujuan
+            rate (float): Rate nominal untuk host ini (request/detik),
+                None = tanpa batas, default = rate bawaan limiter
+
+        Returns:
+            float: Total waktu tunggu dalam detik
+        """
+        if rate is _DEFAULT_RATE:
+            rate = self.default_rate
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                bucket = self._bucket(host, rate)
+                now = time.monotonic()
+                bucket.refill(now)
+
+                if now < bucket.blocked_until:
+                    wait = bucket.blocked_until - now
+                elif bucket.tokens >= 1.0:
+                    bucket.tokens -= 1.0
+                    return waited
+                else:
+                    wait = (1.0 - bucket.tokens) / bucket.rate
+
+            # Jitter mencegah banyak thread bangun bersamaan
+            wait += wait * random.uniform(0, self.jitter)
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self, host: str):
+        """
+        Catat request sukses: naikkan rate secara aditif (additive increase).
+        Record a successful request: additively increase the rate.
+        """
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None or bucket.rate is None:
+                return
+
+            step = self.increase_step
+            if step is None:
+                step = bucket.max_rate / 10.0
+            bucket.rate = min(bucket.rate + step, bucket.max_rate)
+            if bucket.rate >= bucket.max_rate and bucket.nominal is None:
+                # Host tanpa batas yang sudah pulih sepenuhnya kembali tanpa batas
+                bucket.rate = None
+
+    def on_throttle(self, host: str, retry_after: Optional[float] = None):
+        """
+        Catat respons 429/503: turunkan rate secara multiplikatif dan tahan host.
+        Record a 429/503 response: multiplicatively decrease the rate and hold the host.
+
+        Args:
+            host (str): Nama host yang membatasi
+            retry_after (float): Nilai Retry-After dalam detik jika ada
+        """
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._bucket(host, self.default_rate)
+
+            if bucket.rate is None:
+                # Host tanpa batas mulai dibatasi setelah throttle pertama; rate
+                # awal ini juga menjadi batas atas pemulihan di on_success
+                bucket.rate = bucket.max_rate = self.default_rate or 1.0
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+            bucket.tokens = 0.0
+
+            if retry_after is None:
+                pause = 1.0 / bucket.rate
+            else:
+                pause = min(retry_after, self.max_retry_after)
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+
+    def current_rate(self, host: str) -> Optional[float]:
+        """Rate efektif saat ini untuk host (request/detik)."""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            return bucket.rate if bucket else self.default_rate
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def default_rate_limiter() -> RateLimiter:
+    """
+    Rate limiter bersama untuk seluruh proses.
+    Process-wide rate limiter shared by every scraper instance.
+    """
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
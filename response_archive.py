@@ -0,0 +1,185 @@
+"""
+Response Archive untuk WolframAlpha Scraper
+Arsip body response mentah (content-addressed, terkompresi gzip) beserta header,
+sehingga hasil bisa diekstrak ulang secara offline tanpa request ulang.
+Archive of raw response bodies (content-addressed, gzip-compressed) and headers,
+so results can be re-extracted offline without fetching again.
+
+Struktur direktori / Directory layout:
+    <archive_dir>/index.jsonl            satu record per response yang diarsip
+    <archive_dir>/objects/ab/abcdef...gz body, nama file = sha256 dari body
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+
+class ResponseArchive:
+    """
+    Arsip response mentah yang dialamatkan dengan hash isinya.
+    Content-addressed archive of raw responses.
+    """
+
+    INDEX = 'index.jsonl'
+
+    def __init__(self, archive_dir: str):
+        """
+        Args:
+            archive_dir (str): Direktori arsip (dibuat jika belum ada)
+        """
+        self.archive_dir = archive_dir
+        self.objects_dir = os.path.join(archive_dir, 'objects')
+        self.index_path = os.path.join(archive_dir, self.INDEX)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest + '.gz')
+
+    def store(self, query: str, url: str, status_code: int, headers: Dict[str, str],
+              body: bytes) -> str:
+        """
+        Simpan body response dan catat record-nya di index.
+        Store a response body and record it in the index.
+
+        Args:
+            query (str): Query asli
+            url (str): URL yang di-request
+            status_code (int): Status HTTP
+            headers (Dict[str, str]): Header response
+            body (bytes): Body response mentah
+
+        Returns:
+            str: SHA-256 dari body
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+
+        # Body yang sama hanya disimpan sekali
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        record = {
+            'query': query,
+            'url': url,
+            'status_code': status_code,
+            'headers': dict(headers),
+            'sha256': digest,
+            'size': len(body),
+            'fetched_at': time.time()
+        }
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        return digest
+
+    def load_body(self, digest: str) -> bytes:
+        """Baca body response dari arsip."""
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read()
+
+    def iter_records(self, latest: bool = True) -> Iterator[Dict]:
+        """
+        Baca record dari index.
+        Read records from the index.
+
+        Args:
+            latest (bool): Hanya record terbaru untuk setiap query
+
+        Yields:
+            Dict: Record response
+        """
+        if not os.path.exists(self.index_path):
+            return
+
+        if not latest:
+            yield from self._read_index()
+            return
+
+        records: Dict[str, Dict] = {}
+        for record in self._read_index():
+            records.pop(record['query'], None)
+            records[record['query']] = record
+        yield from records.values()
+
+    def _read_index(self) -> Iterator[Dict]:
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika proses berhenti mendadak
+                    continue
+
+
+def _reparse_record(task) -> Dict:
+    """Ekstrak ulang satu record (dijalankan di process pool)."""
+    archive_dir, record, parser = task
+    # Import di sini agar worker process hanya memuat yang dibutuhkan
+    from wolframalpha_scraper import extract_results
+
+    result = {
+        'query': record['query'],
+        'url': record['url'],
+        'results': [],
+        'status': 'pending',
+        'error': None
+    }
+    try:
+        body = ResponseArchive(archive_dir).load_body(record['sha256'])
+        results = extract_results(body, parser=parser)
+        if results:
+            result['results'] = results
+            result['status'] = 'success'
+        else:
+            result['status'] = 'no_results'
+            result['error'] = 'Tidak ada hasil yang ditemukan'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f'Error: {str(e)}'
+    return result
+
+
+def reparse_archive(archive_dir: str, parser: str = 'lxml', processes: Optional[int] = None,
+                    latest: bool = True, chunk_size: int = 256) -> Iterator[Dict]:
+    """
+    Ekstrak ulang semua response di arsip secara paralel, tanpa network.
+    Re-extract every archived response in parallel, without network access.
+
+    Args:
+        archive_dir (str): Direktori arsip
+        parser (str): Backend parser ('lxml' atau 'bs4')
+        processes (int): Jumlah process (default: jumlah CPU)
+        latest (bool): Hanya response terbaru untuk setiap query
+        chunk_size (int): Jumlah record per gelombang (membatasi memori)
+
+    Yields:
+        Dict: Hasil dalam format yang sama dengan search_formula, urutan sama dengan index
+    """
+    archive = ResponseArchive(archive_dir)
+    records = archive.iter_records(latest=latest)
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        while True:
+            chunk: List = []
+            for record in records:
+                chunk.append((archive_dir, record, parser))
+                if len(chunk) >= chunk_size:
+                    break
+            if not chunk:
+                break
+            yield from pool.map(_reparse_record, chunk, chunksize=max(1, len(chunk) // 32))
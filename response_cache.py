@@ -0,0 +1,350 @@
+"""
+Response Cache untuk WolframAlpha Scraper
+Cache persisten berbasis SQLite dengan TTL, eviction, dan revalidasi ETag/Last-Modified,
+serta cache LRU in-memory yang menggabungkan request duplikat.
+Persistent SQLite-backed cache with TTL, eviction and ETag/Last-Modified revalidation,
+plus an in-memory LRU cache that coalesces duplicate in-flight lookups.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class CacheEntry:
+    """
+    Satu entri cache beserta validator HTTP-nya.
+    A single cache entry with its HTTP validators.
+    """
+
+    def __init__(self, result: Dict, etag: Optional[str], last_modified: Optional[str],
+                 stored_at: float, ttl: float):
+        self.result = result
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def fresh(self) -> bool:
+        """True jika entri belum melewati TTL."""
+        return time.time() - self.stored_at < self.ttl
+
+    @property
+    def revalidatable(self) -> bool:
+        """True jika entri punya validator untuk conditional request."""
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Header If-None-Match / If-Modified-Since untuk revalidasi."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Cache hasil scraping di disk, dikunci dengan query yang sudah dinormalisasi.
+    On-disk cache of scrape results keyed by normalized query.
+    """
+
+    FILENAME = 'responses.sqlite3'
+
+    def __init__(self, cache_dir: str, ttl: float = 86400.0,
+                 max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str): Direktori penyimpanan file cache
+            ttl (float): Umur entri dalam detik sebelum perlu revalidasi
+            max_entries (int): Jumlah entri maksimum
+            max_bytes (int): Ukuran total hasil maksimum dalam byte
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, self.FILENAME)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' result TEXT NOT NULL,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' stored_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL,'
+            ' size INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)')
+        self._conn.commit()
+
+        count, total = self._conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        self._count = count
+        self._total_bytes = total
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Ambil entri cache, termasuk entri basi yang masih bisa direvalidasi.
+        Get a cache entry, including stale entries that can still be revalidated.
+
+        Args:
+            key (str): Query yang sudah dinormalisasi
+
+        Returns:
+            Optional[CacheEntry]: Entri cache, None jika tidak ada atau tidak berguna
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, etag, last_modified, stored_at FROM entries WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                return None
+
+            entry = CacheEntry(json.loads(row[0]), row[1], row[2], row[3], self.ttl)
+            if not entry.fresh and not entry.revalidatable:
+                # Entri basi tanpa validator tidak berguna lagi
+                self._delete(key)
+                self._conn.commit()
+                return None
+
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?',
+                               (time.time(), key))
+            self._conn.commit()
+            return entry
+
+    def put(self, key: str, result: Dict, etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """
+        Simpan hasil ke cache dan lakukan eviction jika melewati batas.
+        Store a result in the cache and evict entries beyond the limits.
+
+        Args:
+            key (str): Query yang sudah dinormalisasi
+            result (Dict): Hasil scraping
+            etag (str): Header ETag dari response
+            last_modified (str): Header Last-Modified dari response
+        """
+        payload = json.dumps(result, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                'INSERT INTO entries (key, result, etag, last_modified, stored_at, accessed_at, size)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, payload, etag, last_modified, now, now, size))
+            self._count += 1
+            self._total_bytes += size
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key: str):
+        """
+        Tandai entri segar kembali setelah server membalas 304 Not Modified.
+        Mark an entry fresh again after the server answered 304 Not Modified.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?',
+                               (now, now, key))
+            self._conn.commit()
+
+    def clear(self):
+        """Hapus semua entri cache."""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.commit()
+            self._count = 0
+            self._total_bytes = 0
+
+    def close(self):
+        """Tutup koneksi database."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _delete(self, key: str):
+        """Hapus satu entri (lock harus dipegang)."""
+        row = self._conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._count -= 1
+            self._total_bytes -= row[0]
+
+    def _evict(self):
+        """Buang entri yang paling lama tidak diakses sampai di bawah batas (lock harus dipegang)."""
+        while self._count > self.max_entries or self._total_bytes > self.max_bytes:
+            excess = max(1, self._count - self.max_entries)
+            rows = self._conn.execute(
+                'SELECT key, size FROM entries ORDER BY accessed_at LIMIT ?',
+                (excess,)).fetchall()
+            if not rows:
+                break
+            self._conn.executemany('DELETE FROM entries WHERE key = ?', [(r[0],) for r in rows])
+            self._count -= len(rows)
+            self._total_bytes -= sum(r[1] for r in rows)
+
+
+class _InFlight:
+    """Lookup yang sedang berjalan, ditunggu oleh pemanggil duplikat."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MemoryCache:
+    """
+    Cache LRU in-memory dengan penggabungan lookup bersamaan (singleflight).
+    In-memory LRU cache that coalesces concurrent lookups (singleflight).
+
+    Hanya satu pemanggil per kunci yang menjalankan compute; pemanggil lain
+    dengan kunci yang sama menunggu dan memakai hasil yang sama.
+    Only one caller per key runs compute; other callers with the same key
+    wait for it and share the result.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        Args:
+            max_size (int): Jumlah entri maksimum sebelum entri terlama dibuang
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._inflight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict],
+                       cacheable: Callable[[Dict], bool] = lambda result: True) -> Dict:
+        """
+        Ambil hasil dari cache, atau hitung sekali untuk semua pemanggil bersamaan.
+        Get a result from the cache, or compute it once for all concurrent callers.
+
+        Args:
+            key (str): Query yang sudah dinormalisasi
+            compute (Callable): Fungsi yang menghasilkan result jika cache miss
+            cacheable (Callable): Menentukan apakah result boleh disimpan
+
+        Returns:
+            Dict: Result (dibagi dengan pemanggil lain, jangan diubah langsung)
+        """
+        cached, call, leader = self.begin(key)
+        if cached is not None:
+            return cached
+        if not leader:
+            return self.wait(call)
+
+        try:
+            result = compute()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result, cacheable=cacheable)
+        return result
+
+    def begin(self, key: str) -> Tuple[Optional[Dict], Optional[_InFlight], bool]:
+        """
+        Lookup dua tahap untuk pemanggil yang menghitung hasil secara asinkron.
+        Two-phase lookup for callers that compute the result asynchronously.
+
+        Pemimpin (leader=True) wajib memanggil finish untuk call tersebut, termasuk
+        saat gagal atau dibatalkan; pemanggil lain menunggu dengan wait.
+        The leader must call finish for its call, also on failure or cancellation;
+        other callers wait for it with wait.
+
+        Args:
+            key (str): Query yang sudah dinormalisasi
+
+        Returns:
+            Tuple[Optional[Dict], Optional[_InFlight], bool]: (result, None, False)
+                jika cache hit, selain itu (None, call, leader)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key], None, False
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            return None, call, leader
+
+    def wait(self, call: _InFlight, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Tunggu hasil pemimpin; None jika timeout habis, error pemimpin diteruskan.
+        Wait for the leader's result; None on timeout, the leader's error is re-raised.
+        """
+        if not call.event.wait(timeout):
+            return None
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def finish(self, key: str, call: _InFlight, result: Optional[Dict] = None,
+               error: Optional[BaseException] = None,
+               cacheable: Callable[[Dict], bool] = lambda result: True):
+        """
+        Selesaikan call dari begin dengan result atau error (panggilan ulang diabaikan).
+        Resolve a call from begin with a result or an error (repeat calls are ignored).
+        """
+        with self._lock:
+            if self._inflight.get(key) is not call:
+                return
+            del self._inflight[key]
+            call.result = result
+            call.error = error
+            if error is None and cacheable(result):
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        call.event.set()
+
+    def clear(self):
+        """Hapus semua entri (counter tidak direset)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counter hit/miss/coalesce untuk menentukan ukuran cache.
+        Hit/miss/coalesce counters for sizing the cache.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
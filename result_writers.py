@@ -0,0 +1,354 @@
+"""
+Result Writers untuk WolframAlpha Scraper
+Penulis hasil secara streaming: setiap hasil langsung ditulis dan di-flush.
+Streaming result writers: each result is written and flushed as soon as it is ready.
+
+SqliteWriter menulis ke tabel SQLite yang dinormalisasi (results, pods,
+pod_content, pod_images, pod_formulas) dalam transaksi per batch.
+SqliteWriter writes normalized SQLite tables in one transaction per batch.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import gzip
+import io
+import json
+import sqlite3
+import textwrap
+import threading
+import time
+from typing import Dict, Iterator, List
+
+from models import as_dict, json_default
+
+
+def _open_text(filename: str, mode: str):
+    """Buka file teks, otomatis memakai gzip untuk ekstensi .gz."""
+    if filename.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(filename, mode + 'b'), encoding='utf-8')
+    return open(filename, mode, encoding='utf-8')
+
+
+class JsonlWriter:
+    """
+    Menulis satu hasil per baris (JSON Lines), opsional dikompres gzip.
+    Writes one result per line (JSON Lines), optionally gzip-compressed.
+    """
+
+    def __init__(self, filename: str, append: bool = False):
+        """
+        Args:
+            filename (str): Nama file output (.jsonl atau .jsonl.gz)
+            append (bool): Tambahkan ke file yang sudah ada
+        """
+        self.filename = filename
+        self.count = 0
+        self._file = _open_text(filename, 'a' if append else 'w')
+
+    def write(self, result: Dict):
+        """Tulis satu hasil lalu flush ke disk."""
+        self._file.write(json.dumps(result, ensure_ascii=False, default=json_default))
+        self._file.write('\n')
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        """Tutup file output."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonArrayWriter:
+    """
+    Menulis hasil sebagai array JSON secara bertahap, format sama dengan save_results.
+    Writes results as a JSON array incrementally, in the same format as save_results.
+    """
+
+    def __init__(self, filename: str):
+        """
+        Args:
+            filename (str): Nama file output (.json atau .json.gz)
+        """
+        self.filename = filename
+        self.count = 0
+        self._file = _open_text(filename, 'w')
+        self._file.write('[')
+
+    def write(self, result: Dict):
+        """Tulis satu elemen array lalu flush ke disk."""
+        item = json.dumps(result, ensure_ascii=False, indent=2, default=json_default)
+        self._file.write(',\n' if self.count else '\n')
+        self._file.write(textwrap.indent(item, '  '))
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        """Tutup array JSON dan file output."""
+        self._file.write('\n]' if self.count else ']')
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SqliteWriter:
+    """
+    Menulis hasil ke tabel SQLite yang dinormalisasi (mode WAL), dengan insert
+    dikelompokkan per transaksi. Aman dipanggil dari beberapa thread, dan beberapa
+    process boleh menulis ke file yang sama.
+    Writes results to normalized SQLite tables (WAL mode), batching inserts per
+    transaction. Safe to call from several threads; several processes may write
+    to the same file.
+
+    Tabel / Tables:
+        results(id, query, url, status, error, written_at)
+        pods(id, result_id, position, title)
+        pod_content(pod_id, position, text)
+        pod_images(pod_id, position, src, alt)
+        pod_formulas(pod_id, position, formula)
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS results ('
+        ' id INTEGER PRIMARY KEY,'
+        ' query TEXT NOT NULL,'
+        ' url TEXT,'
+        ' status TEXT NOT NULL,'
+        ' error TEXT,'
+        ' written_at REAL NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS pods ('
+        ' id INTEGER PRIMARY KEY,'
+        ' result_id INTEGER NOT NULL REFERENCES results (id),'
+        ' position INTEGER NOT NULL,'
+        ' title TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS pod_content ('
+        ' pod_id INTEGER NOT NULL REFERENCES pods (id),'
+        ' position INTEGER NOT NULL,'
+        ' text TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS pod_images ('
+        ' pod_id INTEGER NOT NULL REFERENCES pods (id),'
+        ' position INTEGER NOT NULL,'
+        ' src TEXT NOT NULL,'
+        ' alt TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS pod_formulas ('
+        ' pod_id INTEGER NOT NULL REFERENCES pods (id),'
+        ' position INTEGER NOT NULL,'
+        ' formula TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS results_query ON results (query)',
+        'CREATE INDEX IF NOT EXISTS pods_result ON pods (result_id)',
+        'CREATE INDEX IF NOT EXISTS pods_title ON pods (title)',
+        'CREATE INDEX IF NOT EXISTS pod_content_pod ON pod_content (pod_id)',
+        'CREATE INDEX IF NOT EXISTS pod_images_pod ON pod_images (pod_id)',
+        'CREATE INDEX IF NOT EXISTS pod_formulas_pod ON pod_formulas (pod_id)',
+    )
+
+    def __init__(self, filename: str, append: bool = True, batch_size: int = 500,
+                 flush_interval: float = 1.0):
+        """
+        Args:
+            filename (str): File database (.db / .sqlite / .sqlite3)
+            append (bool): Tambahkan ke hasil yang sudah ada, juga dari writer lain
+                (False = kosongkan tabel lebih dulu)
+            batch_size (int): Jumlah hasil per transaksi
+            flush_interval (float): Tulis batch yang belum penuh setelah sekian detik
+        """
+        self.filename = filename
+        self.count = 0
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._pending: List[Dict] = []
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        # timeout: tunggu lock database jika process lain sedang menulis
+        self._conn = sqlite3.connect(filename, timeout=30.0, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+            if not append:
+                for table in ('pod_formulas', 'pod_images', 'pod_content', 'pods', 'results'):
+                    self._conn.execute(f'DELETE FROM {table}')
+
+    def write(self, result: Dict):
+        """Antrikan satu hasil; batch ditulis saat penuh atau flush_interval terlewati."""
+        with self._lock:
+            self._pending.append(as_dict(result))
+            self.count += 1
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._flushed_at >= self.flush_interval):
+                self._flush()
+
+    def flush(self):
+        """Tulis semua hasil yang masih diantrikan."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        """Tulis batch dalam satu transaksi (lock harus dipegang)."""
+        self._flushed_at = time.monotonic()
+        if not self._pending:
+            return
+        now = time.time()
+        results, pods, content, images, formulas = [], [], [], [], []
+        # BEGIN IMMEDIATE mengambil lock tulis sebelum membaca id terakhir, sehingga
+        # id bisa diberikan sendiri dan setiap tabel cukup satu executemany
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            result_id = self._conn.execute('SELECT COALESCE(MAX(id), 0) FROM results').fetchone()[0]
+            pod_id = self._conn.execute('SELECT COALESCE(MAX(id), 0) FROM pods').fetchone()[0]
+            for result in self._pending:
+                result_id += 1
+                results.append((result_id, result['query'], result.get('url'), result['status'],
+                                result.get('error'), now))
+                for position, pod in enumerate(result.get('results') or ()):
+                    pod_id += 1
+                    pods.append((pod_id, result_id, position, pod.get('title') or ''))
+                    content.extend((pod_id, i, text) for i, text in enumerate(pod.get('content') or ()))
+                    images.extend((pod_id, i, image['src'], image['alt'])
+                                  for i, image in enumerate(pod.get('images') or ()))
+                    formulas.extend((pod_id, i, formula)
+                                    for i, formula in enumerate(pod.get('formulas') or ()))
+            self._conn.executemany(
+                'INSERT INTO results (id, query, url, status, error, written_at) VALUES (?, ?, ?, ?, ?, ?)',
+                results)
+            self._conn.executemany(
+                'INSERT INTO pods (id, result_id, position, title) VALUES (?, ?, ?, ?)', pods)
+            self._conn.executemany(
+                'INSERT INTO pod_content (pod_id, position, text) VALUES (?, ?, ?)', content)
+            self._conn.executemany(
+                'INSERT INTO pod_images (pod_id, position, src, alt) VALUES (?, ?, ?, ?)', images)
+            self._conn.executemany(
+                'INSERT INTO pod_formulas (pod_id, position, formula) VALUES (?, ?, ?)', formulas)
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._pending.clear()
+
+    def close(self):
+        """Tulis sisa batch lalu tutup database."""
+        with self._lock:
+            try:
+                self._flush()
+            finally:
+                self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_sqlite(filename: str) -> Iterator[Dict]:
+    """
+    Baca kembali hasil dari database SqliteWriter satu per satu, dalam format dict
+    search_formula.
+    Read results back from a SqliteWriter database one at a time, as search_formula dicts.
+    """
+    conn = sqlite3.connect(filename)
+    try:
+        rows = conn.execute('SELECT id, query, url, status, error FROM results ORDER BY id')
+        for result_id, query, url, status, error in rows:
+            pods = []
+            for pod_id, title in conn.execute(
+                    'SELECT id, title FROM pods WHERE result_id = ? ORDER BY position', (result_id,)):
+                pods.append({
+                    'title': title,
+                    'content': [r[0] for r in conn.execute(
+                        'SELECT text FROM pod_content WHERE pod_id = ? ORDER BY position', (pod_id,))],
+                    'images': [{'src': r[0], 'alt': r[1]} for r in conn.execute(
+                        'SELECT src, alt FROM pod_images WHERE pod_id = ? ORDER BY position', (pod_id,))],
+                    'formulas': [r[0] for r in conn.execute(
+                        'SELECT formula FROM pod_formulas WHERE pod_id = ? ORDER BY position', (pod_id,))]
+                })
+            yield {'query': query, 'url': url, 'results': pods, 'status': status, 'error': error}
+    finally:
+        conn.close()
+
+
+def is_sqlite(filename: str) -> bool:
+    """True jika nama file menandakan database SQLite."""
+    return filename.endswith(('.db', '.sqlite', '.sqlite3'))
+
+
+def is_jsonl(filename: str) -> bool:
+    """True jika nama file menandakan format JSON Lines."""
+    return filename.endswith('.jsonl') or filename.endswith('.jsonl.gz')
+
+
+def open_writer(filename: str, overwrite: bool = False):
+    """
+    Pilih writer berdasarkan ekstensi file output.
+    Choose a writer based on the output file extension.
+
+    Args:
+        filename (str): .jsonl / .jsonl.gz untuk JSON Lines, .db / .sqlite / .sqlite3
+            untuk SQLite, selain itu array JSON
+        overwrite (bool): Kosongkan tabel database SQLite yang sudah ada; tanpa ini
+            hasil ditambahkan (file JSON / JSON Lines selalu ditulis ulang)
+
+    Returns:
+        JsonlWriter, SqliteWriter atau JsonArrayWriter
+    """
+    if is_sqlite(filename):
+        return SqliteWriter(filename, append=not overwrite)
+    if is_jsonl(filename):
+        return JsonlWriter(filename)
+    return JsonArrayWriter(filename)
+
+
+def iter_jsonl(filename: str) -> Iterator[Dict]:
+    """
+    Baca file JSON Lines satu hasil per iterasi, baris rusak di akhir dilewati.
+    Read a JSON Lines file one result at a time, skipping a truncated last line.
+
+    Args:
+        filename (str): File .jsonl atau .jsonl.gz
+
+    Yields:
+        Dict: Satu hasil
+    """
+    with _open_text(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Baris terakhir bisa terpotong jika proses berhenti mendadak
+                continue
+
+
+def iter_results(filename: str) -> Iterator[Dict]:
+    """
+    Baca file hasil apa pun: JSON Lines, SQLite, atau JSON dari save_results
+    (satu hasil atau array).
+    Read any result file: JSON Lines, SQLite, or JSON from save_results (one result or an array).
+
+    Args:
+        filename (str): File .jsonl / .jsonl.gz / .db / .json / .json.gz
+
+    Yields:
+        Dict: Satu hasil
+    """
+    if is_jsonl(filename):
+        yield from iter_jsonl(filename)
+        return
+    if is_sqlite(filename):
+        yield from read_sqlite(filename)
+        return
+    with _open_text(filename, 'r') as f:
+        data = json.load(f)
+    yield from (data if isinstance(data, list) else [data])
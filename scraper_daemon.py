@@ -0,0 +1,259 @@
+"""
+Scraper Daemon untuk WolframAlpha Scraper
+Process berumur panjang yang menyimpan WolframAlphaScraper tetap "hangat" (session
+pool, koneksi TLS, cache in-memory) di balik API HTTP lokal. Client tipisnya
+(cli.py --daemon) ada di daemon_client.
+Long-lived process that keeps a warm WolframAlphaScraper (session pool, TLS
+connections, in-memory cache) behind a local HTTP API. The thin client used by
+cli.py --daemon lives in daemon_client.
+
+Endpoint / Endpoints:
+    GET  /health                 status daemon
+    GET  /search?q=...&fields=.. satu query (JSON hasil search_formula)
+    POST /search                 {"query": ..., "fields": [...], "delay": ...}
+    POST /batch                  {"queries": [...], "workers": N, "dedup": [...]}
+                                 -> JSON Lines {"index": i, "result": {...}} sesuai
+                                    urutan selesai
+    GET  /metrics                metrics Prometheus (jika daemon memakai Metrics)
+
+Alamat / Addresses: "HOST:PORT" (TCP, default 127.0.0.1:8765) atau "unix:PATH".
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlsplit
+
+# DaemonClient tetap bisa diimpor dari modul ini
+from daemon_client import DEFAULT_ADDRESS, DaemonClient, parse_address
+
+
+# Batas ukuran body request (batch besar tetap muat, tapi tidak tak terbatas)
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handler HTTP; scraper dan konfigurasi diambil dari self.server."""
+
+    server_version = 'WolframAlphaScraperDaemon/1.0'
+
+    def address_string(self):
+        # Client Unix socket tidak punya (host, port)
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send_json(200, {
+                'status': 'ok',
+                'pid': os.getpid(),
+                'uptime': time.time() - self.server.started,
+                'requests': self.server.requests
+            })
+        elif url.path == '/search':
+            params = parse_qs(url.query)
+            self._search({
+                'query': params.get('q', [''])[0],
+                'fields': params.get('fields', [None])[0],
+                'delay': params.get('delay', [None])[0]
+            })
+        elif url.path == '/metrics':
+            metrics = self.server.scraper.metrics
+            if not hasattr(metrics, 'to_prometheus'):
+                self._send_json(404, {'error': 'Metrics tidak aktif (jalankan serve dengan --metrics)'})
+                return
+            self._send(200, 'text/plain; version=0.0.4', metrics.to_prometheus().encode('utf-8'))
+        else:
+            self._send_json(404, {'error': f'Endpoint tidak dikenal: {url.path}'})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        if path == '/search':
+            self._search(body)
+        elif path == '/batch':
+            self._batch(body)
+        else:
+            self._send_json(404, {'error': f'Endpoint tidak dikenal: {path}'})
+
+    def _search(self, body: Dict):
+        from wolframalpha_scraper import normalize_fields
+        from models import as_dict
+
+        query = (body.get('query') or '').strip()
+        if not query:
+            self._send_json(400, {'error': 'Query kosong'})
+            return
+        try:
+            fields = normalize_fields(body.get('fields'))
+            delay = float(body['delay']) if body.get('delay') is not None else self.server.delay
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self.server.count_request()
+        result = self.server.scraper.search_formula(query, delay=delay, fields=fields)
+        self._send_json(200, as_dict(result))
+
+    def _batch(self, body: Dict):
+        from wolframalpha_scraper import normalize_fields
+        from query_dedup import QueryCanonicalizer
+        from models import as_dict
+
+        queries = body.get('queries')
+        if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+            self._send_json(400, {'error': "'queries' harus berupa list string"})
+            return
+        try:
+            fields = normalize_fields(body.get('fields'))
+            delay = float(body['delay']) if body.get('delay') is not None else self.server.delay
+            # Jumlah worker dibatasi konfigurasi daemon
+            workers = max(1, min(int(body.get('workers') or 1), self.server.max_workers))
+            dedup = body.get('dedup')
+            canonicalize = QueryCanonicalizer(dedup) if dedup else None
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self.server.count_request()
+
+        # Hasil dikirim sebagai JSON Lines begitu selesai (koneksi ditutup di akhir)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        try:
+            for index, result in self.server.scraper.iter_search_completed(
+                    queries, delay=delay, workers=workers, fields=fields, canonicalize=canonicalize):
+                line = json.dumps({'index': index, 'result': as_dict(result)}, ensure_ascii=False)
+                self.wfile.write(line.encode('utf-8') + b'\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client berhenti membaca; sisa query dibatalkan oleh iter_search_completed
+            pass
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_SIZE:
+            raise ValueError(f'Body terlalu besar (maksimum {MAX_BODY_SIZE} byte)')
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Body bukan JSON yang valid: {e}')
+        if not isinstance(body, dict):
+            raise ValueError('Body harus berupa objek JSON')
+        return body
+
+    def _send_json(self, status: int, data: Dict):
+        self._send(status, 'application/json', json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def _send(self, status: int, content_type: str, payload: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _DaemonMixin:
+    """State bersama server daemon (TCP maupun Unix socket)."""
+
+    daemon_threads = True
+
+    def setup_daemon(self, scraper, delay: float, max_workers: int, quiet: bool):
+        self.scraper = scraper
+        self.delay = delay
+        self.max_workers = max_workers
+        self.quiet = quiet
+        self.started = time.time()
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests += 1
+
+
+class _TCPServer(_DaemonMixin, ThreadingHTTPServer):
+    pass
+
+
+class _UnixServer(_DaemonMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler mengharapkan alamat berupa tuple
+        return request, ('unix', 0)
+
+
+def create_server(scraper, address: str = DEFAULT_ADDRESS, delay: float = 2.0,
+                  max_workers: int = 8, quiet: bool = False):
+    """
+    Buat server daemon untuk scraper (belum berjalan; panggil serve_forever()).
+    Create the daemon server for a scraper (call serve_forever() to run it).
+
+    Args:
+        scraper (WolframAlphaScraper): Scraper yang dipakai bersama semua request
+        address (str): "HOST:PORT" atau "unix:PATH"
+        delay (float): Delay default jika request tidak menyertakan delay
+        max_workers (int): Batas worker paralel per request batch
+        quiet (bool): Jangan log setiap request
+
+    Returns:
+        Server socketserver dengan atribut scraper; server_close() juga menghapus
+        file Unix socket
+    """
+    kind, target = parse_address(address)
+    if kind == 'unix':
+        if os.path.exists(target):
+            # Socket lama dari daemon yang mati; tolak jika masih ada yang mendengarkan
+            if _unix_socket_alive(target):
+                raise OSError(f"Daemon lain sudah berjalan di {address}")
+            os.unlink(target)
+        old_umask = os.umask(0o177)
+        try:
+            server = _UnixServer(target, _Handler)
+        finally:
+            os.umask(old_umask)
+    else:
+        server = _TCPServer(target, _Handler)
+    server.setup_daemon(scraper, delay, max_workers, quiet)
+    return server
+
+
+def serve(scraper, address: str = DEFAULT_ADDRESS, **kwargs):
+    """Jalankan daemon sampai dihentikan (Ctrl+C)."""
+    server = create_server(scraper, address, **kwargs)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def _unix_socket_alive(path: str) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
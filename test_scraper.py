@@ -4,10 +4,29 @@ Tests are basic validation to ensure the code works
 """
 
 import sys
+import os
+import glob
 import json
 from wolframalpha_scraper import WolframAlphaScraper
 
 
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixtures():
+    """Baca semua halaman fixture sebagai (nama, bytes)"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def crash_parse_process(*args):
+    """Pengganti extract_results_timed yang mematikan process parser"""
+    os._exit(1)
+
+
 def test_initialization():
     """Test 1: Inisialisasi scraper"""
     print("\n[TEST 1] Testing initialization...")
@@ -152,6 +171,1565 @@ def test_examples_import():
         return False
 
 
+def test_concurrent_search_order():
+    """Test 8: Concurrent batch keeps input order"""
+    print("\n[TEST 8] Testing concurrent batch order...")
+    try:
+        import random
+        import time
+        scraper = WolframAlphaScraper()
+        
+        def fake_search(query, delay=2.0, fields=None):
+            time.sleep(random.uniform(0, 0.02))
+            return {'query': query, 'url': '', 'results': [], 'status': 'success', 'error': None}
+        
+        scraper.search_formula = fake_search
+        queries = [f"query {i}" for i in range(20)]
+        
+        results = scraper.search_multiple(queries, delay=0, workers=4)
+        assert [r['query'] for r in results] == queries
+        
+        seen = sorted(index for index, _ in scraper.iter_search_completed(queries, delay=0, workers=4))
+        assert seen == list(range(len(queries)))
+        
+        print("✓ PASSED: Concurrent batch keeps input order")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_rate_limiter():
+    """Test 9: Token bucket rate limiter and backoff"""
+    print("\n[TEST 9] Testing rate limiter...")
+    try:
+        import time
+        from rate_limiter import RateLimiter, parse_retry_after
+        
+        limiter = RateLimiter(rate=20.0, burst=1.0, jitter=0.0)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire('example.com')
+        elapsed = time.monotonic() - start
+        assert 0.08 <= elapsed < 0.5, elapsed
+        
+        limiter.on_throttle('example.com', retry_after=0.1)
+        assert limiter.current_rate('example.com') == 10.0
+        waited = limiter.acquire('example.com')
+        assert waited >= 0.09, waited
+        
+        for _ in range(20):
+            limiter.on_success('example.com')
+        assert limiter.current_rate('example.com') == 20.0
+        
+        # Host tanpa batas tidak pernah menunggu
+        unlimited = RateLimiter(rate=None)
+        assert unlimited.acquire('example.com') == 0.0
+        assert unlimited.acquire('example.com') == 0.0
+        
+        # Host tanpa batas yang di-throttle pulih sampai rate awal, lalu tanpa batas lagi
+        unlimited.on_throttle('example.com', retry_after=0)
+        assert unlimited.current_rate('example.com') == 0.5
+        rates = []
+        for _ in range(20):
+            unlimited.on_success('example.com')
+            rates.append(unlimited.current_rate('example.com'))
+        assert max(rate for rate in rates if rate is not None) <= 1.0, rates
+        assert rates[-1] is None, rates
+        assert unlimited.acquire('example.com') == 0.0
+        
+        assert parse_retry_after('5') == 5.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert parse_retry_after('garbage') is None
+        
+        print("✓ PASSED: Rate limiter works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_response_cache():
+    """Test 10: Persistent response cache with TTL, eviction and revalidation"""
+    print("\n[TEST 10] Testing response cache...")
+    try:
+        import tempfile
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        from response_cache import ResponseCache
+        
+        page = b'<html><section class="_2vZr"><h2>Formula</h2><img src="f.png" alt="x = 1"></section></html>'
+        requests_seen = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requests_seen.append(self.headers.get('If-None-Match'))
+                if self.headers.get('If-None-Match') == '"v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', '"v1"')
+                self.send_header('Content-Length', str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir, ttl=60)
+            scraper = WolframAlphaScraper(cache=cache, memory_cache_size=0)
+            scraper.base_url = f"http://127.0.0.1:{server.server_port}/input"
+            
+            first = scraper.search_formula("Quadratic  Formula", delay=0)
+            second = scraper.search_formula("quadratic formula", delay=0)
+            assert first['status'] == 'success'
+            assert second['results'] == first['results']
+            assert second['query'] == "quadratic formula"
+            assert len(requests_seen) == 1
+            
+            # Entri basi direvalidasi dengan ETag
+            cache.ttl = 0
+            third = scraper.search_formula("quadratic formula", delay=0)
+            assert third['results'] == first['results']
+            assert requests_seen[-1] == '"v1"'
+            
+            # Eviction berdasarkan jumlah entri
+            small = ResponseCache(cache_dir + '/small', max_entries=2)
+            for i in range(5):
+                small.put(f"q{i}", {'results': [], 'status': 'success'})
+            assert len(small) == 2
+            assert small.get("q4") is not None
+            assert small.get("q0") is None
+            cache.close()
+            small.close()
+        
+        server.shutdown()
+        print("✓ PASSED: Response cache works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_memory_cache():
+    """Test 11: In-memory LRU cache with request coalescing"""
+    print("\n[TEST 11] Testing memory cache...")
+    try:
+        import threading
+        import time
+        from response_cache import MemoryCache
+        from wolframalpha_scraper import normalize_query
+        
+        assert normalize_query("  Quadratic\u00a0FORMULA ") == "quadratic formula"
+        assert normalize_query("\uff58^2") == "x^2"
+        
+        cache = MemoryCache(max_size=2)
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'status': 'success'}
+        
+        threads = [threading.Thread(target=cache.get_or_compute, args=('k', compute)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert len(calls) == 1
+        cache.get_or_compute('k', compute)
+        stats = cache.stats()
+        assert stats['misses'] == 1 and stats['coalesced'] == 7 and stats['hits'] == 1, stats
+        
+        # Entri terlama dibuang saat melewati max_size
+        cache.get_or_compute('a', lambda: {'status': 'success'})
+        cache.get_or_compute('b', lambda: {'status': 'success'})
+        assert len(cache) == 2
+        cache.get_or_compute('k', compute)
+        assert len(calls) == 2
+        
+        # Hasil yang tidak cacheable tidak disimpan
+        cache.get_or_compute('err', lambda: {'status': 'error'}, cacheable=lambda r: r['status'] == 'success')
+        assert cache.stats()['size'] == 2
+        
+        print("✓ PASSED: Memory cache works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_streaming_writers():
+    """Test 12: Streaming JSONL / JSON array writers"""
+    print("\n[TEST 12] Testing streaming writers...")
+    try:
+        import os
+        import tempfile
+        from result_writers import iter_jsonl, open_writer
+        
+        scraper = WolframAlphaScraper()
+        scraper.search_formula = lambda q, delay=2.0, fields=None: {
+            'query': q, 'url': '', 'results': [{'title': 'Rumus', 'content': ['√x'], 'images': [], 'formulas': []}],
+            'status': 'success', 'error': None
+        }
+        queries = (f"query {i}" for i in range(10))
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl_file = os.path.join(tmp, 'out.jsonl.gz')
+            with open_writer(jsonl_file) as writer:
+                for result in scraper.iter_search(queries, delay=0, workers=3):
+                    writer.write(result)
+            
+            loaded = list(iter_jsonl(jsonl_file))
+            assert [r['query'] for r in loaded] == [f"query {i}" for i in range(10)]
+            
+            # Array JSON streaming identik dengan save_results
+            json_file = os.path.join(tmp, 'out.json')
+            expected_file = os.path.join(tmp, 'expected.json')
+            with open_writer(json_file) as writer:
+                for result in loaded:
+                    writer.write(result)
+            scraper.save_results(loaded, expected_file)
+            with open(json_file, encoding='utf-8') as a, open(expected_file, encoding='utf-8') as b:
+                assert a.read() == b.read()
+        
+        print("✓ PASSED: Streaming writers work correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_checkpoint_resume():
+    """Test 13: Checkpoint journal and resume"""
+    print("\n[TEST 13] Testing checkpoint resume...")
+    try:
+        import os
+        import tempfile
+        from checkpoint import CheckpointJournal, iter_checkpointed
+        
+        fetched = []
+        failed_once = set()
+        
+        def fake_search(query, delay=2.0, fields=None):
+            fetched.append(query)
+            status = 'success'
+            if query == 'q3' and query not in failed_once:
+                failed_once.add(query)
+                status = 'error'
+            return {'query': query, 'url': '', 'results': [], 'status': status, 'error': None}
+        
+        scraper = WolframAlphaScraper()
+        scraper.search_formula = fake_search
+        queries = [f"q{i}" for i in range(8)]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            journal_file = os.path.join(tmp, 'run.checkpoint.jsonl')
+            
+            # Run pertama terputus setelah 5 hasil
+            with CheckpointJournal(journal_file) as journal:
+                for n, result in enumerate(iter_checkpointed(scraper, queries, journal, delay=0)):
+                    if n == 4:
+                        break
+            
+            fetched.clear()
+            with CheckpointJournal(journal_file, resume=True) as journal:
+                results = list(iter_checkpointed(scraper, queries, journal, delay=0, workers=2))
+            
+            assert [r['query'] for r in results] == queries
+            assert all(r['status'] == 'success' for r in results)
+            assert sorted(fetched) == ['q3', 'q5', 'q6', 'q7'], fetched
+            assert journal.status_counts() == {'success': 8}
+            
+            # Tanpa resume, jurnal yang berisi progres tidak ditimpa diam-diam
+            try:
+                CheckpointJournal(journal_file)
+                assert False, "jurnal berisi progres ditimpa"
+            except FileExistsError as e:
+                assert '--resume' in str(e) and '--overwrite' in str(e), e
+            with CheckpointJournal(journal_file, resume=True) as journal:
+                assert journal.status_counts() == {'success': 8}
+            with CheckpointJournal(journal_file, overwrite=True) as journal:
+                assert journal.status_counts() == {}
+            with CheckpointJournal(journal_file) as journal:
+                pass
+        
+        print("✓ PASSED: Checkpoint resume works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_lxml_parser_matches_bs4():
+    """Test 14: lxml fast-path parser gives the same pods as BeautifulSoup"""
+    print("\n[TEST 14] Testing lxml parser against BeautifulSoup...")
+    try:
+        from bs4 import BeautifulSoup
+        from lxml_extractor import LxmlExtractor
+        
+        scraper = WolframAlphaScraper(parser='bs4')
+        extractor = LxmlExtractor()
+        pages = load_fixtures()
+        assert pages, "fixtures tidak ditemukan"
+        pages.append(('inline', '<section class="_2vZr"><h3>A<!-- c --> b</h3>'
+                                '<div>x<script>var s;</script>yz<span> w </span></div>'
+                                '<img src="i.png" alt="y = 2"></section>'.encode('utf-8')))
+        
+        for name, content in pages:
+            expected = scraper._extract_results(BeautifulSoup(content, 'lxml'))
+            assert extractor.extract(content) == expected, name
+        
+        # Fixture harus berupa pohon yang benar: pod bersebelahan, tidak bersarang
+        for name, content in pages[:-1]:
+            root = extractor.parse(content)
+            if root is None:
+                continue
+            pods = root.xpath("//section[contains(concat(' ', @class, ' '), ' _2vZr ')]"
+                              " | //div[contains(@data-testid, 'Pod')]")
+            assert not any(pod in pods for p in pods for pod in p.iterancestors()), name
+            assert content.count(b'<div') == content.count(b'</div>'), name
+        
+        scraper.parser = 'lxml'
+        assert scraper._parse(pages[0][1]) == extractor.extract(pages[0][1])
+        
+        print(f"✓ PASSED: lxml parser matches BeautifulSoup on {len(pages)} pages")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_pod_extraction_regression():
+    """Test 15: Pod extraction output is unchanged on fixture pages"""
+    print("\n[TEST 15] Testing pod extraction against recorded digests...")
+    try:
+        import hashlib
+        
+        with open(os.path.join(FIXTURES_DIR, 'expected_digests.json'), encoding='utf-8') as f:
+            expected = json.load(f)
+        
+        for parser in ('bs4', 'lxml'):
+            scraper = WolframAlphaScraper(parser=parser)
+            for name, content in load_fixtures():
+                results = scraper._parse(content)
+                blob = json.dumps(results, ensure_ascii=False, sort_keys=True).encode('utf-8')
+                assert len(results) == expected[name]['pods'], (parser, name)
+                assert hashlib.sha256(blob).hexdigest() == expected[name]['sha256'], (parser, name)
+        
+        print(f"✓ PASSED: Output identical on {len(expected)} fixture pages")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_benchmark_suite():
+    """Test 16: Offline benchmark suite runs against the stub server"""
+    print("\n[TEST 16] Testing benchmark suite...")
+    try:
+        import benchmark
+        
+        pages = benchmark.load_fixtures()
+        parse = benchmark.bench_parse(pages[:2], min_time=0.01)
+        batch = benchmark.bench_batch(pages, queries=len(pages), workers_list=[2], latency=0)
+        
+        assert all(b['pages_per_second'] > 0 and b['peak_memory_bytes'] > 0 for b in parse)
+        for b in batch:
+            assert b['statuses'].get('success', 0) + b['statuses'].get('no_results', 0) == len(pages), b
+        
+        report = {'benchmarks': parse + batch}
+        assert benchmark.compare(report, report, tolerance=0.1) == []
+        slower = {'benchmarks': [dict(b, pages_per_second=b['pages_per_second'] / 2) for b in parse]}
+        assert len(benchmark.compare(slower, report, tolerance=0.1)) == len(parse)
+        
+        print("✓ PASSED: Benchmark suite works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_response_archive_reparse():
+    """Test 17: Raw response archive and offline reparse"""
+    print("\n[TEST 17] Testing response archive and reparse...")
+    try:
+        import tempfile
+        from response_archive import ResponseArchive, reparse_archive
+        from wolframalpha_scraper import extract_results
+        
+        pages = load_fixtures()
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = ResponseArchive(tmp)
+            digests = set()
+            for name, content in pages:
+                digests.add(archive.store(name, 'http://stub/' + name, 200,
+                                          {'Content-Type': 'text/html'}, content))
+            # Body yang sama hanya disimpan sekali, query yang sama memakai record terbaru
+            archive.store(pages[0][0], 'http://stub/again', 200, {}, pages[0][1])
+            
+            objects = sum(len(files) for _, _, files in os.walk(os.path.join(tmp, 'objects')))
+            assert objects == len(digests) == len(pages)
+            assert len(list(archive.iter_records(latest=False))) == len(pages) + 1
+            assert archive.load_body(next(iter(digests))) in [c for _, c in pages]
+            
+            reparsed = list(reparse_archive(tmp, processes=2, chunk_size=2))
+            assert len(reparsed) == len(pages)
+            by_query = {r['query']: r for r in reparsed}
+            for name, content in pages:
+                assert by_query[name]['results'] == extract_results(content), name
+            assert by_query[pages[0][0]]['url'] == 'http://stub/again'
+        
+        print("✓ PASSED: Response archive and reparse work correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_fetch_parse_pipeline():
+    """Test 18: Fetch/parse pipeline with a process pool matches the threaded path"""
+    print("\n[TEST 18] Testing fetch/parse pipeline...")
+    try:
+        import contextlib
+        import io
+        import benchmark
+        from rate_limiter import RateLimiter
+        
+        pages = load_fixtures()
+        queries = [f"pipeline query {i}" for i in range(len(pages) * 3)]
+        
+        with benchmark.StubServer(pages) as server:
+            outputs = []
+            for parse_processes in (0, 2):
+                scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None),
+                                              memory_cache_size=0, parse_processes=parse_processes)
+                scraper.base_url = server.url
+                with contextlib.redirect_stdout(io.StringIO()):
+                    outputs.append(scraper.search_multiple(queries, delay=0, workers=3))
+            
+            # Berhenti lebih awal tidak boleh menggantung
+            with contextlib.redirect_stdout(io.StringIO()):
+                completed = scraper.iter_search_completed(iter(queries), delay=0, workers=3)
+                next(completed)
+                completed.close()
+        
+            # Query duplikat memakai cache in-memory dan singleflight yang sama
+            # dengan search_formula: setiap query unik hanya di-request sekali
+            # (hanya hasil sukses yang disimpan, halaman no-result dilewati)
+            unique = queries[1:len(pages)]
+            duplicated = unique + [q.upper() for q in unique] + unique
+            scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None), parse_processes=2)
+            scraper.base_url = server.url
+            requests_before = server.requests
+            with contextlib.redirect_stdout(io.StringIO()):
+                cached = scraper.search_multiple(duplicated, delay=0, workers=3)
+                assert server.requests - requests_before == len(unique)
+                assert [r['query'] for r in cached] == duplicated
+                assert [r['results'] for r in cached] == [r['results'] for r in outputs[0][1:len(pages)]] * 3
+                stats = scraper.memory_cache.stats()
+                assert stats['misses'] == len(unique), stats
+                assert stats['hits'] + stats['coalesced'] == 2 * len(unique), stats
+                
+                # Klaim yang belum selesai dilepas saat iterator ditutup lebih awal
+                scraper.memory_cache.clear()
+                completed = scraper.iter_search_completed(iter(queries), delay=0, workers=3)
+                next(completed)
+                completed.close()
+                assert not scraper.memory_cache._inflight
+                assert scraper.search_formula(queries[-1], delay=0)['query'] == queries[-1]
+            
+            # Process parser yang mati menjadi error untuk sisa batch, tidak menggantung
+            import threading
+            import pipeline
+            original = pipeline.extract_results_timed
+            pipeline.extract_results_timed = crash_parse_process
+            try:
+                scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None), parse_processes=2)
+                scraper.base_url = server.url
+                crashed = []
+                with contextlib.redirect_stdout(io.StringIO()):
+                    runner = threading.Thread(target=lambda: crashed.extend(
+                        scraper.search_multiple(queries[:20], delay=0, workers=3)), daemon=True)
+                    runner.start()
+                    runner.join(30)
+                assert not runner.is_alive(), 'pipeline menggantung setelah process parser mati'
+            finally:
+                pipeline.extract_results_timed = original
+            assert [r['query'] for r in crashed] == queries[:20]
+            assert all(r['status'] == 'error' for r in crashed), [r['status'] for r in crashed]
+            assert not scraper.memory_cache._inflight
+        
+        threaded, pipelined = outputs
+        assert [r['query'] for r in pipelined] == queries
+        assert pipelined == threaded
+        assert any(r['status'] == 'success' for r in pipelined)
+        
+        print("✓ PASSED: Fetch/parse pipeline works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_metrics():
+    """Test 19: Per-phase metrics, status counters and exports"""
+    print("\n[TEST 19] Testing metrics...")
+    try:
+        import contextlib
+        import io
+        import tempfile
+        import benchmark
+        from metrics import Metrics
+        from rate_limiter import RateLimiter
+        
+        pages = load_fixtures()
+        queries = [f"metrics query {i}" for i in range(len(pages))]
+        
+        with benchmark.StubServer(pages) as server:
+            for parse_processes in (0, 2):
+                metrics = Metrics()
+                scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None), memory_cache_size=0,
+                                              parse_processes=parse_processes, metrics=metrics)
+                scraper.base_url = server.url
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = scraper.search_multiple(queries, delay=0, workers=2)
+                
+                data = metrics.to_dict()
+                for phase in ('rate_limit', 'network', 'parse', 'extract', 'total'):
+                    assert data['phases'][phase]['count'] == len(queries), (phase, parse_processes)
+                    assert data['phases'][phase]['p50'] <= data['phases'][phase]['p99']
+                statuses = {}
+                for r in results:
+                    statuses[r['status']] = statuses.get(r['status'], 0) + 1
+                for status, n in statuses.items():
+                    assert metrics.counter('results', {'status': status}) == n
+                assert metrics.counter('requests') == len(queries)
+                assert metrics.counter('response_bytes') == sum(len(pages[i % len(pages)][1])
+                                                                for i in range(len(queries)))
+        
+        text = metrics.to_prometheus()
+        assert 'wolframalpha_scraper_phase_seconds{phase="network",quantile="0.99"}' in text
+        assert 'wolframalpha_scraper_results_total{status="success"}' in text
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            metrics.dump(os.path.join(tmp, 'metrics.json'))
+            metrics.dump(os.path.join(tmp, 'metrics.prom'))
+            with open(os.path.join(tmp, 'metrics.json'), 'r', encoding='utf-8') as f:
+                assert json.load(f)['phases']['total']['count'] == len(queries)
+            with open(os.path.join(tmp, 'metrics.prom'), 'r', encoding='utf-8') as f:
+                assert f.read() == metrics.to_prometheus()
+        
+        print("✓ PASSED: Metrics work correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_http_session_pool():
+    """Test 20: Shared connection pool, per-thread sessions and transport retries"""
+    print("\n[TEST 20] Testing HTTP session pool...")
+    try:
+        import contextlib
+        import io
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from rate_limiter import RateLimiter
+        
+        page = b'<html><section class="_2vZr"><h2>Formula</h2><img src="f.png" alt="x = 1"></section></html>'
+        attempts = {}
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                # Setiap query gagal sekali dengan 502 sebelum berhasil
+                attempts[self.path] = attempts.get(self.path, 0) + 1
+                status, body = (502, b'') if attempts[self.path] == 1 else (200, page)
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        
+        scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None), memory_cache_size=0,
+                                      timeout=(2.0, 5.0))
+        scraper.base_url = f"http://127.0.0.1:{server.server_port}/input"
+        
+        queries = [f"retry query {i}" for i in range(6)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = scraper.search_multiple(queries, delay=0, workers=3)
+        assert all(r['status'] == 'success' for r in results), [r['error'] for r in results]
+        assert sorted(attempts.values()) == [2] * len(queries)
+        assert scraper.sessions.pool_size == 10
+        
+        # Session berbeda per thread, adapter dan header dipakai bersama
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(scraper.session))
+        thread.start()
+        thread.join()
+        assert sessions[0] is not scraper.session
+        assert sessions[0].get_adapter('http://x') is scraper.session.get_adapter('http://x')
+        scraper.session.headers['User-Agent'] = 'Custom Agent'
+        assert sessions[0].headers['User-Agent'] == 'Custom Agent'
+        
+        scraper.sessions.resize(32)
+        assert scraper.sessions.pool_size == 32
+        assert scraper.session.get_adapter('http://x') is scraper.sessions.adapter
+        
+        server.shutdown()
+        print("✓ PASSED: HTTP session pool works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_result_models():
+    """Test 21: Compact result models round-trip losslessly"""
+    print("\n[TEST 21] Testing result models...")
+    try:
+        import contextlib
+        import io
+        import tempfile
+        from models import Pod, SearchResult
+        
+        scraper = WolframAlphaScraper(memory_cache_size=0)
+        for name, content in load_fixtures():
+            pods = scraper._parse(content)
+            data = json.loads(json.dumps({'query': name, 'url': '', 'results': pods,
+                                          'status': 'success', 'error': None}))
+            model = SearchResult.from_dict(data)
+            assert model.to_dict() == data, name
+            assert list(model.to_dict()) == ['query', 'url', 'results', 'status', 'error']
+            assert SearchResult.from_dict(model.to_dict()) == model
+        
+        # Judul pod di-intern, string yang sama dalam satu hasil memakai satu objek
+        a = Pod.from_dict(json.loads('{"title": "Input interpretation", "content": [], "images": [], "formulas": []}'))
+        b = Pod.from_dict(json.loads('{"title": "Input interpretation", "content": [], "images": [], "formulas": []}'))
+        assert a.title is b.title
+        pod = Pod.from_dict(json.loads('{"title": "t", "content": ["x = 1", "x = 1"], '
+                                       '"images": [{"src": "f.png", "alt": "x = 1"}], "formulas": ["x = 1"]}'))
+        assert pod.content[0] is pod.content[1] is pod.images[0].alt is pod.formulas[0]
+        
+        # save_results menerima model maupun dict dengan output identik
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, 'dicts.json'), os.path.join(tmp, 'models.json')]
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.save_results([data], paths[0])
+                scraper.save_results([model], paths[1])
+            with open(paths[0], 'r', encoding='utf-8') as f1, open(paths[1], 'r', encoding='utf-8') as f2:
+                assert f1.read() == f2.read()
+        
+        print("✓ PASSED: Result models work correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_field_selection():
+    """Test 22: fields= extracts only the selected pod fields"""
+    print("\n[TEST 22] Testing field selection...")
+    try:
+        import contextlib
+        import io
+        import itertools
+        import tempfile
+        import benchmark
+        from lxml_extractor import FIELDS
+        from rate_limiter import RateLimiter
+        from response_cache import ResponseCache
+        from wolframalpha_scraper import normalize_fields
+        
+        pages = load_fixtures()
+        pages.append(('inline', '<section class="_2vZr"><h3>A<!-- c --> b</h3>'
+                                '<div>x<script>var s;</script>yz<span> w </span></div>'
+                                '<img src="i.png" alt="y = 2"><img src="j.png" alt="plot"></section>'.encode('utf-8')))
+        lxml_scraper = WolframAlphaScraper(memory_cache_size=0)
+        bs4_scraper = WolframAlphaScraper(memory_cache_size=0, parser='bs4')
+        
+        for name, content in pages:
+            full = lxml_scraper._parse(content)
+            for n in range(1, len(FIELDS)):
+                for combo in itertools.combinations(FIELDS, n):
+                    fields = normalize_fields(combo)
+                    got = lxml_scraper._parse(content, fields)
+                    assert got == bs4_scraper._parse(content, fields), (name, combo)
+                    # Sama dengan hasil penuh yang field lainnya dikosongkan
+                    expected = []
+                    for pod in full:
+                        pod = {key: value if key in fields else type(value)()
+                               for key, value in pod.items()}
+                        if any(pod.values()):
+                            expected.append(pod)
+                    assert got == expected, (name, combo)
+        
+        assert normalize_fields(None) is None
+        assert normalize_fields(list(FIELDS)) is None
+        assert normalize_fields('formulas, title') == {'formulas', 'title'}
+        for invalid in ('formula', ''):
+            try:
+                normalize_fields(invalid)
+                assert False, invalid
+            except ValueError:
+                pass
+        
+        # Hasil dengan sebagian field dicache terpisah dari hasil penuh
+        with tempfile.TemporaryDirectory() as tmp, benchmark.StubServer(pages[-1:]) as server:
+            scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None),
+                                          cache=ResponseCache(os.path.join(tmp, 'cache')))
+            scraper.base_url = server.url
+            with contextlib.redirect_stdout(io.StringIO()):
+                partial = scraper.search_multiple(['q'], delay=0, workers=2, fields=['formulas'])[0]
+                full = scraper.search_formula('q', delay=0)
+                partial_again = scraper.search_formula('q', delay=0, fields='formulas')
+            assert partial['results'] == [{'title': '', 'content': [], 'images': [],
+                                           'formulas': ['y = 2']}]
+            assert full['results'][0]['title'] == 'Ab'
+            assert len(full['results'][0]['images']) == 2
+            assert partial_again['results'] == partial['results']
+        
+        print("✓ PASSED: Field selection works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_formula_index():
+    """Test 23: Incremental inverted index over result files"""
+    print("\n[TEST 23] Testing formula index...")
+    try:
+        import tempfile
+        from formula_index import FormulaIndex
+        from result_writers import JsonlWriter
+        
+        def result(query, title, formulas, content=()):
+            pods = [{'title': title, 'content': list(content), 'images': [], 'formulas': formulas}]
+            return {'query': query, 'url': '', 'results': pods, 'status': 'success', 'error': None}
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = FormulaIndex(os.path.join(tmp, 'index', 'formulas.sqlite3'))
+            
+            json_path = os.path.join(tmp, 'results.json')
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump([result('Pythagorean theorem', 'Formula', ['a^2 + b^2 = c^2']),
+                           result('circle area', 'Result', ['A = π r^2'], ['area of a circle'])], f)
+            assert index.ingest_file(json_path) == 2
+            assert index.ingest_file(json_path) == 0
+            
+            # JSONL: hanya baris baru (dan lengkap) yang dibaca di ingest berikutnya
+            jsonl_path = os.path.join(tmp, 'results.jsonl')
+            with JsonlWriter(jsonl_path) as writer:
+                writer.write(result('sphere volume', 'Formula', ['V = 4/3 π r^3']))
+            assert index.ingest_file(jsonl_path) == 1
+            with open(jsonl_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result('ideal gas', 'Formula', ['PV = nRT'])) + '\n')
+                f.write('{"query": "trunc')
+            assert index.ingest_file(jsonl_path) == 1
+            
+            assert [h['query'] for h in index.search('r^2')] == ['circle area']
+            assert [h['query'] for h in index.search('π r')] == ['circle area', 'sphere volume']
+            assert index.search('A^2 + B^2')[0]['pods'][0]['formulas'] == ['a^2 + b^2 = c^2']
+            assert [h['query'] for h in index.search('formula', fields=['title'])] == \
+                ['Pythagorean theorem', 'sphere volume', 'ideal gas']
+            assert index.search('circle', fields=['formula']) == []
+            assert len(index.search('formula', limit=2)) == 2
+            
+            # Query yang sama (setelah normalisasi) menggantikan dokumen lama
+            index.add([result('PYTHAGOREAN  theorem', 'Formula', ['c = sqrt(a^2 + b^2)'])])
+            hits = index.search('a^2 + b^2')
+            assert [h['query'] for h in hits] == ['PYTHAGOREAN  theorem']
+            assert hits[0]['pods'][0]['formulas'] == ['c = sqrt(a^2 + b^2)']
+            assert index.stats()['documents'] == 4
+            
+            try:
+                index.search('x', fields=['formulas'])
+                assert False, "field tidak valid diterima"
+            except ValueError:
+                pass
+            index.close()
+            
+            # Index persisten: dibuka ulang tanpa ingest
+            with FormulaIndex(os.path.join(tmp, 'index', 'formulas.sqlite3')) as reopened:
+                assert [h['query'] for h in reopened.search('nRT')] == ['ideal gas']
+        
+        print("✓ PASSED: Formula index works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_query_dedup():
+    """Test 24: Batch dedup fetches each canonical query once and fans out"""
+    print("\n[TEST 24] Testing batch query dedup...")
+    try:
+        import contextlib
+        import io
+        import tempfile
+        import threading
+        from checkpoint import CheckpointJournal, iter_checkpointed
+        from query_dedup import QueryCanonicalizer
+        
+        fetched = []
+        lock = threading.Lock()
+        
+        def fake_search(query, delay=2.0, fields=None):
+            with lock:
+                fetched.append(query)
+            return {'query': query, 'url': scraper._build_url(query),
+                    'results': [{'title': query.casefold(), 'content': [], 'images': [], 'formulas': []}],
+                    'status': 'success', 'error': None}
+        
+        scraper = WolframAlphaScraper(memory_cache_size=0)
+        scraper.search_formula = fake_search
+        queries = ['Quadratic Formula', 'pi', 'quadratic  formula?', 'PI.', 'e', ' quadratic formula ', 'pi']
+        
+        for workers in (1, 3):
+            fetched.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = scraper.search_multiple(queries, delay=0, workers=workers,
+                                                  canonicalize=QueryCanonicalizer())
+            assert sorted(fetched) == ['Quadratic Formula', 'e', 'pi'], fetched
+            assert [r['query'] for r in results] == queries
+            assert [r['url'] for r in results] == [scraper._build_url(q) for q in queries]
+            assert results[5]['results'] == results[0]['results']
+            assert results[5]['results'] is not results[0]['results']
+        
+        # Aturan bisa diatur: tanpa 'punctuation', "PI." tetap berbeda dari "pi"
+        canonicalize = QueryCanonicalizer('case,whitespace')
+        assert canonicalize('quadratic  formula?') != canonicalize('Quadratic Formula')
+        assert canonicalize('PI.') != canonicalize('pi')
+        assert QueryCanonicalizer()('5!') == '5!'
+        try:
+            QueryCanonicalizer('case,stemming')
+            assert False, "aturan tidak valid diterima"
+        except ValueError:
+            pass
+        
+        # Mode file: setiap baris tetap dicatat di jurnal checkpoint
+        fetched.clear()
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            with CheckpointJournal(os.path.join(tmp, 'run.checkpoint.jsonl')) as journal:
+                results = list(iter_checkpointed(scraper, queries, journal, delay=0, workers=2,
+                                                 canonicalize=QueryCanonicalizer()))
+                assert journal.status_counts() == {'success': len(queries)}
+        assert [r['query'] for r in results] == queries
+        assert len(fetched) == 3
+        
+        print("✓ PASSED: Batch query dedup works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_sqlite_writer():
+    """Test 25: SQLite sink with batched, concurrent writes"""
+    print("\n[TEST 25] Testing SQLite result sink...")
+    try:
+        import sqlite3
+        import tempfile
+        import threading
+        from result_writers import SqliteWriter, iter_results, open_writer, read_sqlite
+        
+        scraper = WolframAlphaScraper(memory_cache_size=0)
+        base = [{'query': name, 'url': 'u', 'results': scraper._parse(content),
+                 'status': 'success', 'error': None} for name, content in load_fixtures()]
+        base.append({'query': 'gagal', 'url': 'u', 'results': [], 'status': 'error', 'error': 'Network error'})
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'results.db')
+            with open_writer(path) as writer:
+                assert isinstance(writer, SqliteWriter)
+                writer.batch_size = 4
+                for result in base:
+                    writer.write(result)
+            assert list(read_sqlite(path)) == base
+            assert list(iter_results(path)) == base
+            
+            # Beberapa thread dan dua writer (seperti dua process) ke file yang sama;
+            # hasil yang sudah ada tidak dihapus
+            with open_writer(path) as first, SqliteWriter(path, batch_size=5) as second:
+                first.batch_size = 3
+                def write(writer, offset):
+                    for i in range(offset, 40, 4):
+                        writer.write(dict(base[i % len(base)], query=f"q{i}"))
+                threads = [threading.Thread(target=write, args=(writer, offset))
+                           for offset, writer in enumerate([first, second, first, second])]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            
+            results = {r['query']: r for r in read_sqlite(path)}
+            assert len(results) == 40 + len(base)
+            assert [r for r in read_sqlite(path) if not r['query'].startswith('q')] == base
+            for i in range(40):
+                assert results[f"q{i}"] == dict(base[i % len(base)], query=f"q{i}"), i
+            
+            conn = sqlite3.connect(path)
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            expected = (sum(len(r['results']) for r in base)
+                        + sum(len(base[i % len(base)]['results']) for i in range(40)))
+            assert conn.execute('SELECT COUNT(*) FROM pods').fetchone()[0] == expected
+            conn.close()
+            
+            # Mengganti isi database harus diminta secara eksplisit
+            with open_writer(path, overwrite=True) as writer:
+                writer.write(base[0])
+            assert list(read_sqlite(path)) == base[:1]
+        
+        print("✓ PASSED: SQLite result sink works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_work_queue():
+    """Test 26: Work queue leases, re-delivery and exactly-once results"""
+    print("\n[TEST 26] Testing distributed work queue...")
+    try:
+        import contextlib
+        import io
+        import sqlite3
+        import tempfile
+        import time
+        from metrics import Metrics
+        from work_queue import (DONE, FAILED, LEASED, PENDING, SqliteWorkQueue, WorkQueue,
+                                open_queue, run_worker)
+        
+        def result(query, status='success'):
+            return {'query': query, 'url': 'u', 'results': [], 'status': status, 'error': None}
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            location = 'sqlite:' + os.path.join(tmp, 'batch.queue')
+            with open_queue(location, max_attempts=2) as queue, open_queue(location) as other:
+                assert queue.enqueue(['q0', 'q1', 'q2', 'q3']) == 4
+                
+                # Worker A crash: lease habis lalu task dikirim ulang ke worker B
+                crashed = queue.lease('a', 2, lease_seconds=0.05)
+                assert [t.query for t in crashed] == ['q0', 'q1']
+                held = other.lease('b', 1, 60)
+                assert [t.query for t in held] == ['q2']
+                time.sleep(0.1)
+                redelivered = other.lease('b', 5, 60)
+                assert [t.query for t in redelivered] == ['q0', 'q1', 'q3']
+                assert [t.attempts for t in redelivered] == [2, 2, 1]
+                
+                # Hasil terlambat dari worker A dibuang, hanya pemegang lease yang dicatat
+                assert not queue.complete(crashed[0], result('q0', 'late'))
+                assert other.complete(redelivered[0], result('q0'))
+                assert not other.complete(redelivered[0], result('q0', 'twice'))
+                assert queue.extend(redelivered, 60) == 2
+                assert queue.counts() == {PENDING: 0, LEASED: 3, DONE: 1, FAILED: 0}
+                
+                # Task yang terus membuat worker mati ditandai failed setelah max_attempts
+                queue.extend(redelivered[1:2], 0.01)
+                time.sleep(0.05)
+                assert queue.lease('a', 5, 60) == []
+                assert queue.counts()[FAILED] == 1
+                assert queue.requeue() == 1
+                
+                class FakeScraper:
+                    def iter_search_completed(self, queries, delay, workers, fields):
+                        for i, query in reversed(list(enumerate(queries))):
+                            yield i, result(query, 'error' if query == 'q2' else 'success')
+                
+                # Worker B mati: worker baru menunggu sampai lease q2 dan q3 habis
+                other.extend(held + redelivered[2:], 0.2)
+                stats = run_worker(FakeScraper(), queue, lease_seconds=0.3, poll_interval=0.05)
+                assert stats == {'recorded': 3, 'discarded': 0}, stats
+                assert [r['query'] for r in queue.iter_results()] == ['q0', 'q1', 'q2', 'q3']
+                assert [r['status'] for r in queue.iter_results()].count('error') == 1
+                assert queue.requeue() == 1
+                assert queue.counts()[PENDING] == 1
+                
+                # Heartbeat tetap berjalan meski extend gagal sesaat
+                class LockedOnce(SqliteWorkQueue):
+                    extends = 0
+                    def extend(self, tasks, lease_seconds):
+                        self.extends += 1
+                        if self.extends == 1:
+                            raise sqlite3.OperationalError('database is locked')
+                        return super().extend(tasks, lease_seconds)
+                
+                class SlowScraper:
+                    metrics = Metrics()
+                    def iter_search_completed(self, queries, delay, workers, fields):
+                        for i, query in enumerate(queries):
+                            time.sleep(0.25)
+                            yield i, result(query)
+                
+                scraper = SlowScraper()
+                with LockedOnce(os.path.join(tmp, 'batch.queue')) as locked:
+                    stats = run_worker(scraper, locked, lease_seconds=0.09, poll_interval=0.05)
+                assert stats == {'recorded': 1, 'discarded': 0}, stats
+                assert locked.extends >= 2, locked.extends
+                assert scraper.metrics.counter('heartbeat_errors') == 1
+                assert queue.counts()[DONE] == 4
+                
+                # Slot yang kosong langsung diisi lease baru, dan complete yang gagal
+                # sesaat dicoba lagi tanpa menghentikan worker
+                class Recording(SqliteWorkQueue):
+                    completed = []
+                    leased = []
+                    def lease(self, worker, count, lease_seconds):
+                        tasks = super().lease(worker, count, lease_seconds)
+                        self.leased.append(len(tasks))
+                        return tasks
+                    def complete(self, task, result):
+                        if task.query == 'b' and 'b!' not in self.completed:
+                            self.completed.append('b!')
+                            raise sqlite3.OperationalError('database is locked')
+                        self.completed.append(task.query)
+                        return super().complete(task, result)
+                
+                scraper = WolframAlphaScraper(memory_cache_size=0)
+                scraper.search_formula = lambda query, delay=0, fields=None: (
+                    time.sleep(0.4 if query == 'slow' else 0.02) or result(query))
+                with Recording(os.path.join(tmp, 'topup.queue')) as recording:
+                    recording.enqueue(['slow', 'a', 'b', 'c', 'd'])
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        stats = run_worker(scraper, recording, delay=0, workers=2, batch_size=2,
+                                           poll_interval=0.05)
+                    assert stats == {'recorded': 5, 'discarded': 0}, stats
+                    # Query cepat tidak menunggu query lambat yang di-lease bersamanya
+                    assert recording.completed[-1] == 'slow', recording.completed
+                    assert sorted(recording.completed) == ['a', 'b', 'b!', 'c', 'd', 'slow']
+                    assert max(recording.leased) <= 2 and sum(recording.leased) == 5, recording.leased
+                    assert [r['query'] for r in recording.iter_results()] == ['slow', 'a', 'b', 'c', 'd']
+                
+                try:
+                    WorkQueue()
+                    assert False, "WorkQueue harus abstrak"
+                except TypeError:
+                    pass
+        
+        print("✓ PASSED: Work queue works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_scraper_daemon():
+    """Test 27: Daemon HTTP API over TCP and Unix socket with thin client"""
+    print("\n[TEST 27] Testing scraper daemon...")
+    try:
+        import contextlib
+        import io
+        import subprocess
+        import tempfile
+        import threading
+        from query_dedup import QueryCanonicalizer
+        from scraper_daemon import DaemonClient, create_server
+        
+        fetched = []
+        
+        def fake_search(query, delay=2.0, fields=None):
+            fetched.append((query, fields))
+            return {'query': query, 'url': scraper._build_url(query),
+                    'results': [{'title': query, 'content': [], 'images': [], 'formulas': ['x^2']}],
+                    'status': 'success', 'error': None}
+        
+        scraper = WolframAlphaScraper(memory_cache_size=0)
+        scraper.search_formula = fake_search
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            sock = os.path.join(tmp, 'wa.sock')
+            for address in ('127.0.0.1:0', 'unix:' + sock):
+                server = create_server(scraper, address, delay=0, quiet=True)
+                if address.endswith(':0'):
+                    address = '127.0.0.1:%d' % server.server_address[1]
+                thread = threading.Thread(target=server.serve_forever, daemon=True)
+                thread.start()
+                try:
+                    client = DaemonClient(address)
+                    assert client.health()['status'] == 'ok'
+                    
+                    fetched.clear()
+                    result = client.search_formula('pi', fields=['formulas'])
+                    assert result['query'] == 'pi' and result['results'][0]['formulas'] == ['x^2']
+                    assert fetched == [('pi', frozenset({'formulas'}))]
+                    
+                    queries = ['Pi', 'e', 'pi.', 'tau']
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results = client.search_multiple(queries, workers=2,
+                                                         canonicalize=QueryCanonicalizer())
+                    assert [r['query'] for r in results] == queries
+                    assert [r['url'] for r in results] == [scraper._build_url(q) for q in queries]
+                    assert len(fetched) == 1 + 3
+                    
+                    try:
+                        client.search_formula('pi', fields='formulas,color')
+                        assert False, "field tidak valid diterima"
+                    except ValueError:
+                        pass
+                finally:
+                    server.shutdown()
+                    server.server_close()
+            
+            assert not os.path.exists(sock)
+            try:
+                DaemonClient('unix:' + sock).health()
+                assert False, "daemon mati masih bisa dihubungi"
+            except ConnectionError:
+                pass
+            
+            # Mode file dan single query keluar dengan status 1 jika daemon mati
+            query_file = os.path.join(tmp, 'queries.txt')
+            with open(query_file, 'w', encoding='utf-8') as f:
+                f.write('pi\n')
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cli.py')
+            for mode in (['-f', query_file], ['pi']):
+                run = subprocess.run([sys.executable, script, *mode, '-q', '--daemon', 'unix:' + sock,
+                                      '-o', os.path.join(tmp, 'out.json')],
+                                     capture_output=True, text=True)
+                assert run.returncode == 1, (mode, run.returncode, run.stdout)
+                assert 'Daemon tidak bisa dihubungi' in run.stdout, run.stdout
+        
+        print("✓ PASSED: Scraper daemon works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_import_time_budget():
+    """Test 28: CLI startup stays within its import-time budget"""
+    print("\n[TEST 28] Testing lazy imports and CLI import-time budget...")
+    try:
+        import subprocess
+        import tempfile
+        
+        # Modul berat yang hanya boleh dimuat saat fetch/parse atau subcommand terkait
+        heavy = ('requests', 'urllib3', 'bs4', 'lxml', 'http.server')
+        budget_ms = 100
+        here = os.path.dirname(os.path.abspath(__file__))
+        # Bytecode harus bisa ditulis, kalau tidak setiap run mengukur kompilasi
+        env = dict(os.environ)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        
+        def importtime(code):
+            output = ''
+            for _ in range(2):
+                output = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=here,
+                                        env=env, capture_output=True, text=True, check=True).stderr
+            times = {}
+            for line in output.splitlines():
+                if line.startswith('import time:') and '|' in line:
+                    _, cumulative, name = line[len('import time:'):].split('|')
+                    if cumulative.strip().isdigit():
+                        times[name.strip()] = int(cumulative) / 1000
+            return times
+        
+        times = importtime('import cli')
+        loaded = sorted({name if name in heavy else name.split('.')[0]
+                         for name in times if name in heavy or name.split('.')[0] in heavy})
+        assert not loaded, f"cli memuat modul berat saat startup: {loaded}"
+        assert times['cli'] < budget_ms, f"import cli {times['cli']:.1f} ms > {budget_ms} ms"
+        
+        # Cache hit tidak membutuhkan requests/bs4/lxml
+        with tempfile.TemporaryDirectory() as tmp:
+            code = (
+                "import sys\n"
+                "from response_cache import ResponseCache\n"
+                "from wolframalpha_scraper import WolframAlphaScraper, cache_key\n"
+                f"cache = ResponseCache({tmp!r})\n"
+                "cache.put(cache_key('pi'), {'results': [{'title': 'Pi'}], 'status': 'success'})\n"
+                "result = WolframAlphaScraper(cache=cache).search_formula('pi', delay=0)\n"
+                "assert result['status'] == 'success', result\n"
+                f"loaded = [m for m in {heavy!r} if m in sys.modules]\n"
+                "assert not loaded, loaded\n"
+            )
+            subprocess.run([sys.executable, '-c', code], cwd=here, env=env,
+                           capture_output=True, text=True, check=True)
+        
+        print(f"  import cli: {times['cli']:.1f} ms (budget {budget_ms} ms)")
+        print("✓ PASSED: CLI import-time budget holds")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"✗ FAILED: {e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e}")
+        return False
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_interactive_session():
+    """Test 29: Non-blocking interactive session with session cache and prefetch"""
+    print("\n[TEST 29] Testing non-blocking interactive session...")
+    try:
+        import threading
+        import time
+        from interactive_session import InteractiveSession
+        
+        release = threading.Event()
+        fetched = []
+        shown = []
+        done = threading.Event()
+        
+        class FakeScraper:
+            def search_formula(self, query, delay=2.0, fields=None):
+                fetched.append(query)
+                if query == 'boom':
+                    raise ConnectionError('daemon mati')
+                if query == 'flaky' and fetched.count(query) == 1:
+                    return {'query': query, 'url': 'u', 'results': [], 'status': 'error',
+                            'error': 'Network error: timeout'}
+                release.wait(5)
+                return {'query': query, 'url': 'u', 'results': [], 'status': 'success', 'error': None}
+        
+        def on_result(result, background):
+            shown.append((result['query'], result['status'], background))
+            done.set()
+        
+        with InteractiveSession(FakeScraper(), delay=0, workers=2, on_result=on_result) as session:
+            # Prompt tidak menunggu request selesai
+            started = time.perf_counter()
+            assert session.submit('pi') == 'started'
+            assert session.submit('PI ') == 'running'
+            assert session.prefetch(['e', ' pi', '']) == 1
+            assert time.perf_counter() - started < 1.0
+            assert session.pending() == 2 and shown == []
+            
+            release.set()
+            assert done.wait(5)
+            while session.pending():
+                time.sleep(0.01)
+            # Hasil prefetch tidak ditampilkan sampai diminta, lalu langsung dari cache sesi
+            assert shown == [('pi', 'success', True)], shown
+            assert session.submit('e') == 'cached'
+            assert shown[-1] == ('e', 'success', False)
+            
+            done.clear()
+            assert session.submit('boom') == 'started'
+            assert done.wait(5)
+            assert shown[-1] == ('boom', 'error', True)
+            
+            assert sorted(fetched) == ['boom', 'e', 'pi']
+            assert [r['query'] for r in session.results()] == ['pi', 'e', 'boom']
+            
+            # Error tidak di-cache: query yang sama dicoba lagi, bukan diputar ulang
+            for expected in ('error', 'success'):
+                done.clear()
+                assert session.submit('flaky') == 'started'
+                assert done.wait(5)
+                assert shown[-1] == ('flaky', expected, True), shown
+            assert fetched.count('flaky') == 2
+            done.clear()
+            assert session.submit('boom') == 'started'
+            assert done.wait(5)
+            assert fetched.count('boom') == 2
+            assert [r['query'] for r in session.results()] == ['pi', 'e', 'flaky', 'boom']
+        
+        print("✓ PASSED: Interactive session works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_streaming_parse():
+    """Test 30: Incremental streaming parse, early stop and body size cap"""
+    print("\n[TEST 30] Testing streaming parse...")
+    try:
+        import contextlib
+        import io
+        import benchmark
+        from lxml_extractor import LxmlExtractor
+        from rate_limiter import RateLimiter
+        from wolframalpha_scraper import normalize_fields
+        
+        def chunked(content, size, consumed=None):
+            for i in range(0, len(content), size):
+                if consumed is not None:
+                    consumed.append(i)
+                yield content[i:i + size]
+        
+        extractor = LxmlExtractor()
+        pages = load_fixtures()
+        for name, content in pages:
+            for fields in (None, normalize_fields('formulas'), normalize_fields('title,content')):
+                expected = extractor.extract(content, fields)
+                for size in (7, 4096):
+                    assert extractor.extract_stream(chunked(content, size), fields) == expected, (name, size)
+                for max_pods in (1, 2):
+                    got = extractor.extract_stream(chunked(content, 4096), fields, max_pods)
+                    assert got == expected[:max_pods], (name, max_pods)
+        assert extractor.extract_stream(iter([])) == []
+        
+        # Berhenti membaca chunk begitu pod yang diminta ditemukan (section harus
+        # tertutup rapi; div yang tidak ditutup membuat libxml menyarangkan pod berikutnya)
+        name, content = next(page for page in pages if page[0] == 'pod_sections_deep_nesting.html')
+        consumed = []
+        assert len(extractor.extract_stream(chunked(content, 256, consumed), max_pods=1)) == 1
+        assert len(consumed) < len(content) / 256, name
+        
+        with benchmark.StubServer(pages) as server:
+            queries = [f"stream query {i}" for i in range(len(pages))]
+            outputs = []
+            for options in ({}, {'stream': True}, {'stream': True, 'parser': 'bs4'}):
+                scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None),
+                                              memory_cache_size=0, **options)
+                scraper.base_url = server.url
+                with contextlib.redirect_stdout(io.StringIO()):
+                    outputs.append(scraper.search_multiple(queries, delay=0, workers=2))
+            assert outputs[1] == outputs[0]
+            assert [r['status'] for r in outputs[2]] == [r['status'] for r in outputs[0]]
+            
+            scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None), memory_cache_size=0,
+                                          stream=True, max_pods=1)
+            scraper.base_url = server.url
+            with contextlib.redirect_stdout(io.StringIO()):
+                limited = scraper.search_multiple(queries, delay=0)
+            assert [r['results'] for r in limited] == [r['results'][:1] for r in outputs[0]]
+            
+            # Body di atas batas menjadi error, baik stream maupun tidak
+            for stream in (False, True):
+                scraper = WolframAlphaScraper(rate_limiter=RateLimiter(rate=None), memory_cache_size=0,
+                                              stream=stream, max_body_size=64)
+                scraper.base_url = server.url
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = scraper.search_formula(queries[0], delay=0)
+                assert result['status'] == 'error' and '64 byte' in result['error'], result
+        
+        # Tanpa Content-Length, batas dijaga saat membaca chunk
+        class ChunkedResponse:
+            status_code = 200
+            headers = {}
+            def __init__(self):
+                self.consumed = []
+            def iter_content(self, size):
+                return chunked(pages[0][1], 100, self.consumed)
+            def raise_for_status(self):
+                pass
+            def close(self):
+                pass
+        
+        scraper = WolframAlphaScraper(max_body_size=250)
+        try:
+            list(scraper._read_stream(ChunkedResponse()))
+            assert False, 'batas ukuran tidak dijaga'
+        except ValueError:
+            pass
+        
+        # Jalur tanpa stream juga berhenti membaca begitu batas terlampaui
+        response = ChunkedResponse()
+        scraper._get_with_backoff = lambda url, delay, headers=None: response
+        with contextlib.redirect_stdout(io.StringIO()):
+            result, parsed, body = scraper._fetch('chunked query', 0)
+        assert result['status'] == 'error' and '250 byte' in result['error'], result
+        assert parsed is None and body is None
+        assert len(response.consumed) == 3, len(response.consumed)
+        for invalid in ({'max_body_size': 0}, {'max_pods': -1}):
+            try:
+                WolframAlphaScraper(**invalid)
+                assert False, invalid
+            except ValueError:
+                pass
+        
+        print("✓ PASSED: Streaming parse works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_extraction_strategies():
+    """Test 31: Strategy selector with remembered winners and pluggable strategies"""
+    print("\n[TEST 31] Testing extraction strategies...")
+    try:
+        import random
+        from bs4 import BeautifulSoup
+        from extraction_strategies import (STRATEGIES, Strategy, StrategySelector, has_class,
+                                           match_lxml)
+        from lxml_extractor import LxmlExtractor
+        from metrics import Metrics
+        
+        pages = load_fixtures()
+        expected = {name: LxmlExtractor().extract(content) for name, content in pages}
+        
+        # Hasil tidak bergantung pada urutan dokumen (strategi yang diingat)
+        scraper = WolframAlphaScraper(memory_cache_size=0)
+        order = [page for page in pages for _ in range(3)]
+        random.Random(7).shuffle(order)
+        for parser in ('lxml', 'bs4'):
+            scraper.parser = parser
+            for name, content in order:
+                assert scraper._parse(content) == expected[name], (parser, name)
+        stats = scraper.strategies.stats()
+        assert sum(s['hits'] for s in stats.values()) == len(order) * 2
+        assert stats['testid']['hits'] == 6 and stats['scripts']['hits'] == 6
+        
+        # Halaman fallback berikutnya hanya butuh satu pass pohon
+        content = dict(pages)['testid_pods_pythagorean.html']
+        root = LxmlExtractor().parse(content)
+        extractor = LxmlExtractor()
+        passes = []
+        
+        def counting(strategies):
+            passes.append([s.name for s in strategies])
+            return match_lxml(root, strategies)
+        
+        extract = lambda strategy, elements: [extractor.extract_pod(e) for e in elements]
+        for _ in range(2):
+            match = extractor.selector.select(counting, extract)
+            assert match.strategy == 'testid' and match.results
+        assert passes == [['sections'], ['testid'], ['sections', 'testid']], passes
+        
+        # Metrics mencatat strategi yang menang per dokumen
+        metrics = Metrics()
+        scraper = WolframAlphaScraper(memory_cache_size=0, metrics=metrics)
+        scraper._parse(content)
+        assert metrics.to_dict()['phases']['strategy_testid']['count'] == 1
+        
+        # Strategi tambahan bisa didaftarkan sebelum fallback script
+        strategies = STRATEGIES[:2] + (Strategy('articles', 'article', 'class', has_class('pod')),
+                                       STRATEGIES[2])
+        html = b'<html><body><article class="x pod"><h2>Judul</h2><p>isi</p></article></body></html>'
+        for parser in ('lxml', 'bs4'):
+            scraper = WolframAlphaScraper(memory_cache_size=0, parser=parser, strategies=strategies)
+            assert scraper._parse(html) == [{'title': 'Judul', 'content': ['isi'],
+                                             'images': [], 'formulas': []}], parser
+            assert scraper.strategies.stats()['articles']['hits'] == 1
+        soup = BeautifulSoup(html, 'lxml')
+        assert WolframAlphaScraper(memory_cache_size=0)._extract_results(soup) == []
+        
+        for invalid in (STRATEGIES[::-1], STRATEGIES + STRATEGIES[:1], ()):
+            try:
+                StrategySelector(invalid)
+                assert False, invalid
+            except ValueError:
+                pass
+        
+        print("✓ PASSED: Extraction strategies work correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_script_json_extraction():
+    """Test 32: Structured, bounded pod extraction from embedded script JSON"""
+    print("\n[TEST 32] Testing script JSON extraction...")
+    try:
+        import lxml_extractor
+        from lxml_extractor import (MAX_JSON_DEPTH, MAX_JSON_PODS, MAX_JSON_SUBPODS, MAX_JSON_TEXT,
+                                    extract_json_pods)
+        from wolframalpha_scraper import normalize_fields
+        
+        def pod(title, *subpods):
+            return {'title': title, 'subpods': [{'plaintext': text, 'img': {'src': src, 'alt': alt}}
+                                                for text, src, alt in subpods]}
+        
+        data = {'props': {'i18n': {'msg': 'x' * 1000}, 'queryresult': {'pods': [
+            pod('Input', ('circle area', 'a.gif', 'plot')),
+            pod('Result', (' A = π r^2 ', 'b.gif', 'A = π r^2'), ('', '', '')),
+            pod('', ('', '', ''))]}}}
+        expected = [
+            {'title': 'Input', 'content': ['circle area'], 'images': [{'src': 'a.gif', 'alt': 'plot'}],
+             'formulas': []},
+            {'title': 'Result', 'content': ['A = π r^2'], 'images': [{'src': 'b.gif', 'alt': 'A = π r^2'}],
+             'formulas': ['A = π r^2']}]
+        text = json.dumps(data)
+        
+        # Hanya objek pod yang diambil; script tanpa pod atau tidak valid dilewati
+        assert extract_json_pods([text, json.dumps({'a': [1, 2]}), '{"subpods": ', None, '']) == expected
+        assert extract_json_pods([text], normalize_fields('formulas')) == [
+            {'title': '', 'content': [], 'images': [], 'formulas': ['A = π r^2']}]
+        
+        # Batas ukuran script, kedalaman, jumlah pod/subpod, dan panjang teks
+        original = lxml_extractor.MAX_SCRIPT_CHARS
+        lxml_extractor.MAX_SCRIPT_CHARS = len(text) - 1
+        try:
+            assert extract_json_pods([text]) == []
+        finally:
+            lxml_extractor.MAX_SCRIPT_CHARS = original
+        nested = pod('Deep', ('x', '', ''))
+        for _ in range(MAX_JSON_DEPTH + 1):
+            nested = {'child': nested}
+        assert extract_json_pods([json.dumps(nested)]) == []
+        many = [pod(f'P{i}', *[(f's{j}', '', '') for j in range(MAX_JSON_SUBPODS + 5)])
+                for i in range(MAX_JSON_PODS + 5)]
+        pods = extract_json_pods([json.dumps(many)])
+        assert len(pods) == MAX_JSON_PODS
+        assert all(len(p['content']) == MAX_JSON_SUBPODS for p in pods)
+        long_text = extract_json_pods([json.dumps([pod('Long', ('y' * (MAX_JSON_TEXT * 2), '', ''))])])
+        assert len(long_text[0]['content'][0]) == MAX_JSON_TEXT
+        
+        # Tanpa orjson, json bawaan dipakai dengan hasil yang sama
+        saved = sys.modules.get('orjson')
+        sys.modules['orjson'] = None
+        lxml_extractor._json_loads.cache_clear()
+        try:
+            assert lxml_extractor._json_loads() is json.loads
+            assert extract_json_pods([text]) == expected
+        finally:
+            if saved is None:
+                del sys.modules['orjson']
+            else:
+                sys.modules['orjson'] = saved
+            lxml_extractor._json_loads.cache_clear()
+        
+        # Halaman fixture: pod ringkas, sama untuk kedua backend
+        content = dict(load_fixtures())['script_json_area_of_circle.html']
+        for parser in ('lxml', 'bs4'):
+            results = WolframAlphaScraper(parser=parser, memory_cache_size=0)._parse(content)
+            assert [r['title'] for r in results][:2] == ['Input interpretation', 'Result'], parser
+            assert all(len(text) < 200 for r in results for text in r['content'])
+        
+        print("✓ PASSED: Script JSON extraction works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
+def test_cli_subcommand_escape():
+    """Test 33: Queries spelled like a subcommand can be escaped with --"""
+    print("\n[TEST 33] Testing CLI subcommand escape...")
+    try:
+        import subprocess
+        import cli
+        
+        assert cli.split_command(['index', 'a.json']) == ('index', ['a.json'])
+        assert cli.split_command(['--', 'index', '-o', 'x.json']) == (None, ['-o', 'x.json', '--', 'index'])
+        assert cli.split_command(['-d', '3', 'index']) == (None, ['-d', '3', 'index'])
+        assert cli.split_command(['--']) == (None, ['--'])
+        assert cli.split_command([]) == (None, [])
+        
+        # "--" memilih parser mode query, bukan parser subcommand
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cli.py')
+        for argv, prog in ((['serve', '-h'], 'cli.py serve'), (['--', 'serve', '-h'], 'cli.py [-h]')):
+            output = subprocess.run([sys.executable, script] + argv, capture_output=True,
+                                    text=True, check=True).stdout
+            assert output.startswith('usage: ' + prog), (argv, output[:80])
+        
+        print("✓ PASSED: CLI subcommand escape works correctly")
+        return True
+    except Exception as e:
+        print(f"✗ FAILED: {e}")
+        return False
+
+
 def run_all_tests():
     """Run all tests"""
     print("="*80)
@@ -165,7 +1743,33 @@ def run_all_tests():
         test_save_and_load,
         test_multiple_queries_structure,
         test_cli_import,
-        test_examples_import
+        test_examples_import,
+        test_concurrent_search_order,
+        test_rate_limiter,
+        test_response_cache,
+        test_memory_cache,
+        test_streaming_writers,
+        test_checkpoint_resume,
+        test_lxml_parser_matches_bs4,
+        test_pod_extraction_regression,
+        test_benchmark_suite,
+        test_response_archive_reparse,
+        test_fetch_parse_pipeline,
+        test_metrics,
+        test_http_session_pool,
+        test_result_models,
+        test_field_selection,
+        test_formula_index,
+        test_query_dedup,
+        test_sqlite_writer,
+        test_work_queue,
+        test_scraper_daemon,
+        test_import_time_budget,
+        test_interactive_session,
+        test_streaming_parse,
+        test_extraction_strategies,
+        test_script_json_extraction,
+        test_cli_subcommand_escape
     ]
     
     results = []
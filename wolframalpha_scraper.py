@@ -7,13 +7,99 @@ Copyright (c) 2026 Achmad Syarifudin
 Licensed under MIT License
 """
 
-import requests
-from bs4 import BeautifulSoup
+import copy
+import itertools
 import json
 import time
-from typing import Dict, List, Optional
+import unicodedata
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 import urllib.parse
 
+from rate_limiter import RateLimiter, THROTTLE_STATUSES, default_rate_limiter, parse_retry_after
+from response_cache import CacheEntry, MemoryCache, ResponseCache
+from lxml_extractor import (FIELDS, FORMULA_CHARS, TEXT_TAGS, TITLE_TAGS, LxmlExtractor,
+                            extract_json_pods, keep_pod)
+from extraction_strategies import Strategy, StrategyMatch, StrategySelector, match_soup
+from response_archive import ResponseArchive
+from metrics import MetricsHook
+from http_session import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, SessionPool, request_errors
+from models import SearchResult, as_dict, json_default
+from query_dedup import group_queries
+
+# requests, bs4, dan lxml baru dimuat saat fetch atau parse pertama (startup CLI cepat)
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
+
+# Backend parser yang tersedia: lxml langsung (cepat) atau BeautifulSoup
+PARSERS = ('lxml', 'bs4')
+
+# Ukuran chunk saat membaca body response dengan stream=True
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalisasi query untuk dipakai sebagai kunci cache.
+    Normalize a query for use as a cache key.
+    
+    Args:
+        query (str): Query asli
+        
+    Returns:
+        str: Query dalam bentuk Unicode NFKC, casefold, dengan spasi yang dirapikan
+    """
+    query = unicodedata.normalize('NFKC', query)
+    return ' '.join(query.split()).casefold()
+
+
+def normalize_fields(fields: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """
+    Validasi pilihan field pod.
+    Validate a selection of pod fields.
+    
+    Args:
+        fields: Nama field (lihat FIELDS) sebagai iterable atau string dipisah koma;
+            None berarti semua field
+        
+    Returns:
+        Optional[FrozenSet[str]]: Field yang dipilih, atau None jika semua field
+            dipilih (ekstraksi penuh)
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    selected = frozenset(field.strip() for field in fields if field.strip())
+    unknown = selected.difference(FIELDS)
+    if unknown:
+        raise ValueError(f"Field tidak dikenal: {', '.join(sorted(unknown))} "
+                         f"(pilihan: {', '.join(FIELDS)})")
+    if not selected:
+        raise ValueError(f"Pilih minimal satu field (pilihan: {', '.join(FIELDS)})")
+    return None if len(selected) == len(FIELDS) else selected
+
+
+def cache_key(query: str, fields: Optional[FrozenSet[str]] = None,
+              max_pods: Optional[int] = None) -> str:
+    """
+    Kunci cache untuk query; hasil dengan sebagian field atau pod disimpan terpisah.
+    Cache key for a query; results with a subset of fields or pods are cached separately.
+    """
+    # Query yang sudah dinormalisasi tidak pernah berisi newline
+    key = normalize_query(query)
+    if fields is not None:
+        key += '\nfields=' + ','.join(field for field in FIELDS if field in fields)
+    if max_pods is not None:
+        key += f'\npods={max_pods}'
+    return key
+
+
+def _cacheable(result: Dict) -> bool:
+    """Hanya hasil sukses yang disimpan di cache in-memory (error dicoba ulang)."""
+    return result['status'] == 'success'
+
 
 class WolframAlphaScraper:
     """
@@ -21,8 +107,48 @@ class WolframAlphaScraper:
     Class for scraping formulas and information from WolframAlpha.
     """
     
-    def __init__(self):
-        """Inisialisasi scraper dengan headers yang sesuai."""
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, max_retries: int = 3,
+                 cache: Optional[ResponseCache] = None, memory_cache_size: int = 256,
+                 parser: str = 'lxml', archive: Optional[ResponseArchive] = None,
+                 parse_processes: int = 0, metrics: Optional[MetricsHook] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT, http_retries: int = 3,
+                 pool_size: int = DEFAULT_POOL_SIZE, stream: bool = False,
+                 max_body_size: Optional[int] = None, max_pods: Optional[int] = None,
+                 strategies: Optional[Iterable[Strategy]] = None):
+        """
+        Inisialisasi scraper dengan headers yang sesuai.
+        Initialize the scraper with suitable headers.
+        
+        Args:
+            rate_limiter (RateLimiter): Rate limiter bersama (default: limiter global proses)
+            max_retries (int): Jumlah percobaan ulang saat server membalas 429/503
+            cache (ResponseCache): Cache persisten opsional untuk hasil pencarian
+            memory_cache_size (int): Ukuran cache LRU in-memory (0 = nonaktif)
+            parser (str): Backend parser, 'lxml' (cepat) atau 'bs4' (BeautifulSoup)
+            archive (ResponseArchive): Arsip opsional untuk body response mentah
+            parse_processes (int): Jumlah process parser untuk batch paralel
+                (0 = parse di thread worker)
+            metrics (MetricsHook): Hook untuk durasi per fase dan counter status
+                (default: tanpa operasi, lihat metrics.Metrics)
+            timeout (Tuple[float, float]): Timeout (connect, read) dalam detik
+            http_retries (int): Retry transport untuk error koneksi/read dan 5xx
+            pool_size (int): Ukuran connection pool awal (diperbesar sesuai workers)
+            stream (bool): Download body per chunk dan parse secara incremental
+                (parser lxml); pod diekstrak begitu section-nya selesai
+            max_body_size (int): Batas ukuran body response dalam byte (None = tanpa batas)
+            max_pods (int): Simpan hanya pod sebanyak ini; dengan stream=True download
+                berhenti begitu pod tersebut ditemukan (None = semua)
+            strategies (Iterable[Strategy]): Strategi pencarian pod dalam urutan prioritas
+                (default: extraction_strategies.STRATEGIES; parse_processes selalu
+                memakai default)
+        """
+        if parser not in PARSERS:
+            raise ValueError(f"Parser tidak dikenal: {parser} (pilihan: {', '.join(PARSERS)})")
+        if max_body_size is not None and max_body_size <= 0:
+            raise ValueError(f"max_body_size harus lebih dari 0: {max_body_size}")
+        if max_pods is not None and max_pods <= 0:
+            raise ValueError(f"max_pods harus lebih dari 0: {max_pods}")
+        
         self.base_url = "https://www.wolframalpha.com/input"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -32,17 +158,42 @@ class WolframAlphaScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        # Session per thread dengan connection pool bersama
+        self.sessions = SessionPool(self.headers, pool_size=pool_size, retries=http_retries)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or default_rate_limiter()
+        self.max_retries = max_retries
+        self.cache = cache
+        self.memory_cache = MemoryCache(memory_cache_size) if memory_cache_size > 0 else None
+        self.parser = parser
+        # Dipakai bersama kedua backend parser; statistik lewat self.strategies.stats()
+        self.strategies = StrategySelector(strategies) if strategies is not None else StrategySelector()
+        self._lxml_extractor = LxmlExtractor(selector=self.strategies)
+        self.archive = archive
+        self.parse_processes = parse_processes
+        self.metrics = metrics or MetricsHook()
+        self.stream = stream
+        self.max_body_size = max_body_size
+        self.max_pods = max_pods
     
-    def search_formula(self, query: str, delay: float = 2.0) -> Dict:
+    @property
+    def session(self) -> 'requests.Session':
+        """Session HTTP untuk thread saat ini (lihat http_session.SessionPool)."""
+        return self.sessions.get()
+    
+    def search_formula(self, query: str, delay: float = 2.0,
+                       fields: Optional[Iterable[str]] = None) -> Dict:
         """
         Mencari rumus atau informasi dari WolframAlpha.
         Search for formulas or information from WolframAlpha.
         
         Args:
             query (str): Query pencarian (misal: "quadratic formula", "pythagorean theorem")
-            delay (float): Waktu delay antara request dalam detik (default: 2.0)
+            delay (float): Jarak minimum antar request ke host dalam detik,
+                dijaga oleh rate limiter bersama (default: 2.0, 0 = tanpa batas)
+            fields (Iterable[str]): Field pod yang diekstrak, misal ['formulas', 'title']
+                (default: semua). Field lain tetap ada sebagai nilai kosong dan
+                traversal untuk field tersebut dilewati.
             
         Returns:
             Dict: Dictionary berisi hasil scraping dengan keys:
@@ -52,98 +203,406 @@ class WolframAlphaScraper:
                 - status: Status scraping (success/error)
                 - error: Pesan error jika ada
         """
-        result = {
-            'query': query,
-            'url': '',
-            'results': [],
-            'status': 'pending',
-            'error': None
-        }
+        started = time.perf_counter()
+        fields = normalize_fields(fields)
+        
+        if self.memory_cache is None:
+            result = self._search_uncached(query, delay, fields)
+        else:
+            # Query yang sama (setelah normalisasi) hanya di-request sekali,
+            # termasuk saat dipanggil bersamaan dari beberapa thread
+            shared = self.memory_cache.get_or_compute(
+                cache_key(query, fields, self.max_pods),
+                lambda: self._search_uncached(query, delay, fields),
+                cacheable=_cacheable
+            )
+            result = self._copy_shared(shared, query)
+        
+        self._record_result(result, started)
+        return result
+    
+    def _copy_shared(self, shared: Dict, query: str) -> Dict:
+        """Salinan result dari cache in-memory untuk query dengan ejaan aslinya."""
+        result = copy.deepcopy(shared)
+        result['query'] = query
+        result['url'] = self._build_url(query)
+        return result
+    
+    def _record_result(self, result: Dict, started: float):
+        """Catat durasi total dan status satu query ke metrics."""
+        self.metrics.observe('total', time.perf_counter() - started)
+        self.metrics.count('results', labels={'status': result['status']})
+    
+    def _build_url(self, query: str) -> str:
+        """URL pencarian WolframAlpha untuk query."""
+        # Encode query untuk URL
+        encoded_query = urllib.parse.quote(query)
+        return f"{self.base_url}?i={encoded_query}"
+    
+    def _search_uncached(self, query: str, delay: float,
+                         fields: Optional[FrozenSet[str]] = None) -> Dict:
+        """
+        Pencarian tanpa cache in-memory (cache persisten tetap dipakai).
+        Search bypassing the in-memory cache (the persistent cache still applies).
+        """
+        result, response, body = self._fetch(query, delay, fields, stream=self.stream)
+        if response is None:
+            return result
+        
+        try:
+            # Parse HTML dan ekstrak hasil dari berbagai section
+            if self.stream:
+                results = self._parse_stream(response, result, fields)
+            else:
+                results = self._parse(body, fields)
+        except request_errors() as e:
+            return self._set_error(result, f'Network error: {str(e)}')
+        except Exception as e:
+            return self._set_error(result, f'Error: {str(e)}')
+        finally:
+            response.close()
         
+        return self._finish(result, results, response, fields)
+    
+    def _fetch(self, query: str, delay: float, fields: Optional[FrozenSet[str]] = None,
+               stream: bool = False) -> Tuple[Dict, Optional['requests.Response'], Optional[bytes]]:
+        """
+        Tahap fetch: cek cache persisten lalu request ke WolframAlpha.
+        Fetch stage: check the persistent cache, then request WolframAlpha.
+        
+        Args:
+            query (str): Query pencarian
+            delay (float): Jarak minimum antar request ke host dalam detik
+            fields (FrozenSet[str]): Field yang dipilih, bagian dari kunci cache
+            stream (bool): Body belum dibaca; pemanggil membacanya dengan
+                _parse_stream (metrics dan arsip body diurus di sana)
+            
+        Returns:
+            Tuple[Dict, Optional[requests.Response], Optional[bytes]]: Result,
+                response yang perlu di-parse (None jika result sudah final, yaitu
+                cache hit atau error), dan body-nya (None jika stream)
+        """
+        result = self._new_result(query)
+        
+        response = None
         try:
-            # Encode query untuk URL
-            encoded_query = urllib.parse.quote(query)
-            url = f"{self.base_url}?i={encoded_query}"
+            url = self._build_url(query)
             result['url'] = url
             
-            # Delay untuk menghindari rate limiting
-            time.sleep(delay)
+            # Cek cache persisten sebelum request
+            key = cache_key(query, fields, self.max_pods)
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None and cached.fresh:
+                print(f"Cache hit: {query}")
+                self.metrics.count('cache_hits')
+                return self._from_cache(cached, result), None, None
             
             # Request ke WolframAlpha
             print(f"Mencari: {query}")
             print(f"URL: {url}")
             
-            response = self.session.get(url, timeout=30)
+            headers = cached.conditional_headers() if cached else None
+            response = self._get_with_backoff(url, delay, headers)
+            
+            if response.status_code == 304 and cached is not None:
+                # Tidak berubah di server, pakai hasil dari cache
+                response.close()
+                self.cache.touch(key)
+                print("Tidak berubah (304), memakai hasil cache")
+                self.metrics.count('not_modified')
+                return self._from_cache(cached, result), None, None
+            
             response.raise_for_status()
+            # Tolak body yang terlalu besar sebelum di-download jika ukurannya diketahui
+            self._check_body_size(int(response.headers.get('Content-Length') or 0))
+            if stream:
+                return result, response, None
+            
+            if self.max_body_size is None:
+                body = response.content
+                self.metrics.count('response_bytes', len(body))
+            else:
+                # Baca per chunk agar download berhenti begitu batas terlampaui
+                body = b''.join(self._read_stream(response))
+            
+            if self.archive is not None:
+                self.archive.store(query, url, response.status_code,
+                                   response.headers, body)
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'lxml')
+            return result, response, body
+            
+        except request_errors() as e:
+            self._close(response)
+            return self._set_error(result, f'Network error: {str(e)}'), None, None
+        except Exception as e:
+            self._close(response)
+            return self._set_error(result, f'Error: {str(e)}'), None, None
+    
+    def _check_body_size(self, size: int):
+        """ValueError jika size melebihi max_body_size."""
+        if self.max_body_size is not None and size > self.max_body_size:
+            raise ValueError(f'Response melebihi batas {self.max_body_size} byte')
+    
+    @staticmethod
+    def _close(response: Optional['requests.Response']):
+        """Kembalikan koneksi response (stream) ke pool."""
+        if response is not None:
+            response.close()
+    
+    def _read_stream(self, response: 'requests.Response',
+                     parts: Optional[List[bytes]] = None) -> Iterator[bytes]:
+        """
+        Baca body response per chunk sambil menjaga max_body_size.
+        Read a response body chunk by chunk, enforcing max_body_size.
+        
+        Args:
+            response (requests.Response): Response dengan stream=True
+            parts (List[bytes]): Jika ada, setiap chunk juga ditambahkan ke sini
+            
+        Yields:
+            bytes: Chunk body (sudah di-decode dari gzip/deflate)
+        """
+        size = 0
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            self.metrics.count('response_bytes', len(chunk))
+            self._check_body_size(size)
+            if parts is not None:
+                parts.append(chunk)
+            yield chunk
+    
+    def _parse_stream(self, response: 'requests.Response', result: Dict,
+                      fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """
+        Download dan parse body secara bersamaan (lihat LxmlExtractor.extract_stream).
+        Download and parse the body together (see LxmlExtractor.extract_stream).
+        
+        Durasi gabungan download dan parse dicatat sebagai fase 'stream'. Jika arsip
+        aktif, body dibaca sampai habis agar arsipnya lengkap (tanpa berhenti awal).
+        The combined download and parse time is recorded as the 'stream' phase. With
+        an archive the whole body is read so the archived copy is complete.
+        
+        Args:
+            response (requests.Response): Response dengan stream=True
+            result (Dict): Result dari tahap fetch (query dan url untuk arsip)
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
             
-            # Ekstrak hasil dari berbagai section
-            results = self._extract_results(soup)
+        Returns:
+            List[Dict]: List hasil yang diekstrak
+        """
+        parts = [] if self.archive is not None else None
+        chunks = self._read_stream(response, parts)
+        if self.parser != 'lxml':
+            # BeautifulSoup tidak bisa parse incremental; body tetap dibatasi max_body_size
+            return self._parse(b''.join(chunks), fields)
+        
+        with self.metrics.timer('stream'):
+            max_pods = self.max_pods if parts is None else None
+            results = self._lxml_extractor.extract_stream(chunks, fields, max_pods)
+        if parts is not None:
+            self.archive.store(result['query'], result['url'], response.status_code,
+                               response.headers, b''.join(parts))
+        return results
+    
+    def _finish(self, result: Dict, results: List[Dict], response: 'requests.Response',
+                fields: Optional[FrozenSet[str]] = None) -> Dict:
+        """
+        Tahap akhir: isi status dari hasil ekstraksi dan simpan ke cache.
+        Final stage: set the status from the extracted results and cache them.
+        
+        Args:
+            result (Dict): Result dari tahap fetch
+            results (List[Dict]): Hasil ekstraksi pod
+            response (requests.Response): Response yang di-parse
+            fields (FrozenSet[str]): Field yang dipilih, bagian dari kunci cache
             
+        Returns:
+            Dict: Result yang sudah final
+        """
+        try:
+            if self.max_pods is not None:
+                results = results[:self.max_pods]
             if results:
                 result['results'] = results
                 result['status'] = 'success'
                 print(f"Berhasil menemukan {len(results)} hasil")
+                
+                if self.cache is not None:
+                    self.cache.put(cache_key(result['query'], fields, self.max_pods), result,
+                                   etag=response.headers.get('ETag'),
+                                   last_modified=response.headers.get('Last-Modified'))
             else:
                 result['status'] = 'no_results'
                 result['error'] = 'Tidak ada hasil yang ditemukan'
                 print("Tidak ada hasil yang ditemukan")
-            
-        except requests.exceptions.RequestException as e:
-            result['status'] = 'error'
-            result['error'] = f'Network error: {str(e)}'
-            print(f"Error: {result['error']}")
         except Exception as e:
-            result['status'] = 'error'
-            result['error'] = f'Error: {str(e)}'
-            print(f"Error: {result['error']}")
+            self._set_error(result, f'Error: {str(e)}')
+        
+        return result
+    
+    @staticmethod
+    def _new_result(query: str) -> Dict:
+        """Result kosong untuk query yang belum dikerjakan."""
+        return {
+            'query': query,
+            'url': '',
+            'results': [],
+            'status': 'pending',
+            'error': None
+        }
+    
+    @staticmethod
+    def _set_error(result: Dict, message: str) -> Dict:
+        """Tandai result sebagai error dan cetak pesannya."""
+        result['status'] = 'error'
+        result['error'] = message
+        print(f"Error: {result['error']}")
+        return result
+    
+    def _from_cache(self, cached: CacheEntry, result: Dict) -> Dict:
+        """
+        Isi result dengan hasil dari entri cache.
+        Fill a result dict from a cache entry.
         
+        Args:
+            cached (CacheEntry): Entri cache
+            result (Dict): Result dengan query dan url untuk request ini
+            
+        Returns:
+            Dict: Result yang sudah diisi
+        """
+        result['results'] = cached.result.get('results', [])
+        result['status'] = cached.result.get('status', 'success')
+        result['error'] = cached.result.get('error')
         return result
     
-    def _extract_results(self, soup: BeautifulSoup) -> List[Dict]:
+    def _get_with_backoff(self, url: str, delay: float,
+                          headers: Optional[Dict[str, str]] = None) -> 'requests.Response':
+        """
+        GET dengan rate limiter, mengulang saat server membalas 429/503.
+        GET through the rate limiter, retrying when the server answers 429/503.
+        
+        Args:
+            url (str): URL tujuan
+            delay (float): Jarak minimum antar request dalam detik
+            headers (Dict[str, str]): Header tambahan, misal untuk conditional request
+            
+        Returns:
+            requests.Response: Response terakhir dari server
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        rate = 1.0 / delay if delay > 0 else None
+        # Dengan batas ukuran, body baru dibaca setelah Content-Length diperiksa
+        stream = self.stream or self.max_body_size is not None
+        
+        for attempt in range(self.max_retries + 1):
+            self.metrics.observe('rate_limit', self.rate_limiter.acquire(host, rate))
+            with self.metrics.timer('network'):
+                response = self.session.get(url, headers=headers, timeout=self.timeout,
+                                            stream=stream)
+            self.metrics.count('requests')
+            
+            if response.status_code not in THROTTLE_STATUSES:
+                self.rate_limiter.on_success(host)
+                return response
+            
+            self.metrics.count('throttled', labels={'status': str(response.status_code)})
+            if attempt < self.max_retries:
+                response.close()
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.rate_limiter.on_throttle(host, retry_after)
+            print(f"Server membatasi request ({response.status_code}), "
+                  f"percobaan {attempt + 1}/{self.max_retries + 1}")
+        
+        return response
+    
+    def _parse(self, content: bytes, fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """
+        Parse body HTML dengan backend parser yang dipilih.
+        Parse an HTML body with the selected parser backend.
+        
+        Args:
+            content (bytes): Body response HTML
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
+            
+        Returns:
+            List[Dict]: List hasil yang diekstrak
+        """
+        results, timings = self._parse_timed(content, fields)
+        for phase, seconds in timings.items():
+            self.metrics.observe(phase, seconds)
+        return results
+    
+    def _parse_timed(self, content: bytes, fields: Optional[FrozenSet[str]] = None
+                     ) -> Tuple[List[Dict], Dict[str, float]]:
+        """
+        Seperti _parse, ditambah durasi fase 'parse' (pohon HTML), 'extract' (pod), dan
+        'strategy_<nama>' (strategi yang menang, lihat extraction_strategies).
+        """
+        start = time.perf_counter()
+        if self.parser == 'lxml':
+            root = self._lxml_extractor.parse(content)
+            parsed = time.perf_counter()
+            if root is None:
+                return [], {'parse': parsed - start, 'extract': time.perf_counter() - parsed}
+            match = self._lxml_extractor.select(root, fields)
+        else:
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(content, 'lxml')
+            parsed = time.perf_counter()
+            match = self._select_results(soup, fields)
+        return match.results, {'parse': parsed - start, 'extract': time.perf_counter() - parsed,
+                               f'strategy_{match.strategy}': match.seconds}
+    
+    def _extract_results(self, soup: 'BeautifulSoup',
+                         fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
         """
         Ekstrak hasil dari HTML WolframAlpha.
         Extract results from WolframAlpha HTML.
         
         Args:
             soup (BeautifulSoup): Parsed HTML
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
             
         Returns:
             List[Dict]: List hasil yang diekstrak
         """
-        results = []
-        
-        # Mencari pod-pod (section hasil) di WolframAlpha
-        pods = soup.find_all('section', class_='_2vZr')
-        
-        if not pods:
-            # Coba alternatif selector
-            pods = soup.find_all('div', {'data-testid': lambda x: x and 'pod' in str(x).lower()})
-        
-        for pod in pods:
-            pod_data = self._extract_pod_data(pod)
-            if pod_data:
-                results.append(pod_data)
+        return self._select_results(soup, fields).results
+    
+    def _select_results(self, soup: 'BeautifulSoup',
+                        fields: Optional[FrozenSet[str]] = None) -> StrategyMatch:
+        """
+        Seperti _extract_results, ditambah strategi yang menang dan durasinya.
+        Like _extract_results, plus the winning strategy and its duration.
         
-        # Jika tidak menemukan dengan selector di atas, coba ekstrak dari script tags
-        if not results:
-            results = self._extract_from_scripts(soup)
+        Pod dicari dengan strategi di self.strategies sesuai prioritas: section pod,
+        lalu div data-testid, lalu script JSON jika belum ada hasil.
+        Pods are found with self.strategies in precedence order: pod sections, then
+        data-testid divs, then JSON scripts when nothing was found.
+        """
+        def extract(strategy, elements):
+            if strategy.kind == 'scripts':
+                return self._extract_from_scripts(elements, fields)
+            pods = (self._extract_pod_data(pod, fields) for pod in elements)
+            return [pod_data for pod_data in pods if pod_data]
         
-        return results
+        return self.strategies.select(lambda strategies: match_soup(soup, strategies), extract)
     
-    def _extract_pod_data(self, pod) -> Optional[Dict]:
+    def _extract_pod_data(self, pod, fields: Optional[FrozenSet[str]] = None) -> Optional[Dict]:
         """
         Ekstrak data dari pod individual.
         Extract data from individual pod.
         
         Args:
             pod: BeautifulSoup element dari pod
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
             
         Returns:
             Optional[Dict]: Data pod jika berhasil diekstrak
         """
+        from bs4 import CData, NavigableString, Tag
+        # Jenis string yang dihitung oleh get_text() di BeautifulSoup
+        text_types = (NavigableString, CData)
         try:
             pod_data = {
                 'title': '',
@@ -152,37 +611,65 @@ class WolframAlphaScraper:
                 'formulas': []
             }
             
-            # Ekstrak title
-            title_elem = pod.find(['h2', 'h3', 'h4'])
-            if title_elem:
-                pod_data['title'] = title_elem.get_text(strip=True)
+            if fields is not None and 'content' not in fields:
+                # Tanpa content tidak perlu menyusun teks setiap elemen: cukup
+                # cari tag judul dan gambar
+                self._extract_sparse(pod, pod_data, fields)
+                return pod_data if keep_pod(pod_data, fields) else None
             
-            # Ekstrak text content
-            text_elems = pod.find_all(['p', 'span', 'div'])
-            for elem in text_elems:
-                text = elem.get_text(strip=True)
-                if text and len(text) > 2 and text not in pod_data['content']:
-                    pod_data['content'].append(text)
+            want_title = fields is None or 'title' in fields
+            want_images = fields is None or 'images' in fields or 'formulas' in fields
+            
+            # Satu kali jalan (post-order) atas subtree pod: teks setiap elemen
+            # disusun dari teks anak-anaknya sehingga tidak ada subtree yang
+            # dibaca ulang. Hasilnya sama dengan get_text(strip=True) per elemen.
+            title_elem = None
+            text_slots = {}
+            texts = []
+            
+            frames = [(pod, iter(pod.contents), [])]
+            while frames:
+                node, children, parts = frames[-1]
+                child = next(children, None)
+                
+                if child is None:
+                    frames.pop()
+                    text = ''.join(parts)
+                    if node is title_elem and want_title:
+                        pod_data['title'] = text
+                    slot = text_slots.get(id(node))
+                    if slot is not None:
+                        texts[slot] = text
+                    if frames and text:
+                        frames[-1][2].append(text)
+                    continue
+                
+                if isinstance(child, Tag):
+                    name = child.name
+                    if name in TITLE_TAGS and title_elem is None:
+                        title_elem = child
+                    elif name in TEXT_TAGS:
+                        # Slot disimpan dalam urutan dokumen, diisi saat elemen selesai
+                        text_slots[id(child)] = len(texts)
+                        texts.append('')
+                    elif name == 'img' and want_images:
+                        self._add_image(pod_data, child.get('src', ''), child.get('alt', ''), fields)
+                    frames.append((child, iter(child.contents), []))
+                elif type(child) in text_types:
+                    # Sama seperti get_text: komentar, script, style dilewati
+                    text = child.strip()
+                    if text:
+                        parts.append(text)
             
-            # Ekstrak images
-            images = pod.find_all('img')
-            for img in images:
-                img_src = img.get('src', '')
-                img_alt = img.get('alt', '')
-                if img_src:
-                    pod_data['images'].append({
-                        'src': img_src,
-                        'alt': img_alt
-                    })
-            
-            # Ekstrak formulas (biasanya dalam img dengan alt text)
-            for img in images:
-                alt_text = img.get('alt', '')
-                if alt_text and any(char in alt_text for char in ['=', '+', '-', '*', '/', '^', '∫', '∑', 'x', 'y']):
-                    pod_data['formulas'].append(alt_text)
+            # Dedup dengan set, urutan pertama kali muncul dipertahankan
+            seen = set()
+            for text in texts:
+                if len(text) > 2 and text not in seen:
+                    seen.add(text)
+                    pod_data['content'].append(text)
             
             # Hanya return jika ada content
-            if pod_data['title'] or pod_data['content'] or pod_data['formulas']:
+            if keep_pod(pod_data, fields):
                 return pod_data
             
         except Exception as e:
@@ -190,42 +677,70 @@ class WolframAlphaScraper:
         
         return None
     
-    def _extract_from_scripts(self, soup: BeautifulSoup) -> List[Dict]:
+    def _extract_sparse(self, pod, pod_data: Dict, fields: FrozenSet[str]):
+        """Isi title dan gambar/formula tanpa menyapu teks seluruh pod."""
+        from bs4 import Tag
+        names = set()
+        if 'title' in fields:
+            names.update(TITLE_TAGS)
+        if 'images' in fields or 'formulas' in fields:
+            names.add('img')
+        if not names:
+            return
+        
+        # Pencocokan nama langsung lebih cepat daripada find_all dengan list nama
+        title_elem = None
+        for elem in pod.descendants:
+            if type(elem) is not Tag or elem.name not in names:
+                continue
+            if elem.name == 'img':
+                self._add_image(pod_data, elem.get('src', ''), elem.get('alt', ''), fields)
+            elif title_elem is None:
+                title_elem = elem
+                if 'img' not in names:
+                    break
+        if title_elem is not None:
+            pod_data['title'] = title_elem.get_text(strip=True)
+    
+    @staticmethod
+    def _add_image(pod_data: Dict, img_src: str, img_alt: str,
+                   fields: Optional[FrozenSet[str]] = None):
         """
-        Ekstrak data dari script tags (fallback method).
-        Extract data from script tags (fallback method).
+        Catat gambar dan rumus dari alt text-nya (biasanya rumus ada di alt text).
+        Record an image and the formula in its alt text, if any.
+        """
+        if img_src and (fields is None or 'images' in fields):
+            pod_data['images'].append({
+                'src': img_src,
+                'alt': img_alt
+            })
+        if (img_alt and (fields is None or 'formulas' in fields)
+                and any(char in img_alt for char in FORMULA_CHARS)):
+            pod_data['formulas'].append(img_alt)
+    
+    def _extract_from_scripts(self, scripts: List,
+                              fields: Optional[FrozenSet[str]] = None) -> List[Dict]:
+        """
+        Ekstrak pod dari script tags JSON (fallback method).
+        Extract pods from JSON script tags (fallback method).
         
         Args:
-            soup (BeautifulSoup): Parsed HTML
+            scripts (List): Tag script JSON yang cocok dengan strategi 'scripts'
+            fields (FrozenSet[str]): Field pod yang diekstrak (None = semua)
             
         Returns:
-            List[Dict]: List hasil
+            List[Dict]: List hasil (lihat lxml_extractor.extract_json_pods)
         """
-        results = []
-        
         try:
-            # Cari script tags yang mungkin berisi data JSON
-            scripts = soup.find_all('script', type='application/json')
-            
-            for script in scripts:
-                try:
-                    data = json.loads(script.string)
-                    # Proses data JSON jika ada
-                    if isinstance(data, dict):
-                        results.append({
-                            'title': 'Data from JSON',
-                            'content': [str(data)],
-                            'images': [],
-                            'formulas': []
-                        })
-                except (json.JSONDecodeError, TypeError):
-                    continue
+            return extract_json_pods((script.string for script in scripts), fields)
         except Exception as e:
             print(f"Error extracting from scripts: {e}")
-        
-        return results
+            return []
     
-    def search_multiple(self, queries: List[str], delay: float = 2.0) -> List[Dict]:
+    def search_multiple(self, queries: List[str], delay: float = 2.0,
+                        workers: int = 1, models: bool = False,
+                        fields: Optional[Iterable[str]] = None,
+                        canonicalize: Optional[Callable[[str], str]] = None) -> List[Dict]:
         """
         Mencari beberapa query sekaligus.
         Search multiple queries at once.
@@ -233,18 +748,158 @@ class WolframAlphaScraper:
         Args:
             queries (List[str]): List query untuk dicari
             delay (float): Waktu delay antara request
+            workers (int): Jumlah worker paralel (default: 1, berurutan)
+            models (bool): Kembalikan models.SearchResult yang ringkas alih-alih
+                dict, untuk batch besar yang ditahan di memori
+            fields (Iterable[str]): Field pod yang diekstrak (default: semua),
+                lihat search_formula
+            canonicalize (Callable[[str], str]): Fungsi kanonikalisasi, misal
+                query_dedup.QueryCanonicalizer(); query dengan bentuk kanonik sama
+                hanya di-request sekali
             
         Returns:
-            List[Dict]: List hasil untuk semua query
+            List[Dict]: List hasil untuk semua query, urutan sama dengan input
+        """
+        results = self.iter_search(queries, delay=delay, workers=workers, fields=fields,
+                                   canonicalize=canonicalize)
+        if models:
+            return [SearchResult.from_dict(result) for result in results]
+        return list(results)
+    
+    def iter_search(self, queries: Iterable[str], delay: float = 2.0,
+                    workers: int = 1, fields: Optional[Iterable[str]] = None,
+                    canonicalize: Optional[Callable[[str], str]] = None) -> Iterator[Dict]:
         """
-        results = []
+        Mencari beberapa query dan menghasilkan hasil satu per satu sesuai urutan input.
+        Search multiple queries, yielding results one at a time in input order.
         
-        for i, query in enumerate(queries):
-            print(f"\n[{i+1}/{len(queries)}] Processing: {query}")
-            result = self.search_formula(query, delay=delay)
-            results.append(result)
+        Hanya sejumlah kecil hasil yang ditahan di memori (yang selesai lebih
+        awal dari query sebelumnya), sehingga memori tetap datar untuk batch besar.
+        Only results that finish ahead of earlier queries are buffered, so memory
+        stays flat for large batches.
         
-        return results
+        Args:
+            queries (Iterable[str]): Query untuk dicari (boleh generator)
+            delay (float): Waktu delay antara request
+            workers (int): Jumlah worker paralel (default: 1, berurutan)
+            fields (Iterable[str]): Field pod yang diekstrak (default: semua)
+            canonicalize (Callable[[str], str]): Deduplikasi query, lihat search_multiple
+            
+        Yields:
+            Dict: Hasil untuk setiap query
+        """
+        pending = {}
+        next_index = 0
+        
+        for index, result in self.iter_search_completed(queries, delay=delay, workers=workers,
+                                                        fields=fields, canonicalize=canonicalize):
+            pending[index] = result
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+    
+    def iter_search_completed(self, queries: Iterable[str], delay: float = 2.0, workers: int = 1,
+                              fields: Optional[Iterable[str]] = None,
+                              canonicalize: Optional[Callable[[str], str]] = None
+                              ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Mencari beberapa query dan menghasilkan hasil segera setelah selesai.
+        Search multiple queries, yielding each result as soon as it completes.
+        
+        Args:
+            queries (Iterable[str]): Query untuk dicari (boleh generator)
+            delay (float): Waktu delay antara request
+            workers (int): Jumlah worker paralel (default: 1, berurutan)
+            fields (Iterable[str]): Field pod yang diekstrak (default: semua)
+            canonicalize (Callable[[str], str]): Deduplikasi query, lihat search_multiple
+            
+        Yields:
+            Tuple[int, Dict]: Index query di input dan hasilnya
+        """
+        # Validasi sekali sebelum query pertama dikirim
+        fields = normalize_fields(fields)
+        
+        if canonicalize is not None:
+            yield from self._iter_deduplicated(queries, canonicalize, delay, workers, fields)
+            return
+        
+        total = len(queries) if hasattr(queries, '__len__') else '?'
+        
+        if workers <= 1:
+            for i, query in enumerate(queries):
+                print(f"\n[{i+1}/{total}] Processing: {query}")
+                yield i, self.search_formula(query, delay=delay, fields=fields)
+            return
+        
+        # Satu koneksi keep-alive per worker
+        self.sessions.resize(workers)
+        
+        if self.parse_processes > 0:
+            # Fetch di thread, ekstraksi di process pool (lihat pipeline.py)
+            from pipeline import FetchParsePipeline
+            pipeline = FetchParsePipeline(self, fetch_workers=workers,
+                                          parse_processes=self.parse_processes)
+            for done_count, (index, result) in enumerate(pipeline.run(queries, delay, fields), 1):
+                print(f"\n[{done_count}/{total}] Selesai: {result['query']}")
+                yield index, result
+            return
+        
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+        
+        # Jumlah query yang disubmit dibatasi agar hasil tidak menumpuk
+        # jika pemanggil memproses lebih lambat dari worker
+        window = workers * 2
+        query_iter = enumerate(queries)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {}
+        done_count = 0
+        try:
+            for i, query in itertools.islice(query_iter, window):
+                futures[executor.submit(self.search_formula, query, delay, fields)] = (i, query)
+            
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, query = futures.pop(future)
+                    done_count += 1
+                    print(f"\n[{done_count}/{total}] Selesai: {query}")
+                    yield index, future.result()
+                
+                for i, query in itertools.islice(query_iter, window - len(futures)):
+                    futures[executor.submit(self.search_formula, query, delay, fields)] = (i, query)
+        finally:
+            # Batalkan query yang belum jalan jika iterator dihentikan lebih awal
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _iter_deduplicated(self, queries: Iterable[str], canonicalize: Callable[[str], str],
+                           delay: float, workers: int, fields: Optional[FrozenSet[str]]
+                           ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Request setiap query kanonik sekali, lalu sebarkan hasilnya ke semua posisi input.
+        Fetch each canonical query once, then fan its result out to every input position.
+        
+        Query yang dikirim adalah bentuk pertama yang muncul di input; salinan untuk
+        baris lain memakai query dan URL aslinya masing-masing.
+        """
+        queries = list(queries)
+        unique, positions = group_queries(queries, canonicalize)
+        duplicates = len(queries) - len(unique)
+        if duplicates:
+            print(f"Deduplikasi: {len(unique)} query unik dari {len(queries)} "
+                  f"({duplicates} duplikat tidak di-request)")
+            self.metrics.count('deduplicated', duplicates)
+        
+        for group, result in self.iter_search_completed(unique, delay=delay, workers=workers,
+                                                        fields=fields):
+            first, *others = positions[group]
+            yield first, result
+            for index in others:
+                copy_result = copy.deepcopy(result)
+                copy_result['query'] = queries[index]
+                copy_result['url'] = self._build_url(queries[index])
+                yield index, copy_result
     
     def save_results(self, results: Dict, filename: str = 'results.json'):
         """
@@ -252,12 +907,12 @@ class WolframAlphaScraper:
         Save results to JSON file.
         
         Args:
-            results: Hasil scraping
+            results: Hasil scraping (dict, models.SearchResult, atau list keduanya)
             filename (str): Nama file output
         """
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+                json.dump(results, f, ensure_ascii=False, indent=2, default=json_default)
             print(f"\nHasil disimpan ke: {filename}")
         except Exception as e:
             print(f"Error saving results: {e}")
@@ -268,8 +923,9 @@ class WolframAlphaScraper:
         Print results to console in a neat format.
         
         Args:
-            result (Dict): Hasil scraping
+            result (Dict): Hasil scraping (dict atau models.SearchResult)
         """
+        result = as_dict(result)
         print("\n" + "="*80)
         print(f"Query: {result['query']}")
         print(f"Status: {result['status']}")
@@ -302,6 +958,40 @@ class WolframAlphaScraper:
         print("\n" + "="*80)
 
 
+# Scraper per process untuk extract_results (dipakai oleh process pool)
+_process_scrapers: Dict[str, WolframAlphaScraper] = {}
+
+
+def extract_results(content: bytes, parser: str = 'lxml',
+                    fields: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Ekstrak hasil dari body HTML tanpa network, bisa dipanggil dari process lain.
+    Extract results from an HTML body without network access; picklable for process pools.
+    
+    Args:
+        content (bytes): Body response HTML
+        parser (str): Backend parser ('lxml' atau 'bs4')
+        fields (Iterable[str]): Field pod yang diekstrak (default: semua)
+        
+    Returns:
+        List[Dict]: List hasil yang diekstrak
+    """
+    return extract_results_timed(content, parser, fields)[0]
+
+
+def extract_results_timed(content: bytes, parser: str = 'lxml', fields: Optional[Iterable[str]] = None
+                          ) -> Tuple[List[Dict], Dict[str, float]]:
+    """
+    Seperti extract_results, ditambah durasi fase 'parse' dan 'extract' dalam detik.
+    Like extract_results, plus the 'parse' and 'extract' phase durations in seconds.
+    """
+    scraper = _process_scrapers.get(parser)
+    if scraper is None:
+        scraper = WolframAlphaScraper(memory_cache_size=0, parser=parser)
+        _process_scrapers[parser] = scraper
+    return scraper._parse_timed(content, normalize_fields(fields))
+
+
 def main():
     """
     Fungsi utama untuk demonstrasi penggunaan.
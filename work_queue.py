@@ -0,0 +1,363 @@
+"""
+Work Queue untuk WolframAlpha Scraper
+Antrian kerja persisten agar beberapa process/mesin bisa mengerjakan satu batch.
+Durable work queue so several processes or machines can share one batch.
+
+Worker mengambil query dengan lease (visibility timeout). Lease diperpanjang
+selama query dikerjakan; jika worker mati, lease habis dan query dikirim ulang
+ke worker lain. Hasil hanya dicatat oleh pemegang lease yang masih berlaku,
+sehingga setiap query punya tepat satu hasil.
+Workers take queries under a lease (visibility timeout) that is extended while
+the work runs; when a worker dies the lease expires and the query is delivered
+again. Only the current lease holder can record a result, so every query ends
+up with exactly one result.
+
+Backend bisa diganti: turunkan WorkQueue dan daftarkan di QUEUE_BACKENDS.
+The backend is pluggable: subclass WorkQueue and register it in QUEUE_BACKENDS.
+
+Copyright (c) 2026 Achmad Syarifudin
+Licensed under MIT License
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from models import as_dict
+
+
+# Status task di antrian
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+# Percobaan mencatat hasil saat antrian gagal sesaat (misal "database is locked")
+COMPLETE_ATTEMPTS = 5
+
+
+class Task:
+    """
+    Satu query yang sedang di-lease oleh worker.
+    A single query leased by a worker.
+    """
+
+    def __init__(self, task_id: int, query: str, token: str, attempts: int):
+        self.id = task_id
+        self.query = query
+        self.token = token
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task(id={self.id}, query={self.query!r}, attempts={self.attempts})"
+
+
+class WorkQueue(ABC):
+    """
+    Antarmuka backend antrian kerja.
+    Work queue backend interface.
+    """
+
+    @abstractmethod
+    def enqueue(self, queries: Iterable[str]) -> int:
+        """Tambahkan query ke antrian; kembalikan jumlah yang ditambahkan."""
+
+    @abstractmethod
+    def lease(self, worker: str, count: int, lease_seconds: float) -> List[Task]:
+        """Ambil hingga count task pending (atau yang lease-nya habis) untuk worker."""
+
+    @abstractmethod
+    def extend(self, tasks: Sequence[Task], lease_seconds: float) -> int:
+        """Perpanjang lease task yang masih dipegang; kembalikan jumlah yang berhasil."""
+
+    @abstractmethod
+    def complete(self, task: Task, result: Dict) -> bool:
+        """Catat hasil task; False jika lease sudah hilang (hasil dibuang)."""
+
+    @abstractmethod
+    def requeue(self, statuses: Sequence[str] = ('error',)) -> int:
+        """Kembalikan task selesai dengan status hasil tertentu (dan task gagal) ke pending."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Jumlah task per status antrian (pending/leased/done/failed)."""
+
+    @abstractmethod
+    def iter_results(self) -> Iterator[Dict]:
+        """Hasil yang sudah tercatat, urutan sama dengan urutan enqueue."""
+
+    def close(self):
+        """Tutup backend."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    Antrian kerja di satu file SQLite (mode WAL), bisa dipakai bersama oleh
+    banyak process di satu mesin atau lewat filesystem bersama yang mendukung lock.
+    Work queue in a single SQLite file (WAL mode), shared by many processes on one
+    host or over a shared filesystem with working locks.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 5):
+        """
+        Args:
+            path (str): File database antrian
+            max_attempts (int): Lease maksimum per task sebelum ditandai failed
+                (melindungi dari query yang selalu membuat worker crash)
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS tasks ('
+                ' id INTEGER PRIMARY KEY,'
+                ' query TEXT NOT NULL,'
+                ' status TEXT NOT NULL,'
+                ' token TEXT,'
+                ' worker TEXT,'
+                ' lease_expires REAL,'
+                ' attempts INTEGER NOT NULL DEFAULT 0,'
+                ' result TEXT,'
+                ' result_status TEXT,'
+                ' completed_at REAL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id)')
+
+    def _write(self, fn):
+        """Jalankan fn(conn) dalam transaksi BEGIN IMMEDIATE (lock tulis sejak awal)."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                value = fn(self._conn)
+                self._conn.commit()
+                return value
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def enqueue(self, queries: Iterable[str]) -> int:
+        rows = [(query, PENDING) for query in queries]
+        self._write(lambda conn: conn.executemany(
+            'INSERT INTO tasks (query, status) VALUES (?, ?)', rows))
+        return len(rows)
+
+    def lease(self, worker: str, count: int, lease_seconds: float) -> List[Task]:
+        token = uuid.uuid4().hex
+
+        def take(conn):
+            now = time.time()
+            # Task yang lease-nya habis terlalu sering tidak dikirim ulang lagi
+            conn.execute(
+                'UPDATE tasks SET status = ?, token = NULL'
+                ' WHERE status = ? AND lease_expires < ? AND attempts >= ?',
+                (FAILED, LEASED, now, self.max_attempts))
+            ids = [row[0] for row in conn.execute(
+                'SELECT id FROM tasks WHERE status = ?'
+                ' UNION ALL SELECT id FROM tasks WHERE status = ? AND lease_expires < ?'
+                ' ORDER BY id LIMIT ?',
+                (PENDING, LEASED, now, count))]
+            conn.executemany(
+                'UPDATE tasks SET status = ?, token = ?, worker = ?, lease_expires = ?,'
+                ' attempts = attempts + 1 WHERE id = ?',
+                [(LEASED, token, worker, now + lease_seconds, task_id) for task_id in ids])
+            return [Task(task_id, query, token, attempts) for task_id, query, attempts in conn.execute(
+                'SELECT id, query, attempts FROM tasks WHERE token = ? ORDER BY id', (token,))]
+
+        return self._write(take)
+
+    def extend(self, tasks: Sequence[Task], lease_seconds: float) -> int:
+        expires = time.time() + lease_seconds
+        return self._write(lambda conn: sum(conn.execute(
+            'UPDATE tasks SET lease_expires = ? WHERE id = ? AND token = ? AND status = ?',
+            (expires, task.id, task.token, LEASED)).rowcount for task in tasks))
+
+    def complete(self, task: Task, result: Dict) -> bool:
+        result = as_dict(result)
+        payload = json.dumps(result, ensure_ascii=False)
+        # Hanya pemegang lease saat ini yang boleh mencatat hasil
+        return self._write(lambda conn: conn.execute(
+            'UPDATE tasks SET status = ?, token = NULL, lease_expires = NULL, result = ?,'
+            ' result_status = ?, completed_at = ? WHERE id = ? AND token = ? AND status = ?',
+            (DONE, payload, result.get('status'), time.time(), task.id, task.token, LEASED)
+        ).rowcount == 1)
+
+    def requeue(self, statuses: Sequence[str] = ('error',)) -> int:
+        marks = ','.join('?' * len(statuses))
+
+        def reset(conn):
+            done = conn.execute(
+                f'UPDATE tasks SET status = ?, result = NULL, result_status = NULL,'
+                f' completed_at = NULL, attempts = 0 WHERE status = ? AND result_status IN ({marks})',
+                (PENDING, DONE, *statuses)).rowcount
+            failed = conn.execute(
+                'UPDATE tasks SET status = ?, attempts = 0 WHERE status = ?',
+                (PENDING, FAILED)).rowcount
+            return done + failed
+
+        return self._write(reset)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def iter_results(self) -> Iterator[Dict]:
+        # Koneksi terpisah agar iterasi panjang tidak menahan lock worker
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            for (payload,) in conn.execute(
+                    'SELECT result FROM tasks WHERE status = ? ORDER BY id', (DONE,)):
+                yield json.loads(payload)
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Backend yang tersedia: skema lokasi -> kelas
+QUEUE_BACKENDS = {
+    'sqlite': SqliteWorkQueue,
+}
+
+
+def open_queue(location: str, **kwargs) -> WorkQueue:
+    """
+    Buka antrian dari lokasi "skema:path", misal "sqlite:batch.queue"; path tanpa
+    skema memakai SQLite.
+    Open a queue from a "scheme:path" location; a bare path uses SQLite.
+    """
+    scheme, sep, path = location.partition(':')
+    if sep and scheme in QUEUE_BACKENDS:
+        return QUEUE_BACKENDS[scheme](path, **kwargs)
+    return SqliteWorkQueue(location, **kwargs)
+
+
+def default_worker_id() -> str:
+    """Identitas worker: host dan PID."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(scraper, queue: WorkQueue, delay: float = 2.0, workers: int = 1,
+               fields: Optional[Iterable[str]] = None, lease_seconds: float = 60.0,
+               batch_size: Optional[int] = None, worker_id: Optional[str] = None,
+               poll_interval: float = 1.0) -> Dict[str, int]:
+    """
+    Kerjakan task dari antrian sampai tidak ada lagi yang pending atau di-lease.
+    Work through queue tasks until nothing is pending or leased.
+
+    Setiap node memakai rate limiter-nya sendiri (lihat scraper.rate_limiter).
+    Every node stays within its own rate limiter (see scraper.rate_limiter).
+
+    Args:
+        scraper (WolframAlphaScraper): Scraper untuk node ini
+        queue (WorkQueue): Antrian bersama
+        delay (float): Jarak minimum antar request dalam detik
+        workers (int): Jumlah request paralel di node ini
+        fields (Iterable[str]): Field pod yang diekstrak (default: semua)
+        lease_seconds (float): Visibility timeout; lease diperpanjang selama dikerjakan
+        batch_size (int): Jumlah task maksimum yang dipegang sekaligus; lease ditambah
+            setiap kali slot kosong (default: 2 x workers)
+        worker_id (str): Identitas worker (default: host:pid)
+        poll_interval (float): Jeda saat task lain masih di-lease worker lain
+
+    Returns:
+        Dict[str, int]: Jumlah hasil yang dicatat ('recorded') dan yang dibuang
+            karena lease sudah hilang atau antrian gagal mencatatnya ('discarded';
+            task tersebut dikirim ulang setelah lease habis)
+    """
+    worker_id = worker_id or default_worker_id()
+    batch_size = batch_size or max(1, workers) * 2
+    stats = {'recorded': 0, 'discarded': 0}
+    outstanding: Dict[int, Task] = {}
+    outstanding_lock = threading.Lock()
+    stop = threading.Event()
+
+    def heartbeat():
+        # Perpanjang lease task yang masih dikerjakan sebelum habis
+        while not stop.wait(lease_seconds / 3):
+            with outstanding_lock:
+                tasks = list(outstanding.values())
+            if not tasks:
+                continue
+            try:
+                queue.extend(tasks, lease_seconds)
+            except Exception as e:
+                # Kegagalan sesaat (misal "database is locked") tidak boleh
+                # menghentikan heartbeat; lease dicoba diperpanjang lagi nanti
+                print(f"Error extending leases: {e}")
+                scraper.metrics.count('heartbeat_errors')
+
+    def leased_queries(started: List[Task]) -> Iterator[str]:
+        # Scraper mengambil query berikutnya setiap kali ada slot kosong; lease
+        # ditambah saat itu juga, tidak menunggu seluruh batch selesai
+        buffered: List[Task] = []
+        while True:
+            if not buffered:
+                with outstanding_lock:
+                    free = batch_size - len(outstanding)
+                buffered = queue.lease(worker_id, max(1, free), lease_seconds)
+                if not buffered:
+                    return
+                with outstanding_lock:
+                    outstanding.update((task.id, task) for task in buffered)
+            task = buffered.pop(0)
+            started.append(task)
+            yield task.query
+
+    def record(task: Task, result: Dict) -> bool:
+        # Kegagalan sesaat dicoba lagi selama lease masih diperpanjang heartbeat
+        for attempt in range(COMPLETE_ATTEMPTS):
+            try:
+                return queue.complete(task, result)
+            except Exception as e:
+                print(f"Error recording result: {e}")
+                scraper.metrics.count('complete_errors')
+                if attempt + 1 < COMPLETE_ATTEMPTS:
+                    time.sleep(min(poll_interval, 0.05 * 2 ** attempt))
+        # Lease dilepas dari heartbeat sehingga task dikirim ulang setelah habis
+        return False
+
+    thread = threading.Thread(target=heartbeat, daemon=True)
+    thread.start()
+    try:
+        while True:
+            started: List[Task] = []
+            for index, result in scraper.iter_search_completed(
+                    leased_queries(started), delay=delay, workers=workers, fields=fields):
+                task = started[index]
+                recorded = record(task, result)
+                stats['recorded' if recorded else 'discarded'] += 1
+                with outstanding_lock:
+                    outstanding.pop(task.id, None)
+            if started:
+                continue
+
+            counts = queue.counts()
+            if not counts[PENDING] and not counts[LEASED]:
+                break
+            # Sisa task dipegang worker lain; tunggu selesai atau lease-nya habis
+            time.sleep(poll_interval)
+    finally:
+        stop.set()
+        thread.join()
+    return stats